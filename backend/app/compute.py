@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+"""Bounded executor for the CPU-bound part of request handling.
+
+Handlers stay on the event loop and hand slicing, aggregation and encoding
+to a dedicated pool, so heavy requests neither occupy Starlette's shared
+thread pool nor block cheap endpoints such as ``/health``. Admission is
+capped: once ``max_pending`` tasks are queued or running, new work is
+refused immediately instead of growing an unbounded backlog.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, TypeVar
+
+from .services.data_repository import DataRepository
+from .telemetry import span
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the compute executor has no admission slot left."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Compute executor is saturated")
+        self.retry_after = retry_after
+
+
+class DatasetVersionMismatch(Exception):
+    """Raised in a worker process that cannot open the dataset version a task was submitted for."""
+
+
+# Version this worker process last reloaded the dataset for; each target version gets at most one reload.
+_reloaded_for: str | None = None
+
+
+def _warm_worker() -> None:
+    from .dependencies import get_repository
+
+    get_repository()
+
+
+def _run_in_worker(task: Callable[..., T], version: str, args: tuple) -> T:
+    """Run ``task`` against dataset ``version``, reloading once if the CSVs on disk are at that version.
+
+    While the parent still serves an older version than the files (or the
+    files have moved on again), reloading cannot help, so the task fails
+    fast and the caller retries instead of every task re-reading the data.
+    """
+
+    global _reloaded_for
+    from .dependencies import get_registry
+
+    registry = get_registry()
+    repository = registry.current()
+    if repository.version != version and _reloaded_for != version:
+        _reloaded_for = version
+        if registry.source_version() == version:
+            repository = registry.reload()
+    if repository.version != version:
+        raise DatasetVersionMismatch(f"Worker has dataset version {repository.version}, request expects {version}")
+    return task(repository, *args)
+
+
+class ComputeExecutor:
+    """Runs ``task(repository, *args)`` off the event loop with bounded admission.
+
+    With ``processes=True`` tasks run in spawned worker processes that open
+    the dataset themselves (memory-mapped when snapshots are enabled) and are
+    matched to the caller's repository by version; tasks and their arguments
+    must then be picklable. A worker that cannot match the version, e.g.
+    mid-reload, sheds the task like a full queue does.
+    """
+
+    def __init__(self, workers: int, max_pending: int, *, processes: bool = False, retry_after: int = 1):
+        self._processes = processes
+        self._retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: Executor
+        if processes:
+            self._pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_warm_worker)
+            self._threads = ThreadPoolExecutor(workers, thread_name_prefix="compute-bytes")
+        else:
+            self._pool = self._threads = ThreadPoolExecutor(workers, thread_name_prefix="compute")
+
+    def _admit(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(self._retry_after)
+
+    def _submit(self, task: Callable[..., T], repository: DataRepository, args: tuple) -> Future:
+        if self._processes:
+            return self._pool.submit(_run_in_worker, task, repository.version, args)
+        # Run in the caller's context so spans inside the task reach its request.
+        return self._pool.submit(contextvars.copy_context().run, task, repository, *args)
+
+    async def run(self, task: Callable[..., T], repository: DataRepository, *args: Any) -> T:
+        self._admit()
+        try:
+            future = self._submit(task, repository, args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Free the slot when the work actually finishes, not when the caller
+        # stops waiting, so disconnected clients cannot over-commit the pool.
+        future.add_done_callback(lambda _: self._slots.release())
+        with span("compute"):
+            return await self._result(future)
+
+    async def _result(self, future: Future) -> Any:
+        try:
+            return await asyncio.wrap_future(future)
+        except DatasetVersionMismatch as exc:
+            raise ExecutorSaturated(self._retry_after) from exc
+
+    async def offload(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on a worker thread under the same admission limit.
+
+        For byte-level work that needs no repository and releases the GIL,
+        such as compression; it stays on threads even in process mode so the
+        bytes are not pickled across.
+        """
+
+        self._admit()
+        try:
+            future = self._threads.submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def lease(self) -> ComputeLease:
+        """Take one admission slot to run a sequence of tasks, e.g. for a streamed response."""
+
+        self._admit()
+        return ComputeLease(self)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._threads is not self._pool:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+
+
+class ComputeLease:
+    """An admission slot held across several tasks until :meth:`release`."""
+
+    def __init__(self, executor: ComputeExecutor):
+        self._executor = executor
+        self._released = False
+
+    async def run(self, task: Callable[..., T], repository: DataRepository, *args: Any) -> T:
+        with span("compute"):
+            return await self._executor._result(self._executor._submit(task, repository, args))
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._executor._slots.release()
@@ -13,7 +13,93 @@ class Settings(BaseSettings):
 
     data_path: Path = Field(
         default=Path(__file__).resolve().parent / "data" / "temperature_data_extended.csv",
-        description="Filesystem path to the temperature dataset CSV.",
+        description="Temperature dataset CSV, or a directory or glob (e.g. data/regions/*.csv) of CSV shards.",
+    )
+    snapshot_dir: Path | None = Field(
+        default=Path(__file__).resolve().parent / "data" / ".snapshots",
+        description="Directory for binary dataset snapshots reused across restarts and workers.",
+    )
+    mmap_snapshot: bool = Field(
+        default=True,
+        description="Memory-map snapshot arrays read-only so workers share one page-cache copy.",
+    )
+    ingest_chunk_size: int | None = Field(
+        default=None,
+        gt=0,
+        description="Stream the CSV in chunks of this many rows to bound peak memory while ingesting.",
+    )
+    ingest_workers: int | None = Field(
+        default=None,
+        gt=0,
+        description="Processes that parse CSV shards in parallel; defaults to one per CPU, capped at the shard count.",
+    )
+    climatology_baseline: tuple[int, int] = Field(
+        default=(1961, 1990),
+        description="Inclusive reference period for monthly normals and anomalies, e.g. [1961, 1990].",
+    )
+    resident_station_bytes: int | None = Field(
+        default=None,
+        gt=0,
+        description="Load stations on first use, keeping at most this many bytes resident; unset loads all at startup.",
+    )
+    reload_interval: float | None = Field(
+        default=None,
+        gt=0,
+        description="Seconds between checks of the CSVs for changes; hot reload is off when unset.",
+    )
+    response_cache_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Byte budget for cached /temperature-data and /analytics responses; 0 disables caching.",
+    )
+    series_cache_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Byte budget for per-station encoded series reused across station selections; 0 disables it.",
+    )
+    cache_control: str | None = Field(
+        default="no-cache",
+        description=(
+            "Cache-Control sent with read responses; the default makes clients and proxies revalidate via ETag."
+        ),
+    )
+    compute_workers: int = Field(
+        default=4,
+        gt=0,
+        description="Workers that slice, aggregate and encode responses off the event loop.",
+    )
+    compute_processes: bool = Field(
+        default=False,
+        description="Use worker processes (each memory-mapping the dataset snapshot) instead of threads.",
+    )
+    max_pending_requests: int = Field(
+        default=64,
+        gt=0,
+        description="Compute tasks allowed to queue or run at once; further requests get 503 with Retry-After.",
+    )
+    overload_retry_after: int = Field(
+        default=1,
+        ge=0,
+        description="Seconds advertised in Retry-After when requests are shed.",
+    )
+    compression_min_bytes: int | None = Field(
+        default=1024,
+        ge=0,
+        description=(
+            "Compress response bodies of at least this many bytes when the client accepts it; unset to disable."
+        ),
+    )
+    server_timing: bool = Field(
+        default=True,
+        description="Report per-stage durations of each request in a Server-Timing header.",
+    )
+    profile_dir: Path | None = Field(
+        default=None,
+        description="Enables the sampling profiler: requests sent with X-Profile: 1 write folded stacks here.",
+    )
+    admin_token: str | None = Field(
+        default=None,
+        description="Shared secret for /api/admin endpoints (X-Admin-Token header); they are disabled when unset.",
     )
     allowed_origins: list[str] = Field(
         default_factory=lambda: ["http://localhost:5173"],
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from functools import lru_cache
+from functools import lru_cache, partial
 
+from fastapi import Depends
+
+from .compute import ComputeExecutor
 from .config import Settings
 from .services.analytics_service import AnalyticsService
 from .services.data_repository import DataRepository
+from .services.repository_registry import RepositoryRegistry
+from .services.response_cache import ResponseCache
 
 
 @lru_cache
@@ -13,10 +18,45 @@ def get_settings() -> Settings:
 
 
 @lru_cache
-def get_repository() -> DataRepository:
+def get_registry() -> RepositoryRegistry:
     settings = get_settings()
-    return DataRepository(settings.data_path)
+    loader = partial(
+        DataRepository,
+        settings.data_path,
+        snapshot_dir=settings.snapshot_dir,
+        mmap=settings.mmap_snapshot,
+        chunk_size=settings.ingest_chunk_size,
+        workers=settings.ingest_workers,
+        climatology_baseline=settings.climatology_baseline,
+        resident_bytes=settings.resident_station_bytes,
+    )
+    return RepositoryRegistry(settings.data_path, loader, caches=(get_response_cache(), get_series_cache()))
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(get_settings().response_cache_bytes)
+
+
+@lru_cache
+def get_series_cache() -> ResponseCache:
+    return ResponseCache(get_settings().series_cache_bytes)
+
+
+@lru_cache
+def get_compute_executor() -> ComputeExecutor:
+    settings = get_settings()
+    return ComputeExecutor(
+        settings.compute_workers,
+        settings.max_pending_requests,
+        processes=settings.compute_processes,
+        retry_after=settings.overload_retry_after,
+    )
+
+
+def get_repository() -> DataRepository:
+    return get_registry().current()
 
 
-def get_analytics_service() -> AnalyticsService:
-    return AnalyticsService(get_repository())
+def get_analytics_service(repository: DataRepository = Depends(get_repository)) -> AnalyticsService:
+    return AnalyticsService(repository)
@@ -6,8 +6,9 @@ from fastapi import HTTPException
 class ApiException(HTTPException):
     """HTTP exception that preserves the API error envelope."""
 
-    def __init__(self, *, status_code: int, code: str, message: str) -> None:
+    def __init__(self, *, status_code: int, code: str, message: str, headers: dict[str, str] | None = None) -> None:
         super().__init__(
             status_code=status_code,
             detail={"error": {"code": code, "message": message}},
+            headers=headers,
         )
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+"""HTTP validators for the read endpoints.
+
+ETags are digests of the normalized request key, which already carries the
+dataset version, so the same query gets the same tag on every worker and
+after restarts, and a new tag as soon as the CSV changes.
+"""
+
+import hashlib
+from typing import Hashable
+from urllib.parse import urlencode
+
+_ENCODINGS = {"gzip", "br", "zstd"}
+
+
+def entity_tag(key: Hashable) -> str:
+    return '"%s"' % hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def encoded_tag(etag: str, encoding: str) -> str:
+    """Tag for the ``encoding``-compressed variant of the representation tagged ``etag``."""
+
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_encoding(etag: str) -> str:
+    body, dash, encoding = etag[:-1].rpartition("-")
+    return f'{body}"' if dash and encoding in _ENCODINGS else etag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag`` (RFC 9110 §13.1.2).
+
+    A compressed variant's tag matches its uncompressed one: the content is
+    the same, only the Content-Encoding differs.
+    """
+
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(_strip_encoding(candidate.removeprefix("W/")) == etag for candidate in candidates)
+
+
+def canonical_query(params: list[tuple[str, object]]) -> str:
+    """Encode ``params`` in the given order, dropping ``None`` and rendering booleans as ``true``/``false``."""
+
+    pairs = []
+    for name, value in params:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        pairs.append((name, value))
+    return urlencode(pairs, safe=",")
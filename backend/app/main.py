@@ -1,34 +1,59 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from .routers.api import router as api_router
-from .dependencies import get_settings
+from .routers.admin import router as admin_router
+from .routers.api import CACHE_STATUS_HEADER, DATASET_VERSION_HEADER, router as api_router
+from .routers.metrics import router as metrics_router
+from .dependencies import get_compute_executor, get_registry, get_settings
 from .exceptions import ApiException
-
-app = FastAPI(title="Climate Explorer API", version="1.0.0")
+from .telemetry import RequestTelemetryMiddleware
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = get_registry().watch(settings.reload_interval) if settings.reload_interval else None
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        if get_compute_executor.cache_info().currsize:
+            get_compute_executor().shutdown()
+
+
+app = FastAPI(title="Climate Explorer API", version="1.0.0", lifespan=lifespan)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[DATASET_VERSION_HEADER, CACHE_STATUS_HEADER, "ETag", "Server-Timing"],
+)
+
+app.add_middleware(
+    RequestTelemetryMiddleware, server_timing=settings.server_timing, profile_dir=settings.profile_dir
 )
 
 app.include_router(api_router, prefix="/api", tags=["climate"])
+app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
+app.include_router(metrics_router, tags=["monitoring"])
 
 
 @app.exception_handler(ApiException)
 async def api_exception_handler(request: Request, exc: ApiException) -> JSONResponse:
-    return JSONResponse(status_code=exc.status_code, content=exc.detail)
+    return JSONResponse(status_code=exc.status_code, content=exc.detail, headers=exc.headers)
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
+async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
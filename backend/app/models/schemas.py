@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, FieldValidationInfo, field_validator
 
+MAX_TREND_STATIONS = 250
+
 
 class YearRange(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -27,11 +29,23 @@ class StationResponse(BaseModel):
     last_year: int
 
 
+ResponseFormat = Literal["rows", "columns", "arrow", "ndjson"]
+
+
 class TemperatureDataRequest(BaseModel):
     station_ids: list[str]
     mode: Literal["monthly", "annual"]
     include_std_band: bool = Field(default=False)
     year_range: YearRange
+    format: ResponseFormat | None = Field(
+        default=None,
+        description="Response layout; when omitted it is negotiated from the Accept header (default rows).",
+    )
+    max_points: int | None = Field(
+        default=None,
+        ge=4,
+        description="Downsample each series to at most this many points, keeping per-bucket minima and maxima.",
+    )
 
     @field_validator("station_ids")
     @classmethod
@@ -75,6 +89,34 @@ class AnnualTemperatureResponse(BaseModel):
     series: list[AnnualSeries]
 
 
+class MonthlyColumnarSeries(BaseModel):
+    station_id: str
+    year: list[int]
+    month: list[int]
+    temperature: list[float]
+
+
+class MonthlyColumnarResponse(BaseModel):
+    mode: Literal["monthly"]
+    format: Literal["columns"]
+    series: list[MonthlyColumnarSeries]
+
+
+class AnnualColumnarSeries(BaseModel):
+    station_id: str
+    year: list[int]
+    mean: list[float]
+    std: list[float] | None = None
+    upper: list[float] | None = None
+    lower: list[float] | None = None
+
+
+class AnnualColumnarResponse(BaseModel):
+    mode: Literal["annual"]
+    format: Literal["columns"]
+    series: list[AnnualColumnarSeries]
+
+
 class AnalyticsRequest(BaseModel):
     station_ids: list[str]
     year_range: YearRange
@@ -112,6 +154,36 @@ class AnalyticsSummary(BaseModel):
     per_station: list[AnalyticsPerStation]
 
 
+class TrendsRequest(AnalyticsRequest):
+    station_ids: list[str] = Field(
+        max_length=MAX_TREND_STATIONS,
+        description="Stations to fit; Theil–Sen costs years² per station, so selections are capped.",
+    )
+    window: int = Field(default=10, ge=2, le=50, description="Years in each trailing moving average.")
+
+
+class MovingAveragePoint(BaseModel):
+    year: int
+    value: float
+
+
+class StationTrend(BaseModel):
+    station_id: str
+    years_with_data: int
+    ols_slope: float | None = Field(description="Least-squares trend of the annual means, degrees per decade.")
+    theil_sen_slope: float | None = Field(description="Median pairwise trend of the annual means, degrees per decade.")
+    mean_anomaly: float | None = Field(
+        description="Mean departure from the baseline normals over the selection; null without baseline data."
+    )
+    moving_average: list[MovingAveragePoint]
+
+
+class TrendsResponse(BaseModel):
+    baseline: YearRange
+    window: int
+    per_station: list[StationTrend]
+
+
 class ErrorDetail(BaseModel):
     code: str
     message: str
@@ -119,3 +191,104 @@ class ErrorDetail(BaseModel):
 
 class ErrorResponse(BaseModel):
     error: ErrorDetail
+
+
+class RollupRequest(BaseModel):
+    station_ids: list[str]
+    year_range: YearRange
+
+    @field_validator("station_ids")
+    @classmethod
+    def ensure_station_ids(cls, v: list[str]):
+        if not v:
+            raise ValueError("station_ids must not be empty")
+        return v
+
+
+class ClimatologyRequest(RollupRequest):
+    mode: Literal["monthly", "annual"] = Field(default="annual", description="Granularity of the anomaly points.")
+
+
+class DecadePoint(BaseModel):
+    decade: int
+    mean: float
+    min: float
+    max: float
+    count: int
+
+
+class DecadalSeries(BaseModel):
+    station_id: str
+    points: list[DecadePoint]
+
+
+class DecadalResponse(BaseModel):
+    series: list[DecadalSeries]
+
+
+class SeasonalPoint(BaseModel):
+    year: int
+    djf: float | None
+    mam: float | None
+    jja: float | None
+    son: float | None
+
+
+class SeasonalSeries(BaseModel):
+    station_id: str
+    points: list[SeasonalPoint]
+
+
+class SeasonalResponse(BaseModel):
+    series: list[SeasonalSeries]
+
+
+class MonthlyAnomalyPoint(BaseModel):
+    year: int
+    month: int
+    anomaly: float | None
+
+
+class AnnualAnomalyPoint(BaseModel):
+    year: int
+    anomaly: float | None
+
+
+class ClimatologySeries(BaseModel):
+    station_id: str
+    has_baseline: bool = Field(
+        description="False when the station has no baseline data; its normals and anomalies are then null."
+    )
+    normals: list[float | None] = Field(description="Baseline mean for each calendar month, January first.")
+    points: list[MonthlyAnomalyPoint] | list[AnnualAnomalyPoint]
+
+
+class ClimatologyResponse(BaseModel):
+    mode: Literal["monthly", "annual"]
+    baseline: YearRange
+    series: list[ClimatologySeries]
+
+
+class TemperatureDataQuery(TemperatureDataRequest):
+    type: Literal["temperature-data"]
+
+
+class AnalyticsQuery(AnalyticsRequest):
+    type: Literal["analytics"]
+
+
+class BatchRequest(BaseModel):
+    queries: list[Annotated[TemperatureDataQuery | AnalyticsQuery, Field(discriminator="type")]] = Field(
+        min_length=1,
+        max_length=50,
+        description="Sub-queries answered against one dataset version, in order.",
+    )
+
+
+class BatchResult(BaseModel):
+    status: int
+    body: Any = Field(description="The sub-query's response body, or its error envelope.")
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
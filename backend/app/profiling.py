@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+"""Opt-in sampling profiler for single requests.
+
+While active, a background thread snapshots the Python stacks of every other
+thread at a fixed interval and counts identical stacks. The result is written
+in the folded-stack format read by ``flamegraph.pl`` and speedscope. Threads
+that are parked in the event loop's selector or waiting for pool work are
+skipped, so idle time does not swamp the profile; work from other concurrent
+requests is still sampled, so profile on a quiet server. Long C calls that
+hold the GIL, such as encoding a large JSON body, cannot be interrupted and
+show up as a single sample; an external sampler such as py-spy sees those.
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+# Leaf frames from these modules mean the thread is idle, not working.
+_IDLE_MODULES = ("selectors.py", "threading.py", "queue.py", "thread.py")
+
+
+def _label(frame: FrameType) -> str:
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.001):
+        self._interval = interval
+        self._stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def __enter__(self) -> SamplingProfiler:
+        # The sampler needs the GIL once per interval; the default 5 ms switch
+        # interval would otherwise cap the sampling rate.
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self._interval))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self._interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame))
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self._stacks.values())
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def write(self, target: Path) -> Path:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(self.folded())
+        return target
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hmac
+
+from fastapi import APIRouter, Depends, Header, status
+
+from ..config import Settings
+from ..dependencies import get_registry, get_response_cache, get_series_cache, get_settings
+from ..exceptions import ApiException
+from ..services.repository_registry import RepositoryRegistry
+from ..services.response_cache import ResponseCache
+
+router = APIRouter()
+
+
+def require_admin(
+    settings: Settings = Depends(get_settings),
+    x_admin_token: str | None = Header(default=None),
+) -> None:
+    if settings.admin_token is None:
+        raise ApiException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            code="NOT_FOUND",
+            message="Admin endpoints are disabled.",
+        )
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise ApiException(status_code=status.HTTP_403_FORBIDDEN, code="FORBIDDEN", message="Invalid admin token.")
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+def reload_dataset(registry: RepositoryRegistry = Depends(get_registry)) -> dict[str, str | bool]:
+    previous = registry.current().version
+    current = registry.reload().version
+    return {"previous_version": previous, "version": current, "changed": previous != current}
+
+
+def _cache_stats(cache: ResponseCache) -> dict[str, int | float]:
+    stats = cache.stats()
+    return {
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "evictions": stats.evictions,
+        "hit_ratio": stats.hit_ratio,
+        "entries": stats.entries,
+        "size_bytes": stats.size_bytes,
+        "max_bytes": stats.max_bytes,
+    }
+
+
+@router.get("/cache", dependencies=[Depends(require_admin)])
+def cache_stats(
+    response_cache: ResponseCache = Depends(get_response_cache),
+    series_cache: ResponseCache = Depends(get_series_cache),
+) -> dict[str, dict[str, int | float]]:
+    return {"responses": _cache_stats(response_cache), "series": _cache_stats(series_cache)}
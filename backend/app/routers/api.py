@@ -1,78 +1,240 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, status
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterable, Iterator, Literal
 
-from ..dependencies import get_analytics_service, get_repository
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from .. import tasks
+from ..compression import compress, negotiate_encoding
+from ..compute import ComputeExecutor, ComputeLease, ExecutorSaturated
+from ..config import Settings
+from ..dependencies import (
+    get_compute_executor,
+    get_repository,
+    get_response_cache,
+    get_series_cache,
+    get_settings,
+)
 from ..exceptions import ApiException
+from ..http_cache import canonical_query, encoded_tag, entity_tag, etag_matches
 from ..models.schemas import (
     AnalyticsRequest,
     AnalyticsResponse,
-    AnnualPoint,
-    AnnualSeries,
+    AnnualColumnarResponse,
     AnnualTemperatureResponse,
+    BatchRequest,
+    BatchResponse,
+    ClimatologyRequest,
+    ClimatologyResponse,
+    DecadalResponse,
     ErrorResponse,
-    MonthlyPoint,
-    MonthlySeries,
+    MonthlyColumnarResponse,
     MonthlyTemperatureResponse,
+    ResponseFormat,
+    RollupRequest,
+    SeasonalResponse,
     StationResponse,
     TemperatureDataRequest,
-    YearRange,
+    TrendsRequest,
+    TrendsResponse,
 )
-from ..services.analytics_service import AnalyticsService
-from ..services.data_repository import DataRepository
-from ..services.exceptions import InvalidStationError, InvalidYearRangeError, NoDataError
+from ..serialization import (
+    ARROW_AVAILABLE,
+    ARROW_STREAM_MEDIA_TYPE,
+    COLUMNS_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    assemble_series,
+)
+from ..services.data_repository import DataRepository, StationSelection
+from ..services.exceptions import InvalidStationError, InvalidYearRangeError, NoBaselineDataError, NoDataError
+from ..services.response_cache import CachedResponse, ResponseCache
+from ..telemetry import span
 
 router = APIRouter()
 
+DATASET_VERSION_HEADER = "X-Dataset-Version"
+CACHE_STATUS_HEADER = "X-Cache"
 
-def _dedupe_station_ids(station_ids: list[str]) -> list[str]:
-    seen: dict[str, None] = {}
-    for station_id in station_ids:
-        seen.setdefault(station_id, None)
-    return list(seen.keys())
+TEMPERATURE_DATA_MODEL = (
+    MonthlyTemperatureResponse | AnnualTemperatureResponse | MonthlyColumnarResponse | AnnualColumnarResponse
+)
+TEMPERATURE_DATA_RESPONSES = {
+    200: {"content": {COLUMNS_MEDIA_TYPE: {}, ARROW_STREAM_MEDIA_TYPE: {}, NDJSON_MEDIA_TYPE: {}}},
+    304: {"description": "The representation matching If-None-Match is still current."},
+    400: {"model": ErrorResponse, "description": "Invalid user request."},
+    404: {"model": ErrorResponse, "description": "No data found for the selection."},
+    406: {"model": ErrorResponse, "description": "Requested response format is unavailable."},
+    503: {"model": ErrorResponse, "description": "Server is at capacity; retry after the Retry-After delay."},
+}
+ANALYTICS_RESPONSES = {
+    304: {"description": "The representation matching If-None-Match is still current."},
+    400: {"model": ErrorResponse, "description": "Invalid station selection."},
+    404: {"model": ErrorResponse, "description": "No analytics data available."},
+    422: {"model": ErrorResponse, "description": "Invalid year range."},
+    503: {"model": ErrorResponse, "description": "Server is at capacity; retry after the Retry-After delay."},
+}
 
 
-@router.get("/stations", response_model=list[StationResponse])
-def list_stations(repository: DataRepository = Depends(get_repository)) -> list[StationResponse]:
-    return [
-        StationResponse(
-            id=meta.station_id,
-            name=meta.name,
-            first_year=meta.first_year,
-            last_year=meta.last_year,
-        )
-        for meta in repository.get_stations()
-    ]
+# Alternative layouts selectable through Accept, preferred in this order when weighted equally.
+FORMAT_MEDIA_TYPES: dict[ResponseFormat, str] = {
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+    "columns": COLUMNS_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+}
 
 
-@router.post(
-    "/temperature-data",
-    response_model=MonthlyTemperatureResponse | AnnualTemperatureResponse,
-    responses={
-        400: {"model": ErrorResponse, "description": "Invalid user request."},
-        404: {"model": ErrorResponse, "description": "No data found for the selection."},
-    },
-)
-def get_temperature_data(
-    payload: TemperatureDataRequest,
-    repository: DataRepository = Depends(get_repository),
-):
-    station_ids = _dedupe_station_ids(payload.station_ids)
-    year_from = payload.year_range.from_year
-    year_to = payload.year_range.to_year
+def _media_ranges(accept: str) -> dict[str, float]:
+    """Media ranges of an Accept header with their ``q`` weights (1 when absent, 0 when malformed)."""
 
-    if payload.mode == "monthly" and payload.include_std_band:
-        raise ApiException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            code="INVALID_PAYLOAD",
-            message="Standard deviation bands are only available for annual mode.",
-        )
+    ranges: dict[str, float] = {}
+    for item in accept.split(","):
+        media_range, *parameters = item.split(";")
+        media_range = media_range.strip().lower()
+        if not media_range:
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_range] = max(quality, ranges.get(media_range, 0.0))
+    return ranges
+
+
+def _negotiate_format(requested: ResponseFormat | None, accept: str | None) -> ResponseFormat:
+    """The body's ``format`` if given, else the layout with the highest ``q`` in ``Accept``.
+
+    Alternative layouts must be named explicitly; wildcards only cover the
+    default row layout, which also wins when nothing acceptable is listed.
+    Ranges with ``q=0`` are refused, and an alternative layout weighted like
+    ``application/json`` is preferred over it.
+    """
+
+    if requested is not None:
+        return requested
+    if not accept:
+        return "rows"
+    ranges = _media_ranges(accept)
+    json_ranges = [name for name in ("application/json", "application/*", "*/*") if name in ranges]
+    choice: ResponseFormat = "rows"
+    choice_quality = ranges[json_ranges[0]] if json_ranges else 0.0
+    for response_format, media_type in FORMAT_MEDIA_TYPES.items():
+        quality = ranges.get(media_type, 0.0)
+        if quality > 0 and (quality > choice_quality or (choice == "rows" and quality == choice_quality)):
+            choice, choice_quality = response_format, quality
+    return choice
+
+
+def _validator_headers(settings: Settings, version: str, key: tuple, *vary: str) -> dict[str, str]:
+    """Headers shared by a read endpoint's 200 and 304 responses, so caches key both the same way."""
 
+    headers = {DATASET_VERSION_HEADER: version, "ETag": entity_tag(key)}
+    if settings.cache_control:
+        headers["Cache-Control"] = settings.cache_control
+    if settings.compression_min_bytes is not None:
+        vary = (*vary, "Accept-Encoding")
+    if vary:
+        headers["Vary"] = ", ".join(vary)
+    return headers
+
+
+def _not_modified(headers: dict[str, str], if_none_match: str, encoding: str | None) -> Response:
+    """304 for a matched ``If-None-Match``, echoing the tag of the variant the client holds."""
+
+    if encoding is not None and encoded_tag(headers["ETag"], encoding) in if_none_match:
+        headers = {**headers, "ETag": encoded_tag(headers["ETag"], encoding)}
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def _content_encoding(
+    settings: Settings = Depends(get_settings),
+    accept_encoding: str | None = Header(default=None),
+) -> str | None:
+    if settings.compression_min_bytes is None:
+        return None
+    return negotiate_encoding(accept_encoding)
+
+
+async def _cached_response(
+    entry: CachedResponse,
+    headers: dict[str, str],
+    cache_status: str,
+    cache: ResponseCache,
+    cache_key: tuple,
+    executor: ComputeExecutor,
+    settings: Settings,
+    encoding: str | None,
+) -> Response:
+    """Send ``entry``, compressed for ``encoding`` when it is large enough.
+
+    Compressed variants are cached next to the plain body, so only the first
+    request per encoding pays for compression, and that runs off the event
+    loop. When the executor is saturated the body goes out uncompressed
+    rather than being refused.
+    """
+
+    headers = {**headers, CACHE_STATUS_HEADER: cache_status}
+    if encoding is None or len(entry.body) < settings.compression_min_bytes:
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    variant_key = (cache_key, encoding)
+    with span("cache"):
+        variant = cache.get(variant_key)
+    if variant is None:
+        try:
+            with span("compress"):
+                body = await executor.offload(compress, entry.body, encoding)
+        except ExecutorSaturated:
+            return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+        variant = CachedResponse(body=body, media_type=entry.media_type)
+        cache.put(variant_key, variant)
+
+    headers["Content-Encoding"] = encoding
+    headers["ETag"] = encoded_tag(headers["ETag"], encoding)
+    return Response(content=variant.body, media_type=variant.media_type, headers=headers)
+
+
+def _parse_query(model: type[BaseModel], data: dict) -> BaseModel:
     try:
-        if payload.mode == "monthly":
-            df = repository.filter_monthly(station_ids, year_from, year_to)
-        else:
-            df = repository.filter_annual(station_ids, year_from, year_to)
+        return model.model_validate(data)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False))
+
+
+def _split_station_ids(station_ids: str) -> list[str]:
+    return [station_id for station_id in station_ids.split(",") if station_id]
+
+
+def _canonical_redirect(request: Request, params: list[tuple[str, object]]) -> RedirectResponse | None:
+    """Redirect to the one spelling of this query that shared caches should store."""
+
+    query = canonical_query(params)
+    if request.url.query == query:
+        return None
+    return RedirectResponse(f"{request.url.path}?{query}", status_code=status.HTTP_308_PERMANENT_REDIRECT)
+
+
+def _no_data(message: str = "No data for the selected stations and year range.") -> ApiException:
+    return ApiException(status_code=status.HTTP_404_NOT_FOUND, code="NO_DATA", message=message)
+
+
+@contextmanager
+def _service_errors() -> Iterator[None]:
+    """Translate repository and executor errors raised by compute tasks."""
+
+    try:
+        yield
+    except NoBaselineDataError as exc:
+        raise _no_data(str(exc))
+    except NoDataError:
+        raise _no_data()
     except InvalidStationError as exc:
         raise ApiException(status_code=status.HTTP_400_BAD_REQUEST, code="INVALID_STATION", message=str(exc))
     except InvalidYearRangeError as exc:
@@ -81,97 +243,651 @@ def get_temperature_data(
             code="INVALID_YEAR_RANGE",
             message=str(exc),
         )
+    except ExecutorSaturated as exc:
+        raise ApiException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            code="OVERLOADED",
+            message="The server is busy; retry shortly.",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+
+def _select(repository: DataRepository, station_ids: list[str]) -> StationSelection:
+    """Validate the requested ids once; the selection is passed down to the service and repository."""
+
+    with _service_errors():
+        return repository.select(station_ids)
+
+
+def _temperature_data_key(
+    selection: StationSelection, payload: TemperatureDataRequest, response_format: ResponseFormat
+) -> tuple:
+    # Series come back ordered by station, so request order and duplicates
+    # do not change the body and are normalized out of the key.
+    return (
+        "temperature-data",
+        selection.version,
+        selection.station_ids,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+        payload.mode,
+        payload.include_std_band,
+        response_format,
+        payload.max_points,
+    )
 
-    if df.empty:
+
+def _analytics_key(selection: StationSelection, payload: AnalyticsRequest) -> tuple:
+    return (
+        "analytics",
+        selection.version,
+        selection.station_ids,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+    )
+
+
+def _check_temperature_request(payload: TemperatureDataRequest, response_format: ResponseFormat) -> None:
+    if payload.mode == "monthly" and payload.include_std_band:
         raise ApiException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            code="NO_DATA",
-            message="No data for the selected stations and year range.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            code="INVALID_PAYLOAD",
+            message="Standard deviation bands are only available for annual mode.",
+        )
+    if response_format == "arrow" and not ARROW_AVAILABLE:
+        raise ApiException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            code="UNSUPPORTED_FORMAT",
+            message="Arrow responses require pyarrow to be installed on the server.",
         )
 
-    if payload.mode == "monthly":
-        series = []
-        for station_id, group in df.groupby("station_id"):
-            points = [
-                MonthlyPoint(
-                    year=int(row.year),
-                    month=int(row.month),
-                    temperature=float(row.temperature),
-                )
-                for row in group.itertuples()
-            ]
-            series.append(MonthlySeries(station_id=station_id, points=points))
-
-        return MonthlyTemperatureResponse(mode="monthly", series=series)
-
-    series = []
-    for station_id, group in df.groupby("station_id"):
-        points = []
-        for row in group.itertuples():
-            if payload.include_std_band:
-                points.append(
-                    AnnualPoint(
-                        year=int(row.year),
-                        mean=float(row.mean),
-                        std=float(row.std),
-                        upper=float(row.upper),
-                        lower=float(row.lower),
-                    )
-                )
+
+async def _cached_fragments(
+    series_cache: ResponseCache,
+    station_ids: Iterable[str],
+    key: Callable[[str], tuple],
+    encode: Callable[[list[str]], Awaitable[dict[str, bytes]]],
+    *,
+    store: bool = True,
+) -> list[bytes]:
+    """Per-station body fragments in station order, encoding only the stations not cached yet.
+
+    Stations without data are cached as empty fragments and left out. With
+    ``store=False`` cached fragments are still used but new ones are not kept.
+    """
+
+    fragments: dict[str, bytes] = {}
+    missing = []
+    with span("cache"):
+        for station_id in station_ids:
+            cached = series_cache.get(key(station_id))
+            if cached is None:
+                missing.append(station_id)
             else:
-                points.append(
-                    AnnualPoint(
-                        year=int(row.year),
-                        mean=float(row.mean),
-                        std=None,
-                        upper=None,
-                        lower=None,
-                    )
+                fragments[station_id] = cached.body
+
+    if missing:
+        with _service_errors():
+            encoded = await encode(missing)
+        for station_id, fragment in encoded.items():
+            fragments[station_id] = fragment
+            if store:
+                series_cache.put(key(station_id), CachedResponse(fragment, "application/json"))
+
+    return [fragments[station_id] for station_id in sorted(fragments) if fragments[station_id]]
+
+
+async def _series_fragments(
+    repository: DataRepository,
+    series_cache: ResponseCache,
+    executor: ComputeExecutor | ComputeLease,
+    payload: TemperatureDataRequest,
+    station_ids: Iterable[str],
+    columnar: bool,
+    *,
+    store: bool = True,
+) -> list[bytes]:
+    """Encoded ``series`` entries for the selection, in station order.
+
+    Stations are cached one by one, so widening a selection only slices and
+    encodes the stations that were not served before.
+    """
+
+    def fragment_key(station_id: str) -> tuple:
+        return (
+            repository.version,
+            station_id,
+            payload.year_range.from_year,
+            payload.year_range.to_year,
+            payload.mode,
+            payload.include_std_band,
+            columnar,
+            payload.max_points,
+        )
+
+    async def encode(missing: list[str]) -> dict[str, bytes]:
+        return await executor.run(tasks.encode_fragments, repository, payload, missing, columnar)
+
+    return await _cached_fragments(series_cache, station_ids, fragment_key, encode, store=store)
+
+
+async def _ndjson_response(
+    repository: DataRepository,
+    series_cache: ResponseCache,
+    executor: ComputeExecutor,
+    payload: TemperatureDataRequest,
+    selection: StationSelection,
+    headers: dict[str, str],
+) -> StreamingResponse:
+    """Stream one row-layout series per line, encoding a station only when it is due.
+
+    The selection is validated before the first byte so errors still get a
+    proper status; the stream then holds one executor slot until it ends.
+    Cached series are reused, but streamed ones are not added to the cache:
+    a bulk export would otherwise evict the interactive working set.
+    """
+
+    with _service_errors():
+        lease = executor.lease()
+    try:
+        with _service_errors():
+            stations = await lease.run(tasks.stations_with_data, repository, payload, selection)
+        if not stations:
+            raise _no_data()
+    except BaseException:
+        lease.release()
+        raise
+
+    async def lines():
+        try:
+            for station_id in stations:
+                fragments = await _series_fragments(
+                    repository, series_cache, lease, payload, [station_id], False, store=False
                 )
-        series.append(AnnualSeries(station_id=station_id, points=points))
+                for fragment in fragments:
+                    yield fragment + b"\n"
+        finally:
+            lease.release()
 
-    return AnnualTemperatureResponse(mode="annual", series=series)
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
 
 
-@router.post(
+@router.get("/stations", response_model=list[StationResponse], responses={304: {"description": "Not modified."}})
+async def list_stations(
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """All stations; the list is encoded on the executor once per dataset version and cached."""
+
+    return await _computed_response(
+        ("stations", repository.version),
+        repository,
+        cache,
+        executor,
+        settings,
+        if_none_match,
+        encoding,
+        tasks.render_stations,
+    )
+
+
+async def _temperature_data(
+    payload: TemperatureDataRequest,
+    repository: DataRepository,
+    cache: ResponseCache,
+    series_cache: ResponseCache,
+    executor: ComputeExecutor,
+    settings: Settings,
+    accept: str | None,
+    if_none_match: str | None,
+    encoding: str | None,
+) -> Response:
+    response_format = _negotiate_format(payload.format, accept)
+    _check_temperature_request(payload, response_format)
+    selection = _select(repository, payload.station_ids)
+    cache_key = _temperature_data_key(selection, payload, response_format)
+    headers = _validator_headers(settings, repository.version, cache_key, "Accept")
+    if etag_matches(if_none_match, headers["ETag"]):
+        return _not_modified(headers, if_none_match, encoding)
+    with span("cache"):
+        cached = cache.get(cache_key)
+    if cached is not None:
+        return await _cached_response(cached, headers, "HIT", cache, cache_key, executor, settings, encoding)
+
+    # Encoded straight from the repository columns; the routes' response_model
+    # only documents the schema, FastAPI does not re-validate a raw Response.
+    if response_format == "ndjson":
+        return await _ndjson_response(repository, series_cache, executor, payload, selection, headers)
+    if response_format == "arrow":
+        with _service_errors():
+            body = await executor.run(tasks.encode_arrow, repository, payload, selection)
+        if body is None:
+            raise _no_data()
+        media_type = ARROW_STREAM_MEDIA_TYPE
+    else:
+        columnar = response_format == "columns"
+        fragments = await _series_fragments(repository, series_cache, executor, payload, selection, columnar)
+        if not fragments:
+            raise _no_data()
+        body = assemble_series(payload.mode, fragments, columnar)
+        media_type = COLUMNS_MEDIA_TYPE if columnar else "application/json"
+
+    entry = CachedResponse(body=body, media_type=media_type)
+    cache.put(cache_key, entry)
+    return await _cached_response(entry, headers, "MISS", cache, cache_key, executor, settings, encoding)
+
+
+@router.post("/temperature-data", response_model=TEMPERATURE_DATA_MODEL, responses=TEMPERATURE_DATA_RESPONSES)
+async def get_temperature_data(
+    payload: TemperatureDataRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    series_cache: ResponseCache = Depends(get_series_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    return await _temperature_data(
+        payload, repository, cache, series_cache, executor, settings, accept, if_none_match, encoding
+    )
+
+
+@router.get(
+    "/temperature-data",
+    response_model=TEMPERATURE_DATA_MODEL,
+    responses={**TEMPERATURE_DATA_RESPONSES, 308: {"description": "Redirect to the canonical query string."}},
+)
+async def query_temperature_data(
+    request: Request,
+    station_ids: str = Query(description="Comma-separated station ids."),
+    mode: Literal["monthly", "annual"] = Query(),
+    year_from: int = Query(alias="from"),
+    year_to: int = Query(alias="to"),
+    include_std_band: bool = False,
+    format: ResponseFormat | None = None,
+    max_points: int | None = None,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    series_cache: ResponseCache = Depends(get_series_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """Cacheable GET form of ``POST /temperature-data``.
+
+    Non-canonical query strings (unsorted or repeated station ids, default
+    values spelled out, different parameter order) are redirected to the
+    canonical URL so proxies keep one entry per distinct selection.
+    """
+
+    payload = _parse_query(
+        TemperatureDataRequest,
+        {
+            "station_ids": _split_station_ids(station_ids),
+            "mode": mode,
+            "include_std_band": include_std_band,
+            "year_range": {"from": year_from, "to": year_to},
+            "format": format,
+            "max_points": max_points,
+        },
+    )
+    redirect = _canonical_redirect(
+        request,
+        [
+            ("station_ids", ",".join(sorted(set(payload.station_ids)))),
+            ("mode", payload.mode),
+            ("from", payload.year_range.from_year),
+            ("to", payload.year_range.to_year),
+            ("include_std_band", payload.include_std_band or None),
+            ("format", payload.format),
+            ("max_points", payload.max_points),
+        ],
+    )
+    if redirect is not None:
+        return redirect
+    return await _temperature_data(
+        payload, repository, cache, series_cache, executor, settings, accept, if_none_match, encoding
+    )
+
+
+async def _computed_response(
+    cache_key: tuple,
+    repository: DataRepository,
+    cache: ResponseCache,
+    executor: ComputeExecutor,
+    settings: Settings,
+    if_none_match: str | None,
+    encoding: str | None,
+    task: Callable[..., bytes],
+    *args: object,
+) -> Response:
+    """Serve a JSON body rendered by ``task`` on the executor, through the ETag check and response cache."""
+
+    headers = _validator_headers(settings, repository.version, cache_key)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return _not_modified(headers, if_none_match, encoding)
+    with span("cache"):
+        cached = cache.get(cache_key)
+    if cached is not None:
+        return await _cached_response(cached, headers, "HIT", cache, cache_key, executor, settings, encoding)
+
+    with _service_errors():
+        body = await executor.run(task, repository, *args)
+
+    entry = CachedResponse(body=body, media_type="application/json")
+    cache.put(cache_key, entry)
+    return await _cached_response(entry, headers, "MISS", cache, cache_key, executor, settings, encoding)
+
+
+async def _analytics(
+    payload: AnalyticsRequest,
+    repository: DataRepository,
+    cache: ResponseCache,
+    executor: ComputeExecutor,
+    settings: Settings,
+    if_none_match: str | None,
+    encoding: str | None,
+) -> Response:
+    selection = _select(repository, payload.station_ids)
+    return await _computed_response(
+        _analytics_key(selection, payload),
+        repository,
+        cache,
+        executor,
+        settings,
+        if_none_match,
+        encoding,
+        tasks.render_analytics,
+        selection,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+    )
+
+
+@router.post("/analytics", response_model=AnalyticsResponse, responses=ANALYTICS_RESPONSES)
+async def get_analytics(
+    payload: AnalyticsRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    return await _analytics(payload, repository, cache, executor, settings, if_none_match, encoding)
+
+
+@router.get(
     "/analytics",
     response_model=AnalyticsResponse,
+    responses={**ANALYTICS_RESPONSES, 308: {"description": "Redirect to the canonical query string."}},
+)
+async def query_analytics(
+    request: Request,
+    station_ids: str = Query(description="Comma-separated station ids."),
+    year_from: int = Query(alias="from"),
+    year_to: int = Query(alias="to"),
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """Cacheable GET form of ``POST /analytics``; see :func:`query_temperature_data`."""
+
+    payload = _parse_query(
+        AnalyticsRequest,
+        {"station_ids": _split_station_ids(station_ids), "year_range": {"from": year_from, "to": year_to}},
+    )
+    redirect = _canonical_redirect(
+        request,
+        [
+            ("station_ids", ",".join(sorted(set(payload.station_ids)))),
+            ("from", payload.year_range.from_year),
+            ("to", payload.year_range.to_year),
+        ],
+    )
+    if redirect is not None:
+        return redirect
+    return await _analytics(payload, repository, cache, executor, settings, if_none_match, encoding)
+
+
+@router.post("/analytics/trends", response_model=TrendsResponse, responses=ANALYTICS_RESPONSES)
+async def get_trends(
+    payload: TrendsRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    series_cache: ResponseCache = Depends(get_series_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """Warming trends of the annual means, plus mean anomaly and moving averages per station.
+
+    Statistics are computed for all uncached stations in one batch and cached
+    per station and range, like temperature-data series.
+    """
+
+    year_from = payload.year_range.from_year
+    year_to = payload.year_range.to_year
+    baseline = repository.climatology_baseline
+    selection = _select(repository, payload.station_ids)
+    cache_key = ("trends", selection.version, baseline, selection.station_ids, year_from, year_to, payload.window)
+    headers = _validator_headers(settings, repository.version, cache_key)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return _not_modified(headers, if_none_match, encoding)
+    with span("cache"):
+        cached = cache.get(cache_key)
+    if cached is not None:
+        return await _cached_response(cached, headers, "HIT", cache, cache_key, executor, settings, encoding)
+
+    def fragment_key(station_id: str) -> tuple:
+        return ("trends", repository.version, baseline, station_id, year_from, year_to, payload.window)
+
+    async def encode(missing: list[str]) -> dict[str, bytes]:
+        return await executor.run(tasks.encode_trend_fragments, repository, missing, year_from, year_to, payload.window)
+
+    fragments = await _cached_fragments(series_cache, selection, fragment_key, encode)
+    if not fragments:
+        raise _no_data()
+
+    head = b'{"baseline":{"from":%d,"to":%d},"window":%d,"per_station":[' % (*baseline, payload.window)
+    entry = CachedResponse(body=head + b",".join(fragments) + b"]}", media_type="application/json")
+    cache.put(cache_key, entry)
+    return await _cached_response(entry, headers, "MISS", cache, cache_key, executor, settings, encoding)
+
+
+def _rollup_key(
+    kind: str, repository: DataRepository, selection: StationSelection, payload: RollupRequest, *extra: object
+) -> tuple:
+    return (
+        kind,
+        selection.version,
+        repository.climatology_baseline,
+        selection.station_ids,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+        *extra,
+    )
+
+
+@router.post("/rollups/decadal", response_model=DecadalResponse, responses=ANALYTICS_RESPONSES)
+async def get_decadal(
+    payload: RollupRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """Mean, extremes and month count per calendar decade, clipped to the year range."""
+
+    selection = _select(repository, payload.station_ids)
+    return await _computed_response(
+        _rollup_key("decadal", repository, selection, payload),
+        repository,
+        cache,
+        executor,
+        settings,
+        if_none_match,
+        encoding,
+        tasks.render_decadal,
+        selection,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+    )
+
+
+@router.post("/rollups/seasonal", response_model=SeasonalResponse, responses=ANALYTICS_RESPONSES)
+async def get_seasonal(
+    payload: RollupRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """Seasonal means per year; DJF counts the preceding December and needs all three months."""
+
+    selection = _select(repository, payload.station_ids)
+    return await _computed_response(
+        _rollup_key("seasonal", repository, selection, payload),
+        repository,
+        cache,
+        executor,
+        settings,
+        if_none_match,
+        encoding,
+        tasks.render_seasonal,
+        selection,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+    )
+
+
+@router.post("/rollups/climatology", response_model=ClimatologyResponse, responses=ANALYTICS_RESPONSES)
+async def get_climatology(
+    payload: ClimatologyRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
+    settings: Settings = Depends(get_settings),
+    if_none_match: str | None = Header(default=None),
+    encoding: str | None = Depends(_content_encoding),
+):
+    """Monthly normals over the configured baseline and anomalies against them.
+
+    Stations without baseline data are flagged with ``has_baseline: false``;
+    when no selected station has any, the request fails with NO_DATA.
+    """
+
+    selection = _select(repository, payload.station_ids)
+    return await _computed_response(
+        _rollup_key("climatology", repository, selection, payload, payload.mode),
+        repository,
+        cache,
+        executor,
+        settings,
+        if_none_match,
+        encoding,
+        tasks.render_climatology,
+        selection,
+        payload.year_range.from_year,
+        payload.year_range.to_year,
+        payload.mode,
+    )
+
+
+def _batch_result(status_code: int, body: bytes) -> bytes:
+    return b'{"status":%d,"body":%s}' % (status_code, body)
+
+
+def _batch_error(exc: ApiException) -> bytes:
+    return _batch_result(exc.status_code, JSONResponse(content=exc.detail).body)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
     responses={
-        400: {"model": ErrorResponse, "description": "Invalid station selection."},
-        404: {"model": ErrorResponse, "description": "No analytics data available."},
-        422: {"model": ErrorResponse, "description": "Invalid year range."},
+        503: {"model": ErrorResponse, "description": "Server is at capacity; retry after the Retry-After delay."}
     },
 )
-def get_analytics(
-    payload: AnalyticsRequest,
-    analytics_service: AnalyticsService = Depends(get_analytics_service),
+async def run_batch(
+    payload: BatchRequest,
+    repository: DataRepository = Depends(get_repository),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: ComputeExecutor = Depends(get_compute_executor),
 ):
-    try:
-        summary = analytics_service.summarize(
-            payload.station_ids,
-            payload.year_range.from_year,
-            payload.year_range.to_year,
-        )
-    except NoDataError:
-        raise ApiException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            code="NO_DATA",
-            message="No data for the selected stations and year range.",
-        )
-    except InvalidStationError as exc:
-        raise ApiException(status_code=status.HTTP_400_BAD_REQUEST, code="INVALID_STATION", message=str(exc))
-    except InvalidYearRangeError as exc:
-        raise ApiException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            code="INVALID_YEAR_RANGE",
-            message=str(exc),
-        )
+    """Answer several temperature-data/analytics queries against one dataset version.
 
-    return AnalyticsResponse(
-        selected_period=summary.selected_period,
-        stations_analyzed=summary.stations_analyzed,
-        overall_mean_temperature=summary.overall_mean_temperature,
-        overall_min_temperature=summary.overall_min_temperature,
-        overall_max_temperature=summary.overall_max_temperature,
-        per_station=summary.per_station,
-    )
+    Each result carries the status and body the standalone endpoint would
+    have returned (rows or columns layout; Arrow and NDJSON are not embeddable). Cached
+    answers are reused, and the rest are computed in one task that slices
+    overlapping selections once.
+    """
+
+    results: list[bytes | None] = []
+    pending: list[tuple[int, tuple, tuple[TemperatureDataRequest, bool] | AnalyticsRequest]] = []
+    for index, query in enumerate(payload.queries):
+        if query.type == "temperature-data":
+            response_format = query.format or "rows"
+            try:
+                if response_format in ("arrow", "ndjson"):
+                    raise ApiException(
+                        status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                        code="UNSUPPORTED_FORMAT",
+                        message=f"{response_format} responses cannot be embedded in a batch.",
+                    )
+                _check_temperature_request(query, response_format)
+                selection = _select(repository, query.station_ids)
+            except ApiException as exc:
+                results.append(_batch_error(exc))
+                continue
+            cache_key = _temperature_data_key(selection, query, response_format)
+            task_query = (query, response_format == "columns")
+        else:
+            try:
+                selection = _select(repository, query.station_ids)
+            except ApiException as exc:
+                results.append(_batch_error(exc))
+                continue
+            cache_key = _analytics_key(selection, query)
+            task_query = query
+
+        with span("cache"):
+            cached = cache.get(cache_key)
+        if cached is not None:
+            results.append(_batch_result(status.HTTP_200_OK, cached.body))
+        else:
+            results.append(None)
+            pending.append((index, cache_key, task_query))
+
+    if pending:
+        with _service_errors():
+            outcomes = await executor.run(tasks.run_batch, repository, [task_query for _, _, task_query in pending])
+        for (index, cache_key, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                try:
+                    with _service_errors():
+                        raise outcome
+                except ApiException as exc:
+                    results[index] = _batch_error(exc)
+            else:
+                cache.put(cache_key, CachedResponse(outcome, "application/json"))
+                results[index] = _batch_result(status.HTTP_200_OK, outcome)
+
+    body = b'{"results":[' + b",".join(results) + b"]}"
+    return Response(content=body, media_type="application/json", headers={DATASET_VERSION_HEADER: repository.version})
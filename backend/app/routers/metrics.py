@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import resource
+import sys
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..dependencies import get_repository, get_response_cache, get_series_cache
+from ..services.data_repository import DataRepository
+from ..services.response_cache import ResponseCache
+from ..telemetry import METRICS
+
+router = APIRouter()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _resident_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _peak_resident_bytes() -> int:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _metric(lines: list[str], name: str, kind: str, help_text: str, samples: list[tuple[str, object]]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(
+    repository: DataRepository = Depends(get_repository),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    series_cache: ResponseCache = Depends(get_series_cache),
+) -> PlainTextResponse:
+    """Prometheus text exposition of latency histograms, cache, dataset and memory gauges."""
+
+    caches = {"responses": response_cache.stats(), "series": series_cache.stats()}
+    stations = repository.resident_stats()
+    if stations is not None:
+        caches["stations"] = stations
+    lines = METRICS.render()
+    for suffix, field, help_text in (
+        ("hits_total", "hits", "Cache lookups answered from the cache."),
+        ("misses_total", "misses", "Cache lookups that missed."),
+        ("evictions_total", "evictions", "Entries evicted to stay within the byte budget."),
+    ):
+        samples = [(f'cache="{name}"', getattr(stats, field)) for name, stats in caches.items()]
+        _metric(lines, f"climate_cache_{suffix}", "counter", help_text, samples)
+    _metric(
+        lines,
+        "climate_cache_hit_ratio",
+        "gauge",
+        "Hits over lookups since start.",
+        [(f'cache="{name}"', stats.hit_ratio) for name, stats in caches.items()],
+    )
+    _metric(
+        lines,
+        "climate_cache_size_bytes",
+        "gauge",
+        "Bytes held by each cache.",
+        [(f'cache="{name}"', stats.size_bytes) for name, stats in caches.items()],
+    )
+    _metric(lines, "climate_dataset_info", "gauge", "Live dataset version.", [(f'version="{repository.version}"', 1)])
+    _metric(
+        lines,
+        "climate_dataset_load_seconds",
+        "gauge",
+        "Time taken to load the live dataset.",
+        [("", repository.load_seconds)],
+    )
+    _metric(lines, "climate_dataset_bytes", "gauge", "Bytes held in dataset arrays.", [("", repository.nbytes)])
+    resident = _resident_bytes()
+    if resident is not None:
+        _metric(lines, "climate_process_resident_bytes", "gauge", "Current resident set size.", [("", resident)])
+    _metric(
+        lines,
+        "climate_process_peak_resident_bytes",
+        "gauge",
+        "Peak resident set size.",
+        [("", _peak_resident_bytes())],
+    )
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+"""Response encoders that work directly on columnar slices.
+
+The row layout is byte-for-byte what FastAPI's ``JSONResponse`` renders for
+the equivalent ``MonthlyTemperatureResponse``/``AnnualTemperatureResponse``
+(compact separators, ``ensure_ascii=False``), without building one Pydantic
+model per point. Floats go through ``float.__repr__`` exactly like
+:mod:`json` does. The columnar JSON and Arrow IPC layouts emit one array per
+field instead of one object per point. NDJSON streams put each row-layout
+``series`` entry on its own line.
+"""
+
+import json
+from typing import Iterable
+
+import numpy as np
+
+from .services.columns import SeriesSlice
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+COLUMNS_MEDIA_TYPE = "application/vnd.climate-explorer.columns+json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_AVAILABLE = pa is not None
+
+
+def _ensure_finite(*columns: np.ndarray) -> None:
+    for values in columns:
+        if not np.isfinite(values).all():
+            raise ValueError("Out of range float values are not JSON compliant")
+
+
+def _envelope(mode: str, series: list[str]) -> bytes:
+    return f'{{"mode":"{mode}","series":[{",".join(series)}]}}'.encode("utf-8")
+
+
+def _series(station_id: str, points: str) -> str:
+    return f'{{"station_id":{json.dumps(station_id, ensure_ascii=False)},"points":[{points}]}}'
+
+
+def encode_monthly_points(columns: dict[str, np.ndarray]) -> str:
+    _ensure_finite(columns["temperature"])
+    rows = zip(columns["year"].tolist(), columns["month"].tolist(), columns["temperature"].tolist())
+    return ",".join(['{"year":%d,"month":%d,"temperature":%r}' % row for row in rows])
+
+
+def encode_annual_points(columns: dict[str, np.ndarray], include_std_band: bool) -> str:
+    years = columns["year"].tolist()
+    if not include_std_band:
+        _ensure_finite(columns["mean"])
+        rows = zip(years, columns["mean"].tolist())
+        return ",".join(['{"year":%d,"mean":%r,"std":null,"upper":null,"lower":null}' % row for row in rows])
+
+    band = [columns[name] for name in ("mean", "std", "upper", "lower")]
+    _ensure_finite(*band)
+    rows = zip(years, *(values.tolist() for values in band))
+    return ",".join(['{"year":%d,"mean":%r,"std":%r,"upper":%r,"lower":%r}' % row for row in rows])
+
+
+def encode_monthly_response(data: SeriesSlice) -> bytes:
+    return _envelope("monthly", [_series(sid, encode_monthly_points(columns)) for sid, columns in data.series()])
+
+
+def encode_annual_response(data: SeriesSlice, include_std_band: bool) -> bytes:
+    return _envelope(
+        "annual",
+        [_series(sid, encode_annual_points(columns, include_std_band)) for sid, columns in data.series()],
+    )
+
+
+def point_fields(mode: str, include_std_band: bool) -> tuple[str, ...]:
+    if mode == "monthly":
+        return ("year", "month", "temperature")
+    return ("year", "mean", "std", "upper", "lower") if include_std_band else ("year", "mean")
+
+
+def _dumps(values: np.ndarray) -> str:
+    return json.dumps(values.tolist(), allow_nan=False, separators=(",", ":"))
+
+
+def _columnar_series(station_id: str, columns: dict[str, np.ndarray], names: tuple[str, ...]) -> str:
+    arrays = ",".join(f'"{name}":{_dumps(columns[name])}' for name in names)
+    return f'{{"station_id":{json.dumps(station_id, ensure_ascii=False)},{arrays}}}'
+
+
+def encode_columnar_response(mode: str, data: SeriesSlice, include_std_band: bool) -> bytes:
+    fragments = encode_series_fragments(mode, data, include_std_band, columnar=True)
+    return assemble_series(mode, fragments.values(), columnar=True)
+
+
+def encode_series_fragments(
+    mode: str, data: SeriesSlice, include_std_band: bool, columnar: bool = False
+) -> dict[str, bytes]:
+    """Encode each station's entry of the ``series`` array on its own.
+
+    Joining the fragments with :func:`assemble_series` gives the same bytes as
+    encoding the whole slice at once, so fragments can be cached per station.
+    """
+
+    fragments = {}
+    if columnar:
+        names = point_fields(mode, include_std_band)
+        for station_id, columns in data.series():
+            fragments[station_id] = _columnar_series(station_id, columns, names).encode("utf-8")
+        return fragments
+    for station_id, columns in data.series():
+        if mode == "monthly":
+            points = encode_monthly_points(columns)
+        else:
+            points = encode_annual_points(columns, include_std_band)
+        fragments[station_id] = _series(station_id, points).encode("utf-8")
+    return fragments
+
+
+def assemble_series(mode: str, fragments: Iterable[bytes], columnar: bool = False) -> bytes:
+    head = f'{{"mode":"{mode}","format":"columns","series":[' if columnar else f'{{"mode":"{mode}","series":['
+    return head.encode("utf-8") + b",".join(fragments) + b"]}"
+
+
+def encode_arrow_stream(mode: str, data: SeriesSlice, include_std_band: bool) -> bytes:
+    """Encode the slice as one Arrow IPC stream with a dictionary-encoded ``station_id``."""
+
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow responses")
+
+    station_codes = np.repeat(np.arange(len(data.station_ids), dtype=np.int32), np.diff(data.bounds))
+    arrays = [pa.DictionaryArray.from_arrays(station_codes, pa.array(data.station_ids, type=pa.string()))]
+    names = ["station_id"]
+    for name in point_fields(mode, include_std_band):
+        arrays.append(pa.array(np.ascontiguousarray(data.columns[name])))
+        names.append(name)
+
+    table = pa.Table.from_arrays(arrays, names=names).replace_schema_metadata({"mode": mode})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
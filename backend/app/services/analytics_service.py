@@ -2,9 +2,14 @@ from __future__ import annotations
 
 from typing import Iterable
 
+import numpy as np
+
 from ..models.schemas import AnalyticsSummary, AnalyticsPerStation, YearRange
+from ..telemetry import span
 from .data_repository import DataRepository
 from .exceptions import InvalidYearRangeError, NoDataError
+from .range_index import RangeAggregates
+from .trends import TrendStats, compute_trends
 
 
 class AnalyticsService:
@@ -17,35 +22,55 @@ class AnalyticsService:
         if year_from > year_to:
             raise InvalidYearRangeError("year_range.from must be before year_range.to")
 
-        normalized_ids = list(dict.fromkeys(str(sid) for sid in station_ids))
-        df = self._repository.filter_monthly(normalized_ids, year_from, year_to)
-        if df.empty:
+        aggregates = self._repository.aggregate_monthly(station_ids, year_from, year_to)
+        return self.summarize_aggregates(aggregates, year_from, year_to)
+
+    def summarize_aggregates(self, aggregates: RangeAggregates, year_from: int, year_to: int) -> AnalyticsSummary:
+        """Summarize per-station partials already queried from the range index over the same year window.
+
+        Counts, extremes and the period come from the partials; the means are
+        summed over the window's rows so they match pandas exactly.
+        """
+
+        aggregates = aggregates.nonempty()
+        if aggregates.codes.size == 0:
             raise NoDataError("No rows for selected stations/year range")
 
-        overall = df["temperature"].agg(["mean", "min", "max"])
-        period = YearRange(from_year=int(df["year"].min()), to_year=int(df["year"].max()))
+        means, overall_mean = self._repository.monthly_means(aggregates.codes, year_from, year_to)
+        with span("model"):
+            return self._build_summary(aggregates, means, overall_mean)
 
-        per_station_df = (
-            df.groupby("station_id")["temperature"]
-            .agg(mean="mean", min="min", max="max")
-            .reset_index()
-        )
+    def _build_summary(self, aggregates: RangeAggregates, means: np.ndarray, overall_mean: float) -> AnalyticsSummary:
+        period = YearRange(from_year=int(aggregates.first_year.min()), to_year=int(aggregates.last_year.max()))
+        station_names = self._repository.cube.station_ids
 
         per_station = [
-            AnalyticsPerStation(
-                station_id=row.station_id,
-                mean=float(row.mean),
-                min=float(row.min),
-                max=float(row.max),
+            AnalyticsPerStation(station_id=station_names[code], mean=mean, min=minimum, max=maximum)
+            for code, mean, minimum, maximum in zip(
+                aggregates.codes.tolist(),
+                means.tolist(),
+                aggregates.minimum.tolist(),
+                aggregates.maximum.tolist(),
             )
-            for row in per_station_df.itertuples()
         ]
 
         return AnalyticsSummary(
             selected_period=period,
-            stations_analyzed=int(per_station_df["station_id"].nunique()),
-            overall_mean_temperature=float(overall["mean"]),
-            overall_min_temperature=float(overall["min"]),
-            overall_max_temperature=float(overall["max"]),
+            stations_analyzed=len(per_station),
+            overall_mean_temperature=overall_mean,
+            overall_min_temperature=float(aggregates.minimum.min()),
+            overall_max_temperature=float(aggregates.maximum.max()),
             per_station=per_station,
         )
+
+    def trends(self, station_ids: Iterable[str], year_from: int, year_to: int, window: int = 10) -> TrendStats:
+        """OLS and Theil–Sen slopes of the annual means; mean and moving averages of the annual anomalies."""
+
+        if year_from > year_to:
+            raise InvalidYearRangeError("year_range.from must be before year_range.to")
+
+        selection = self._repository.select(station_ids)
+        means = self._repository.annual_means(selection, year_from, year_to)
+        anomalies = self._repository.annual_anomalies(selection, year_from, year_to)
+        with span("trends"):
+            return compute_trends(means.codes, means.years, means.values, anomalies.values, window)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+"""Compact column storage for the normalized monthly and annual tables."""
+
+from dataclasses import dataclass, fields
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SeriesSlice:
+    """Selected rows laid out as parallel columns, contiguous per station.
+
+    Rows for ``station_ids[i]`` are ``bounds[i]:bounds[i + 1]`` of every column.
+    """
+
+    station_ids: tuple[str, ...]
+    bounds: np.ndarray
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return int(self.bounds[-1])
+
+    def series(self) -> Iterator[tuple[str, dict[str, np.ndarray]]]:
+        for station_id, start, stop in zip(self.station_ids, self.bounds[:-1].tolist(), self.bounds[1:].tolist()):
+            yield station_id, {name: values[start:stop] for name, values in self.columns.items()}
+
+
+def _series_slice(codes: np.ndarray, station_names: np.ndarray, columns: dict[str, np.ndarray]) -> SeriesSlice:
+    changes = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    starts = np.concatenate(([0], changes)) if codes.size else changes
+    return SeriesSlice(
+        station_ids=tuple(station_names[codes[starts]].tolist()),
+        bounds=np.append(starts, codes.size),
+        columns=columns,
+    )
+
+
+@dataclass(frozen=True)
+class MonthlyColumns:
+    """Monthly rows sorted by station, year and month; ``station`` holds station codes."""
+
+    station: np.ndarray
+    year: np.ndarray
+    month: np.ndarray
+    temperature: np.ndarray
+
+    def to_frame(self, rows: np.ndarray, station_names: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "temperature": self.temperature[rows],
+                "station_id": station_names[self.station[rows]],
+                "year": self.year[rows].astype(np.int64),
+                "month": self.month[rows].astype(np.int64),
+            },
+            index=rows,
+        )
+
+    def select(self, rows: np.ndarray, station_names: np.ndarray) -> SeriesSlice:
+        return _series_slice(
+            self.station[rows],
+            station_names,
+            {"year": self.year[rows], "month": self.month[rows], "temperature": self.temperature[rows]},
+        )
+
+
+@dataclass(frozen=True)
+class AnnualColumns:
+    """Annual statistics sorted by station and year; ``station`` holds station codes."""
+
+    station: np.ndarray
+    year: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    upper: np.ndarray
+    lower: np.ndarray
+
+    def to_frame(self, rows: np.ndarray, station_names: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "station_id": station_names[self.station[rows]],
+                "year": self.year[rows].astype(np.int64),
+                **{name: getattr(self, name)[rows] for name in ("mean", "std", "upper", "lower")},
+            },
+            index=rows,
+        )
+
+    def select(self, rows: np.ndarray, station_names: np.ndarray) -> SeriesSlice:
+        stats = {name: getattr(self, name)[rows] for name in ("mean", "std", "upper", "lower")}
+        return _series_slice(self.station[rows], station_names, {"year": self.year[rows], **stats})
+
+
+def column_arrays(columns: MonthlyColumns | AnnualColumns) -> dict[str, np.ndarray]:
+    return {field.name: getattr(columns, field.name) for field in fields(columns)}
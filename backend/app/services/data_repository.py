@@ -2,14 +2,36 @@ from __future__ import annotations
 
 """Data repository for the climate dataset."""
 
-from dataclasses import dataclass
-from functools import lru_cache
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from typing import Callable, Iterable, Tuple
+from itertools import repeat
+from typing import Callable, Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 
+from ..telemetry import span
+from .columns import AnnualColumns, MonthlyColumns, SeriesSlice
 from .exceptions import InvalidStationError, InvalidYearRangeError
+from .range_index import RangeAggregates, RangeIndex, build_range_index
+from .resident_stations import ResidentStations, StationRows, array_bytes
+from .response_cache import CacheStats
+from .rollups import Rollups, YearBlock, build_rollups
+from .snapshot import (
+    DatasetSnapshot,
+    read_rollups,
+    read_snapshot,
+    snapshot_key,
+    source_files,
+    write_rollups,
+    write_snapshot,
+)
+from .station_cube import StationCube, build_station_cube
 
 MONTHS = [
     "Jan",
@@ -29,6 +51,11 @@ MONTHS = [
 EXPECTED_COLUMNS = {"Station Number", "Year", *MONTHS}
 MONTH_TO_NUMBER = {name: idx + 1 for idx, name in enumerate(MONTHS)}
 
+# Unknown ids listed in an InvalidStationError before the rest are summarized as a count.
+MAX_REPORTED_IDS = 10
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class StationMetadata:
@@ -38,153 +65,620 @@ class StationMetadata:
     last_year: int
 
 
+@dataclass(frozen=True, eq=False)
+class StationSelection:
+    """Validated station ids, deduplicated and in code order, with their cube codes.
+
+    Resolve a request's ids once with :meth:`DataRepository.select` and pass
+    the selection wherever station ids are accepted; the repository version
+    that resolved it skips validation, any other (after a reload) re-resolves
+    the ids. Iterating yields the ids.
+    """
+
+    version: str
+    station_ids: tuple[str, ...]
+    codes: np.ndarray
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.station_ids)
+
+    def __len__(self) -> int:
+        return len(self.station_ids)
+
+
 def _validate_csv_schema(frame: pd.DataFrame) -> None:
     missing = EXPECTED_COLUMNS.difference(frame.columns)
     if missing:
         raise ValueError(f"Temperature CSV is missing columns: {', '.join(sorted(missing))}")
 
 
-def _load_monthly_frame(csv_path: Path) -> pd.DataFrame:
-    """Load and normalize the raw CSV into a tidy monthly DataFrame."""
+class _ColumnBuffer:
+    """Append-only typed columns that grow geometrically, like a list of rows."""
+
+    def __init__(self, capacity: int):
+        self.size = 0
+        self.station = np.empty(capacity, dtype=np.int32)
+        self.year = np.empty(capacity, dtype=np.int32)
+        self.month = np.empty(capacity, dtype=np.int8)
+        self.temperature = np.empty(capacity, dtype=np.float64)
+
+    def extend(self, station: np.ndarray, year: np.ndarray, month: np.ndarray, temperature: np.ndarray) -> None:
+        needed = self.size + len(temperature)
+        if needed > len(self.temperature):
+            capacity = max(needed, 2 * len(self.temperature))
+            for name in ("station", "year", "month", "temperature"):
+                grown = np.empty(capacity, dtype=getattr(self, name).dtype)
+                grown[: self.size] = getattr(self, name)[: self.size]
+                setattr(self, name, grown)
+
+        window = slice(self.size, needed)
+        self.station[window] = station
+        self.year[window] = year
+        self.month[window] = month
+        self.temperature[window] = temperature
+        self.size = needed
+
+
+def _load_monthly_columns(
+    csv_path: Path,
+    chunk_size: int | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> tuple[tuple[str, ...], MonthlyColumns]:
+    """Load and normalize the raw CSV into sorted station ids and compact monthly columns.
+
+    With ``chunk_size`` the wide CSV is streamed ``chunk_size`` rows at a time:
+    every chunk is validated and unpivoted straight into typed column buffers,
+    so peak memory is the output columns plus one chunk instead of the full
+    wide frame and its 12x melt. Station ids are kept as int32 codes into the
+    returned ids throughout; no per-row strings are built. ``progress``
+    receives the CSV rows and monthly rows ingested so far after each chunk.
+    """
 
     dtype_map = {"Station Number": "string", "Year": "Int64", **{month: "float64" for month in MONTHS}}
-    raw = pd.read_csv(csv_path, sep=";", dtype=dtype_map)
-    _validate_csv_schema(raw)
-
-    raw = raw.dropna(subset=["Station Number", "Year"])
-
-    melted = (
-        raw.melt(
-            id_vars=["Station Number", "Year"],
-            value_vars=MONTHS,
-            var_name="month_name",
-            value_name="temperature",
+    reader = pd.read_csv(csv_path, sep=";", dtype=dtype_map, chunksize=chunk_size)
+    chunks = reader if chunk_size is not None else [reader]
+
+    station_codes: dict[str, int] = {}
+    buffer: _ColumnBuffer | None = None
+    rows_read = 0
+    for raw in chunks:
+        _validate_csv_schema(raw)
+        rows_read += len(raw)
+        raw = raw.dropna(subset=["Station Number", "Year"])
+
+        temperatures = raw[MONTHS].to_numpy(dtype=np.float64)
+        row_positions, month_positions = np.nonzero(~np.isnan(temperatures))
+        local_codes, uniques = pd.factorize(raw["Station Number"].astype(str).to_numpy())
+        to_global = np.array(
+            [station_codes.setdefault(sid, len(station_codes)) for sid in uniques], dtype=np.int32
         )
-        .dropna(subset=["temperature"])
-        .assign(
-            station_id=lambda df: df["Station Number"].astype(str),
-            year=lambda df: df["Year"].astype(int),
-            month=lambda df: df["month_name"].map(MONTH_TO_NUMBER).astype(int),
-            temperature=lambda df: pd.to_numeric(df["temperature"], errors="coerce"),
+
+        if buffer is None:
+            buffer = _ColumnBuffer(capacity=max(temperatures.size, 1))
+        buffer.extend(
+            to_global[local_codes[row_positions]],
+            raw["Year"].to_numpy(dtype=np.int64)[row_positions],
+            month_positions + 1,
+            temperatures[row_positions, month_positions],
         )
-        .dropna(subset=["temperature"])
-        .drop(columns=["Station Number", "Year", "month_name"])
-        .sort_values(["station_id", "year", "month"])
-        .reset_index(drop=True)
-    )
+        if progress is not None:
+            progress(rows_read, buffer.size)
 
-    if melted.empty:
+    if buffer is None or buffer.size == 0:
         raise ValueError("Temperature CSV did not yield any valid monthly rows")
 
-    return melted
+    station_ids = tuple(sorted(station_codes))
+    ranks = {station_id: rank for rank, station_id in enumerate(station_ids)}
+    station_rank = np.array([ranks[station_id] for station_id in station_codes], dtype=np.int32)
+
+    size = buffer.size
+    station = station_rank[buffer.station[:size]]
+    order = np.lexsort((buffer.month[:size], buffer.year[:size], station))
+    columns = {"station": station[order]}
+    del station
+    for name in ("year", "month", "temperature"):
+        # Drop each buffer column once sorted, so only one column is held twice at a time.
+        columns[name] = getattr(buffer, name)[:size][order]
+        setattr(buffer, name, None)
+    return station_ids, MonthlyColumns(**columns)
+
+
+def _segment_values(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, position: int):
+    """``values[start + position]`` for every segment, and whether the segment reaches that far."""
+
+    return values[np.minimum(starts + position, len(values) - 1)], counts > position
+
+
+def _running_segment_sums(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Kahan sums of ``values[start:start + count]``, added in order like pandas' ``groupby().mean()``.
+
+    Iterates over positions within a segment (at most 12 months), not over
+    segments, and updates the compensation exactly as pandas' group_mean
+    kernel does, so ``sum / count`` is bit-identical to it.
+    """
+
+    total = np.zeros(len(starts))
+    compensation = np.zeros(len(starts))
+    for position in range(int(counts.max(initial=0))):
+        value, active = _segment_values(values, starts, counts, position)
+        addend = value - compensation
+        running = total + addend
+        compensation = np.where(active, (running - total) - addend, compensation)
+        total = np.where(active, running, total)
+    return total
+
+
+def _pairwise_segment_sums(values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Sums of ``values[start:start + count]`` in the order numpy's ``ndarray.sum()`` adds them.
+
+    numpy adds fewer than eight values one by one; from eight on it keeps
+    eight interleaved partial sums, combines them as a tree and then adds
+    the remainder. Segments longer than its 128-value block are rare enough
+    (duplicate rows only) to be handed to numpy one by one.
+    """
+
+    blocks = np.where(counts >= 8, counts // 8, 0)
+    lanes = np.full((8, len(starts)), -0.0)
+    for block in range(int(blocks.max(initial=0))):
+        for lane in range(8):
+            value, _ = _segment_values(values, starts, counts, 8 * block + lane)
+            lanes[lane] = np.where(blocks > block, lanes[lane] + value, lanes[lane])
+    tree = ((lanes[0] + lanes[1]) + (lanes[2] + lanes[3])) + ((lanes[4] + lanes[5]) + (lanes[6] + lanes[7]))
+    total = np.where(blocks > 0, tree, -0.0)
+
+    laned = 8 * blocks
+    for offset in range(int((counts - laned).max(initial=0))):
+        value, active = _segment_values(values, starts, counts, laned + offset)
+        total = np.where(active, total + value, total)
+    total = 0.0 + total
+    for segment in np.flatnonzero(counts > 128).tolist():
+        total[segment] = values[starts[segment] : starts[segment] + counts[segment]].sum()
+    return total
+
+
+def _build_annual_columns(monthly: MonthlyColumns) -> AnnualColumns:
+    """Aggregate monthly rows (sorted by station, year) into annual statistics.
+
+    Sums run over contiguous (station, year) segments, vectorized across all
+    segments at once, in the same order as the pandas aggregation they
+    replace: the mean is ``groupby().mean()``, the std is ``Series.std(ddof=0)``
+    (a pairwise-summed mean, then the pairwise-summed squared deviations).
+    """
+
+    station = monthly.station
+    years = monthly.year
+    temperatures = monthly.temperature
+
+    boundaries = np.ones(len(temperatures), dtype=bool)
+    boundaries[1:] = (station[1:] != station[:-1]) | (years[1:] != years[:-1])
+    starts = np.flatnonzero(boundaries)
+    counts = np.diff(np.append(starts, len(temperatures)))
+
+    mean = _running_segment_sums(temperatures, starts, counts) / counts
+    deviations = np.repeat(_pairwise_segment_sums(temperatures, starts, counts) / counts, counts)
+    deviations -= temperatures
+    std = np.sqrt(_pairwise_segment_sums(np.square(deviations, out=deviations), starts, counts) / counts)
+
+    return AnnualColumns(
+        station=station[starts],
+        year=years[starts],
+        mean=mean,
+        std=std,
+        upper=mean + std,
+        lower=mean - std,
+    )
 
 
-def _build_annual_frame(monthly_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate monthly rows into annual statistics."""
+def _build_station_metadata(cube: StationCube, annual: AnnualColumns) -> dict[str, StationMetadata]:
+    """Construct metadata per station from the first/last years holding data.
 
-    def _std(series: pd.Series) -> float:
-        return float(series.std(ddof=0)) if not series.empty else float("nan")
+    Annual rows exist only for years with data, so these are the years of
+    each station's first and last annual row.
+    """
 
-    grouped = (
-        monthly_df.groupby(["station_id", "year"])["temperature"].agg(mean="mean", std=_std).reset_index()
-    )
-    grouped["std"] = grouped["std"].fillna(0.0)
-    grouped["upper"] = grouped["mean"] + grouped["std"]
-    grouped["lower"] = grouped["mean"] - grouped["std"]
-    return grouped.sort_values(["station_id", "year"]).reset_index(drop=True)
+    first_years = annual.year[cube.annual_offsets[:, 0]].tolist()
+    last_years = annual.year[cube.annual_offsets[:, -1] - 1].tolist()
+    return {
+        station_id: StationMetadata(
+            station_id=station_id,
+            name=f"Station {station_id}",
+            first_year=first_year,
+            last_year=last_year,
+        )
+        for station_id, first_year, last_year in zip(cube.station_ids, first_years, last_years)
+    }
 
 
-def _build_station_metadata(monthly_df: pd.DataFrame) -> dict[str, StationMetadata]:
-    """Construct metadata per station from the normalized dataset."""
+@dataclass(frozen=True)
+class ShardColumns:
+    """Compact monthly and annual columns of one or more shards.
+
+    ``station`` codes in both tables index ``station_ids``, which are sorted.
+    Only these arrays cross the process boundary from ingest workers: no
+    DataFrames and no per-row station id strings.
+    """
+
+    station_ids: tuple[str, ...]
+    monthly: MonthlyColumns
+    annual: AnnualColumns
+
+
+def _load_shard(csv_path: Path, chunk_size: int | None = None) -> ShardColumns:
+    """Compact columns for one CSV; runs in a worker process for sharded sources."""
 
-    meta = (
-        monthly_df.groupby("station_id")["year"].agg(first_year="min", last_year="max").reset_index()
+    def _report(rows_read: int, monthly_rows: int) -> None:
+        logger.info("Ingested %d CSV rows (%d monthly values) from %s", rows_read, monthly_rows, csv_path)
+
+    station_ids, monthly = _load_monthly_columns(
+        csv_path, chunk_size=chunk_size, progress=_report if chunk_size else None
     )
-    return {
-        row.station_id: StationMetadata(
-            station_id=row.station_id,
-            name=f"Station {row.station_id}",
-            first_year=int(row.first_year),
-            last_year=int(row.last_year),
-        )
-        for row in meta.itertuples()
+    return ShardColumns(station_ids=station_ids, monthly=monthly, annual=_build_annual_columns(monthly))
+
+
+def _merge_columns(tables: list, to_global: list[np.ndarray], n_stations: int):
+    """Scatter per-shard tables into one sorted by global station code.
+
+    A station's rows all come from one shard, where they are already in
+    year/month order, so each row's destination is its station's global
+    start plus its rank within the station; no sort is needed.
+    """
+
+    global_codes = [mapping[table.station] for table, mapping in zip(tables, to_global)]
+    counts = sum(np.bincount(codes, minlength=n_stations) for codes in global_codes)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    merged = {
+        field.name: np.empty(int(counts.sum()), dtype=getattr(tables[0], field.name).dtype)
+        for field in fields(tables[0])
     }
+    for table, codes in zip(tables, global_codes):
+        local_starts = np.flatnonzero(np.concatenate(([True], table.station[1:] != table.station[:-1])))
+        rank = np.arange(len(codes)) - np.repeat(local_starts, np.diff(np.append(local_starts, len(codes))))
+        destination = starts[codes] + rank
+        for name, values in merged.items():
+            values[destination] = codes if name == "station" else getattr(table, name)
+    return type(tables[0])(**merged)
+
+
+def _merge_shards(shards: list[Path], parts: list[ShardColumns]) -> ShardColumns:
+    """Combine per-shard columns into one set, ordered by station like a single CSV.
+
+    Every station must live in exactly one shard; ``owners`` routes each
+    station to its shard and rejects ids that appear in two.
+    """
+
+    owners: dict[str, Path] = {}
+    for shard, part in zip(shards, parts):
+        for station_id in part.station_ids:
+            owner = owners.setdefault(station_id, shard)
+            if owner != shard:
+                raise ValueError(f"Station {station_id} appears in both {owner} and {shard}")
+
+    station_ids = tuple(sorted(owners))
+    codes = {station_id: code for code, station_id in enumerate(station_ids)}
+    to_global = [np.array([codes[station_id] for station_id in part.station_ids], dtype=np.int32) for part in parts]
+    return ShardColumns(
+        station_ids=station_ids,
+        monthly=_merge_columns([part.monthly for part in parts], to_global, len(station_ids)),
+        annual=_merge_columns([part.annual for part in parts], to_global, len(station_ids)),
+    )
+
+
+def _load_source(data_path: Path, chunk_size: int | None = None, workers: int | None = None) -> ShardColumns:
+    """Parse every shard of ``data_path``, in parallel worker processes when there are several."""
+
+    shards = source_files(data_path)
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers == 1:
+        parts = [_load_shard(shard, chunk_size) for shard in shards]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            parts = list(pool.map(_load_shard, shards, repeat(chunk_size)))
+    if len(parts) == 1:
+        return parts[0]
+    return _merge_shards(shards, parts)
+
+
+def _build_snapshot(
+    data_path: Path, chunk_size: int | None = None, workers: int | None = None
+) -> DatasetSnapshot:
+    """Parse the CSV shards and derive every structure the repository serves from."""
+
+    source = _load_source(data_path, chunk_size=chunk_size, workers=workers)
+    cube = build_station_cube(source.station_ids, source.monthly, source.annual)
+    return DatasetSnapshot(
+        monthly=source.monthly,
+        annual=source.annual,
+        cube=cube,
+        range_index=build_range_index(cube),
+    )
+
+
+def _load_rollups(
+    cube: StationCube,
+    baseline: tuple[int, int],
+    snapshot_dir: Path | None,
+    data_path: Path,
+    key: str,
+    mmap: bool,
+) -> Rollups:
+    """Rollups for ``baseline``, read from the snapshot when stored there, otherwise built and stored."""
+
+    if snapshot_dir is None:
+        return build_rollups(cube, baseline)
+    rollups = read_rollups(snapshot_dir, data_path, key, baseline, mmap=mmap)
+    if rollups is None:
+        rollups = build_rollups(cube, baseline)
+        if write_rollups(snapshot_dir, data_path, key, rollups) and mmap:
+            rollups = read_rollups(snapshot_dir, data_path, key, baseline, mmap=True) or rollups
+    return rollups
 
 
 class DataRepository:
-    """Loads and exposes normalized temperature data for downstream services."""
+    """Loads and exposes normalized temperature data for downstream services.
+
+    All numeric state lives in flat NumPy arrays. With ``mmap`` (and a
+    ``snapshot_dir``) those arrays are read-only views of the snapshot files,
+    so uvicorn workers share one page-cache copy instead of private frames.
+
+    ``data_path`` may also be a directory or glob of CSV shards (for example
+    one per region); they are parsed by up to ``workers`` processes and
+    merged into a single dataset, each station belonging to one shard.
+
+    With ``resident_bytes`` the repository starts lazily: the snapshot is
+    always memory-mapped, only the station index and metadata are read up
+    front, and each station's cube, range-index and rollup rows are loaded
+    on first use into an LRU holding at most that many bytes. This needs a
+    ``snapshot_dir`` to save memory; without one the dataset is parsed into
+    memory as usual and the LRU only defers the rollups.
+    """
+
+    def __init__(
+        self,
+        data_path: Path,
+        snapshot_dir: Path | None = None,
+        *,
+        mmap: bool = False,
+        chunk_size: int | None = None,
+        workers: int | None = None,
+        climatology_baseline: tuple[int, int] = (1961, 1990),
+        resident_bytes: int | None = None,
+    ):
+        started = time.perf_counter()
+        mmap = mmap or resident_bytes is not None
+        # One key for the whole load: if a shard changes mid-parse, the next check sees a new key and reloads.
+        key = snapshot_key(data_path)
+        self._version = key
+        snapshot = read_snapshot(snapshot_dir, data_path, key, mmap=mmap) if snapshot_dir is not None else None
+        if snapshot is None:
+            snapshot = _build_snapshot(data_path, chunk_size=chunk_size, workers=workers)
+            if snapshot_dir is not None and write_snapshot(snapshot_dir, data_path, key, snapshot) and mmap:
+                snapshot = read_snapshot(snapshot_dir, data_path, key, mmap=True) or snapshot
+
+        self._monthly = snapshot.monthly
+        self._annual = snapshot.annual
+        self._cube: StationCube = snapshot.cube
+        self._range_index: RangeIndex = snapshot.range_index
+        self._station_names = np.array(self._cube.station_ids, dtype=object)
+        self._station_meta = _build_station_metadata(self._cube, self._annual)
+        self._year_bounds = (self._cube.first_year, self._cube.last_year)
+        self._baseline = climatology_baseline
+        if resident_bytes is None:
+            self._resident = None
+            self._all_rows = StationRows(
+                codes=np.arange(len(self._station_names)),
+                positions=np.arange(len(self._station_names)),
+                monthly=self._cube.monthly,
+                range_index=self._range_index,
+                rollups=_load_rollups(self._cube, climatology_baseline, snapshot_dir, data_path, key, mmap),
+            )
+        else:
+            self._resident = ResidentStations(self._cube, self._range_index, climatology_baseline, resident_bytes)
+            self._all_rows = None
+        self._load_seconds = time.perf_counter() - started
 
-    def __init__(self, csv_path: Path):
-        if not csv_path.exists():
-            raise FileNotFoundError(f"Temperature data CSV not found at {csv_path}")
+    @property
+    def version(self) -> str:
+        """Fingerprint of the source CSVs (paths, mtimes, sizes, snapshot schema)."""
 
-        self._monthly_df = _load_monthly_frame(csv_path)
-        self._annual_df = _build_annual_frame(self._monthly_df)
-        self._station_meta = _build_station_metadata(self._monthly_df)
+        return self._version
 
-        self._monthly_cache: Callable[[Tuple[Tuple[str, ...], int, int]], pd.DataFrame] = lru_cache(maxsize=128)(
-            self._build_monthly_slice
-        )
-        self._annual_cache: Callable[[Tuple[Tuple[str, ...], int, int]], pd.DataFrame] = lru_cache(maxsize=128)(
-            self._build_annual_slice
-        )
+    @property
+    def load_seconds(self) -> float:
+        """Wall time the constructor took, snapshot read or CSV ingest included."""
 
-    def _build_monthly_slice(self, key: Tuple[Tuple[str, ...], int, int]) -> pd.DataFrame:
-        station_ids, year_from, year_to = key
-        mask = (
-            self._monthly_df["station_id"].isin(station_ids)
-            & (self._monthly_df["year"] >= year_from)
-            & (self._monthly_df["year"] <= year_to)
-        )
-        return self._monthly_df.loc[mask]
-
-    def _build_annual_slice(self, key: Tuple[Tuple[str, ...], int, int]) -> pd.DataFrame:
-        station_ids, year_from, year_to = key
-        mask = (
-            self._annual_df["station_id"].isin(station_ids)
-            & (self._annual_df["year"] >= year_from)
-            & (self._annual_df["year"] <= year_to)
-        )
-        return self._annual_df.loc[mask]
+        return self._load_seconds
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in the dataset's arrays, memory-mapped ones included.
+
+        In lazy mode the cube and range index count only for the resident stations.
+        """
+
+        columns = array_bytes((self._monthly, self._annual, self._cube.monthly_offsets, self._cube.annual_offsets))
+        if self._resident is not None:
+            return columns + self._resident.stats().size_bytes
+        return columns + array_bytes((self._cube.monthly, self._range_index, self._all_rows.rollups))
+
+    @property
+    def climatology_baseline(self) -> tuple[int, int]:
+        return self._baseline
+
+    def resident_stats(self) -> CacheStats | None:
+        """Hit/miss and size counters of the resident-station LRU; ``None`` when loading eagerly."""
+
+        return self._resident.stats() if self._resident is not None else None
 
     @property
     def station_ids(self) -> list[str]:
-        return sorted(self._station_meta.keys())
+        return list(self._cube.station_ids)
+
+    @property
+    def cube(self) -> StationCube:
+        return self._cube
 
     def get_stations(self) -> list[StationMetadata]:
         return [self._station_meta[sid] for sid in self.station_ids]
 
     def get_global_year_bounds(self) -> tuple[int, int]:
-        return int(self._monthly_df["year"].min()), int(self._monthly_df["year"].max())
+        return self._year_bounds
 
     def ensure_year_range(self, year_from: int, year_to: int) -> None:
-        min_year, max_year = self.get_global_year_bounds()
+        min_year, max_year = self._year_bounds
         if year_from < min_year or year_to > max_year:
             raise InvalidYearRangeError(
                 f"Year range must be between {min_year} and {max_year} inclusive."
             )
 
-    def _ensure_station_ids(self, station_ids: set[str]) -> None:
-        unknown = station_ids - set(self._station_meta)
-        if unknown:
-            raise InvalidStationError("Unknown station ids requested.")
-
-    def filter_monthly(self, station_ids: Iterable[str], year_from: int, year_to: int) -> pd.DataFrame:
-        ids = {str(sid) for sid in station_ids}
-        if not ids:
-            raise InvalidStationError("station_ids must not be empty")
-        self._ensure_station_ids(ids)
+    def select(self, station_ids: Iterable[str]) -> StationSelection:
+        """Deduplicate and validate ``station_ids`` in one pass over the interned id table."""
+
+        if isinstance(station_ids, StationSelection) and station_ids.version == self._version:
+            return station_ids
+        with span("validate"):
+            codes_by_id = self._cube.station_codes
+            ids = dict.fromkeys(map(str, station_ids))
+            if not ids:
+                raise InvalidStationError("station_ids must not be empty")
+            unknown = [sid for sid in ids if sid not in codes_by_id]
+            if unknown:
+                listed = ", ".join(sorted(unknown)[:MAX_REPORTED_IDS])
+                more = len(unknown) - MAX_REPORTED_IDS
+                suffix = f" and {more} more." if more > 0 else "."
+                raise InvalidStationError(f"Unknown station ids: {listed}{suffix}")
+            codes = np.sort(np.fromiter((codes_by_id[sid] for sid in ids), dtype=np.int64, count=len(ids)))
+            names = self._cube.station_ids
+            return StationSelection(self._version, tuple(names[code] for code in codes.tolist()), codes)
+
+    def _validated(self, station_ids: Iterable[str], year_from: int, year_to: int) -> StationSelection:
+        selection = self.select(station_ids)
         self.ensure_year_range(year_from, year_to)
+        return selection
+
+    def _station_rows(self, codes: np.ndarray) -> StationRows:
+        if self._resident is not None:
+            return self._resident.rows(codes)
+        return replace(self._all_rows, codes=codes, positions=codes)
+
+    def aggregate_monthly(self, station_ids: Iterable[str], year_from: int, year_to: int) -> RangeAggregates:
+        """Return per-station monthly sum/count/min/max over the year window."""
+
+        selection = self._validated(station_ids, year_from, year_to)
+        rows = self._station_rows(selection.codes)
+        with span("range_query"):
+            aggregates = rows.range_index.query(rows.positions, year_from, year_to)
+        return replace(aggregates, codes=rows.codes)
+
+    def monthly_means(self, codes: np.ndarray, year_from: int, year_to: int) -> tuple[np.ndarray, float]:
+        """Per-station and overall mean temperature of stations that have rows in the year window.
+
+        Summed over the rows themselves, in (station, year, month) order and
+        with pandas' own kernels, so both are bit-identical to aggregating
+        :meth:`filter_monthly`; the range index only bounds the sums.
+        """
+
+        start, stop = self._cube.year_bounds(year_from, year_to)
+        with span("slice"):
+            rows = self._cube.monthly_rows(codes, year_from, year_to)
+            values = self._monthly.temperature[rows]
+        counts = self._cube.monthly_offsets[codes, stop] - self._cube.monthly_offsets[codes, start]
+        labels = np.repeat(np.arange(len(codes)), counts)
+        per_station = pd.Series(values).groupby(labels, sort=False).mean().to_numpy()
+        return per_station, float(pd.Series(values).mean())
 
-        station_key = tuple(sorted(ids))
-        return self._monthly_cache((station_key, year_from, year_to)).copy()
+    def filter_monthly(self, station_ids: Iterable[str], year_from: int, year_to: int) -> pd.DataFrame:
+        selection = self._validated(station_ids, year_from, year_to)
+        with span("slice"):
+            rows = self._cube.monthly_rows(selection.codes, year_from, year_to)
+        with span("copy"):
+            return self._monthly.to_frame(rows, self._station_names)
 
     def filter_annual(self, station_ids: Iterable[str], year_from: int, year_to: int) -> pd.DataFrame:
-        ids = {str(sid) for sid in station_ids}
-        if not ids:
-            raise InvalidStationError("station_ids must not be empty")
-        self._ensure_station_ids(ids)
-        self.ensure_year_range(year_from, year_to)
+        selection = self._validated(station_ids, year_from, year_to)
+        with span("slice"):
+            rows = self._cube.annual_rows(selection.codes, year_from, year_to)
+        with span("copy"):
+            return self._annual.to_frame(rows, self._station_names)
+
+    def monthly_series(self, station_ids: Iterable[str], year_from: int, year_to: int) -> SeriesSlice:
+        """Columnar counterpart of :meth:`filter_monthly` for serializers."""
+
+        selection = self._validated(station_ids, year_from, year_to)
+        with span("slice"):
+            rows = self._cube.monthly_rows(selection.codes, year_from, year_to)
+            return self._monthly.select(rows, self._station_names)
+
+    def annual_series(self, station_ids: Iterable[str], year_from: int, year_to: int) -> SeriesSlice:
+        """Columnar counterpart of :meth:`filter_annual` for serializers."""
+
+        selection = self._validated(station_ids, year_from, year_to)
+        with span("slice"):
+            rows = self._cube.annual_rows(selection.codes, year_from, year_to)
+            return self._annual.select(rows, self._station_names)
+
+    def decadal(self, station_ids: Iterable[str], year_from: int, year_to: int) -> list[tuple[int, RangeAggregates]]:
+        """Monthly aggregates per calendar decade, clipped to the year range.
+
+        Each decade is one range-index query, so the cost does not depend on
+        how many years a decade spans.
+        """
+
+        selection = self._validated(station_ids, year_from, year_to)
+        rows = self._station_rows(selection.codes)
+        first = max(year_from, self._cube.first_year)
+        last = min(year_to, self._cube.last_year)
+        with span("range_query"):
+            return [
+                (
+                    decade,
+                    replace(
+                        rows.range_index.query(rows.positions, max(decade, first), min(decade + 9, last)),
+                        codes=rows.codes,
+                    ),
+                )
+                for decade in range(first - first % 10, last + 1, 10)
+            ]
+
+    def _year_block(self, rollup: str, station_ids: Iterable[str], year_from: int, year_to: int) -> YearBlock:
+        selection = self._validated(station_ids, year_from, year_to)
+        rows = self._station_rows(selection.codes)
+        start, stop = self._cube.year_bounds(year_from, year_to)
+        return YearBlock(
+            codes=rows.codes,
+            years=np.arange(self._cube.first_year + start, self._cube.first_year + stop),
+            values=getattr(rows.rollups, rollup)[rows.positions, start:stop],
+            present=rows.rollups.has_data[rows.positions, start:stop],
+        )
 
-        station_key = tuple(sorted(ids))
-        return self._annual_cache((station_key, year_from, year_to)).copy()
+    def seasonal(self, station_ids: Iterable[str], year_from: int, year_to: int) -> YearBlock:
+        """DJF/MAM/JJA/SON means as a ``(stations, years, 4)`` block."""
+
+        return self._year_block("seasonal", station_ids, year_from, year_to)
+
+    def annual_means(self, station_ids: Iterable[str], year_from: int, year_to: int) -> YearBlock:
+        return self._year_block("annual_mean", station_ids, year_from, year_to)
+
+    def annual_anomalies(self, station_ids: Iterable[str], year_from: int, year_to: int) -> YearBlock:
+        return self._year_block("annual_anomaly", station_ids, year_from, year_to)
+
+    def normals(self, station_ids: Iterable[str]) -> np.ndarray:
+        """Baseline monthly normals as a ``(stations, 12)`` array, in station-code order."""
+
+        rows = self._station_rows(self.select(station_ids).codes)
+        return rows.rollups.normals[rows.positions]
+
+    def monthly_anomalies(self, station_ids: Iterable[str], year_from: int, year_to: int) -> YearBlock:
+        """Departures from the monthly normals as a ``(stations, years, 12)`` block."""
+
+        selection = self._validated(station_ids, year_from, year_to)
+        rows = self._station_rows(selection.codes)
+        start, stop = self._cube.year_bounds(year_from, year_to)
+        values = rows.monthly[rows.positions, start:stop, :]
+        return YearBlock(
+            codes=rows.codes,
+            years=np.arange(self._cube.first_year + start, self._cube.first_year + stop),
+            values=values - rows.rollups.normals[rows.positions, None, :],
+            present=~np.isnan(values),
+        )
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+"""Min/max-per-bucket decimation for long series."""
+
+import numpy as np
+
+from .columns import SeriesSlice
+
+
+def _first_per_bucket(mask: np.ndarray, buckets: np.ndarray) -> np.ndarray:
+    hits = np.flatnonzero(mask)
+    _, first = np.unique(buckets[hits], return_index=True)
+    return hits[first]
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Return sorted positions to keep so at most ``max_points`` remain.
+
+    The first and last points are always kept; the interior is split into
+    equal-count buckets that each contribute their minimum and maximum, so
+    peaks and troughs survive however far the series is thinned.
+    """
+
+    size = len(values)
+    if size <= max_points:
+        return np.arange(size)
+
+    n_buckets = max(1, (max_points - 2) // 2)
+    interior = values[1:-1]
+    buckets = (np.arange(size - 2) * n_buckets) // (size - 2)
+    starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+    sizes = np.diff(np.append(starts, size - 2))
+
+    minima = np.repeat(np.minimum.reduceat(interior, starts), sizes)
+    maxima = np.repeat(np.maximum.reduceat(interior, starts), sizes)
+    keep = np.concatenate(
+        (
+            [0, size - 1],
+            _first_per_bucket(interior == minima, buckets) + 1,
+            _first_per_bucket(interior == maxima, buckets) + 1,
+        )
+    )
+    return np.unique(keep)
+
+
+def downsample_slice(data: SeriesSlice, value_field: str, max_points: int) -> SeriesSlice:
+    """Thin every series in ``data`` to at most ``max_points`` rows by ``value_field``."""
+
+    values = data.columns[value_field]
+    starts = data.bounds[:-1].tolist()
+    stops = data.bounds[1:].tolist()
+    if all(stop - start <= max_points for start, stop in zip(starts, stops)):
+        return data
+
+    kept = [minmax_indices(values[start:stop], max_points) + start for start, stop in zip(starts, stops)]
+    rows = np.concatenate(kept)
+    return SeriesSlice(
+        station_ids=data.station_ids,
+        bounds=np.concatenate(([0], np.cumsum([len(indices) for indices in kept]))),
+        columns={name: column[rows] for name, column in data.columns.items()},
+    )
@@ -6,6 +6,10 @@ class NoDataError(Exception):
     """Raised when a query does not return any rows."""
 
 
+class NoBaselineDataError(NoDataError):
+    """Raised when no selected station has data in the climatology baseline period."""
+
+
 class InvalidStationError(RepositoryError):
     """Raised when a station id is not part of the dataset."""
 
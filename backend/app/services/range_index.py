@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+"""Precomputed per-station range aggregates over year windows."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .station_cube import StationCube
+
+
+def two_sum(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Error-free addition: ``a + b == total + error`` exactly."""
+
+    total = a + b
+    b_virtual = total - a
+    error = (a - (total - b_virtual)) + (b - b_virtual)
+    return total, error
+
+
+def two_product(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Error-free multiplication (Dekker): ``a * b == product + error`` exactly."""
+
+    product = a * b
+    a_hi, a_lo = _split(a)
+    b_hi, b_lo = _split(b)
+    error = ((a_hi * b_hi - product) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return product, error
+
+
+def _split(a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    scaled = 134217729.0 * a  # 2**27 + 1
+    high = scaled - (scaled - a)
+    return high, a - high
+
+
+@dataclass(frozen=True)
+class RangeAggregates:
+    """Partial monthly aggregates for a set of stations over one year window.
+
+    Sums are kept as unevaluated ``sum_hi + sum_lo`` pairs so partials can be
+    merged without picking up rounding error. Stations without rows in the
+    window have ``count == 0``, NaN extremes and ``-1`` year bounds.
+    """
+
+    codes: np.ndarray
+    count: np.ndarray
+    sum_hi: np.ndarray
+    sum_lo: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    first_year: np.ndarray
+    last_year: np.ndarray
+
+    @property
+    def mean(self) -> np.ndarray:
+        """``(sum_hi + sum_lo) / count``, rounded once.
+
+        The quotient of the rounded sum is corrected by its exact remainder,
+        so the mean is within an ulp of the exact one, unlike a plain
+        division of the rounded sum. A pandas ``groupby().mean()`` over the
+        same rows accumulates a running sum instead and may differ in the
+        last ulp.
+        """
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            count = self.count.astype(np.float64)
+            quotient = self.sum_hi / count
+            product, error = two_product(quotient, count)
+            return quotient + (((self.sum_hi - product) - error) + self.sum_lo) / count
+
+    def nonempty(self) -> RangeAggregates:
+        return self._take(self.count > 0)
+
+    def restrict(self, codes: np.ndarray) -> RangeAggregates:
+        """Keep only the stations in ``codes``, e.g. one selection out of a union query."""
+
+        return self._take(np.isin(self.codes, codes))
+
+    def _take(self, keep: np.ndarray) -> RangeAggregates:
+        return RangeAggregates(
+            codes=self.codes[keep],
+            count=self.count[keep],
+            sum_hi=self.sum_hi[keep],
+            sum_lo=self.sum_lo[keep],
+            minimum=self.minimum[keep],
+            maximum=self.maximum[keep],
+            first_year=self.first_year[keep],
+            last_year=self.last_year[keep],
+        )
+
+
+@dataclass(frozen=True)
+class RangeIndex:
+    """Prefix sums/counts and sparse min/max tables per station, by year.
+
+    ``prefix_*[s, y]`` accumulate the first ``y`` years of station ``s``;
+    ``minima[k][s, y]``/``maxima[k][s, y]`` cover years ``y .. y + 2**k - 1``.
+    ``next_year``/``prev_year`` point at the nearest year offset with data.
+    """
+
+    first_year: int
+    last_year: int
+    prefix_count: np.ndarray
+    prefix_hi: np.ndarray
+    prefix_lo: np.ndarray
+    minima: tuple[np.ndarray, ...]
+    maxima: tuple[np.ndarray, ...]
+    next_year: np.ndarray
+    prev_year: np.ndarray
+
+    def query(self, codes: np.ndarray, year_from: int, year_to: int) -> RangeAggregates:
+        start = max(year_from, self.first_year) - self.first_year
+        stop = min(year_to, self.last_year) - self.first_year
+        size = len(codes)
+        if stop < start:
+            return RangeAggregates(
+                codes=codes,
+                count=np.zeros(size, dtype=np.int64),
+                sum_hi=np.zeros(size),
+                sum_lo=np.zeros(size),
+                minimum=np.full(size, np.nan),
+                maximum=np.full(size, np.nan),
+                first_year=np.full(size, -1, dtype=np.int64),
+                last_year=np.full(size, -1, dtype=np.int64),
+            )
+
+        count = self.prefix_count[codes, stop + 1] - self.prefix_count[codes, start]
+        sum_hi, error = two_sum(self.prefix_hi[codes, stop + 1], -self.prefix_hi[codes, start])
+        sum_lo = error + (self.prefix_lo[codes, stop + 1] - self.prefix_lo[codes, start])
+
+        level = (stop - start + 1).bit_length() - 1
+        tail = stop - (1 << level) + 1
+        minimum = np.fmin(self.minima[level][codes, start], self.minima[level][codes, tail])
+        maximum = np.fmax(self.maxima[level][codes, start], self.maxima[level][codes, tail])
+
+        empty = count == 0
+        first = np.where(empty, -1, self.next_year[codes, start] + self.first_year)
+        last = np.where(empty, -1, self.prev_year[codes, stop] + self.first_year)
+        return RangeAggregates(
+            codes=codes,
+            count=count,
+            sum_hi=sum_hi,
+            sum_lo=sum_lo,
+            minimum=minimum,
+            maximum=maximum,
+            first_year=first,
+            last_year=last,
+        )
+
+
+def _sparse_table(values: np.ndarray, reduce) -> tuple[np.ndarray, ...]:
+    levels = [values]
+    width = 1
+    while 2 * width <= values.shape[1]:
+        previous = levels[-1]
+        levels.append(reduce(previous[:, :-width], previous[:, width:]))
+        width *= 2
+    return tuple(levels)
+
+
+def build_range_index(cube: StationCube) -> RangeIndex:
+    monthly = cube.monthly
+    n_stations, n_years, _ = monthly.shape
+    present = ~np.isnan(monthly)
+    yearly_count = present.sum(axis=2)
+
+    # Compensated yearly sums, then compensated running totals across years.
+    yearly_hi = np.zeros((n_stations, n_years))
+    yearly_lo = np.zeros((n_stations, n_years))
+    for month in range(12):
+        yearly_hi, error = two_sum(yearly_hi, np.where(present[:, :, month], monthly[:, :, month], 0.0))
+        yearly_lo += error
+
+    prefix_hi = np.zeros((n_stations, n_years + 1))
+    prefix_lo = np.zeros((n_stations, n_years + 1))
+    for year in range(n_years):
+        total, error = two_sum(prefix_hi[:, year], yearly_hi[:, year])
+        prefix_hi[:, year + 1], prefix_lo[:, year + 1] = two_sum(
+            total, prefix_lo[:, year] + yearly_lo[:, year] + error
+        )
+
+    prefix_count = np.zeros((n_stations, n_years + 1), dtype=np.int64)
+    np.cumsum(yearly_count, axis=1, out=prefix_count[:, 1:])
+
+    yearly_min = np.fmin.reduce(monthly, axis=2)
+    yearly_max = np.fmax.reduce(monthly, axis=2)
+
+    offsets = np.arange(n_years)
+    has_data = yearly_count > 0
+    next_year = np.minimum.accumulate(np.where(has_data, offsets, n_years)[:, ::-1], axis=1)[:, ::-1]
+    prev_year = np.maximum.accumulate(np.where(has_data, offsets, -1), axis=1)
+
+    return RangeIndex(
+        first_year=cube.first_year,
+        last_year=cube.last_year,
+        prefix_count=prefix_count,
+        prefix_hi=prefix_hi,
+        prefix_lo=prefix_lo,
+        minima=_sparse_table(yearly_min, np.fmin),
+        maxima=_sparse_table(yearly_max, np.fmax),
+        next_year=next_year,
+        prev_year=prev_year,
+    )
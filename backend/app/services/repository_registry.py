@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+"""Holder for the live DataRepository with background reloads and atomic swaps."""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .data_repository import DataRepository
+from .response_cache import ResponseCache
+from .snapshot import snapshot_key
+
+logger = logging.getLogger(__name__)
+
+
+class RepositoryRegistry:
+    """Owns the current repository and replaces it when the source CSVs change.
+
+    Replacement repositories are built on the caller's thread (the watcher or
+    the admin endpoint), never on a request thread, and published with a
+    single reference assignment. Requests that already resolved the previous
+    repository keep using it until they finish. ``caches`` are cleared when
+    the version changes, so bodies built from the previous dataset do not
+    hold their budget until they age out.
+    """
+
+    def __init__(
+        self,
+        data_path: Path,
+        loader: Callable[[], DataRepository],
+        caches: Iterable[ResponseCache] = (),
+    ):
+        self._data_path = data_path
+        self._loader = loader
+        self._caches = tuple(caches)
+        self._current: DataRepository | None = None
+        self._lock = threading.Lock()
+
+    def current(self) -> DataRepository:
+        repository = self._current
+        if repository is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._loader()
+                repository = self._current
+        return repository
+
+    def source_version(self) -> str:
+        # Re-resolves sharded sources, so added or removed shards count as changes.
+        return snapshot_key(self._data_path)
+
+    def is_stale(self) -> bool:
+        return self._current is not None and self.source_version() != self._current.version
+
+    def reload(self) -> DataRepository:
+        """Build a fresh repository from the CSV and swap it in."""
+
+        with self._lock:
+            repository = self._loader()
+            previous, self._current = self._current, repository
+        if previous is None or previous.version != repository.version:
+            for cache in self._caches:
+                cache.clear()
+            logger.info("Dataset version %s is now live", repository.version)
+        return repository
+
+    def watch(self, interval: float) -> RegistryWatcher:
+        watcher = RegistryWatcher(self, interval)
+        watcher.start()
+        return watcher
+
+
+class RegistryWatcher(threading.Thread):
+    """Polls the CSV fingerprint and reloads once a change has settled.
+
+    A new fingerprint must be seen on two consecutive polls before reloading,
+    so a file that is still being written is not ingested half-way.
+    """
+
+    def __init__(self, registry: RepositoryRegistry, interval: float):
+        super().__init__(name="dataset-watcher", daemon=True)
+        self._registry = registry
+        self._interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        pending: str | None = None
+        while not self._stopped.wait(self._interval):
+            try:
+                if not self._registry.is_stale():
+                    pending = None
+                    continue
+                version = self._registry.source_version()
+                if version == pending:
+                    self._registry.reload()
+                    pending = None
+                else:
+                    pending = version
+            except Exception:
+                logger.exception("Dataset reload failed; keeping the current version")
+                pending = None
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join(timeout=self._interval + 1)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+"""Per-station rows of the cube, range index and rollups, loaded on first use."""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass, replace
+
+import numpy as np
+
+from ..telemetry import span
+from .range_index import RangeIndex
+from .response_cache import CacheStats
+from .rollups import Rollups, build_rollups
+from .station_cube import StationCube
+
+
+@dataclass(frozen=True)
+class StationRows:
+    """Cube, range-index and rollup arrays covering ``codes``.
+
+    Station ``codes[i]`` lives at row ``positions[i]`` of every array: the
+    station code itself when the arrays hold the whole dataset, ``i`` when
+    they were assembled for just these stations.
+    """
+
+    codes: np.ndarray
+    positions: np.ndarray
+    monthly: np.ndarray
+    range_index: RangeIndex
+    rollups: Rollups
+
+
+def array_bytes(value: object) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if is_dataclass(value):
+        return sum(array_bytes(getattr(value, field.name)) for field in fields(value))
+    if isinstance(value, (tuple, list)):
+        return sum(array_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(array_bytes(item) for item in value.values())
+    return 0
+
+
+def _take_rows(value, rows: slice | np.ndarray):
+    """Copy rows ``rows`` out of every array in ``value``; other fields are kept as-is."""
+
+    if isinstance(value, np.ndarray):
+        return np.array(value[rows])
+    if is_dataclass(value):
+        return type(value)(**{field.name: _take_rows(getattr(value, field.name), rows) for field in fields(value)})
+    if isinstance(value, tuple):
+        return tuple(_take_rows(item, rows) for item in value)
+    return value
+
+
+def _concat_rows(values: list):
+    """Inverse of :func:`_take_rows`: stack the row blocks of several values in order."""
+
+    first = values[0]
+    if isinstance(first, np.ndarray):
+        return np.concatenate(values)
+    if is_dataclass(first):
+        return type(first)(
+            **{field.name: _concat_rows([getattr(value, field.name) for value in values]) for field in fields(first)}
+        )
+    if isinstance(first, tuple):
+        return tuple(_concat_rows(list(items)) for items in zip(*values))
+    return first
+
+
+class ResidentStations:
+    """Byte-budgeted LRU of the stations whose rows have been loaded.
+
+    ``cube`` and ``range_index`` are normally memory-mapped snapshot arrays;
+    a station's rows are copied out of them, and its rollups derived, the
+    first time a query needs it. Stations are evicted least recently used
+    first, so private memory tracks the working set instead of the dataset.
+    """
+
+    def __init__(self, cube: StationCube, range_index: RangeIndex, baseline: tuple[int, int], max_bytes: int):
+        self._cube = cube
+        self._range_index = range_index
+        self._baseline = baseline
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[int, tuple[StationRows, int]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def rows(self, codes: np.ndarray) -> StationRows:
+        """Rows for ``codes`` (sorted, unique), loading stations that are not resident."""
+
+        found: dict[int, StationRows] = {}
+        with self._lock:
+            for code in codes.tolist():
+                entry = self._entries.get(code)
+                if entry is not None:
+                    self._entries.move_to_end(code)
+                    found[code] = entry[0]
+            self._hits += len(found)
+            self._misses += len(codes) - len(found)
+
+        missing = np.array([code for code in codes.tolist() if code not in found], dtype=np.int64)
+        if missing.size:
+            found.update(self._load(missing))
+
+        blocks = [found[code] for code in codes.tolist()]
+        rows = blocks[0] if len(blocks) == 1 else _concat_rows(blocks)
+        return replace(rows, positions=np.arange(len(codes)))
+
+    def _load(self, codes: np.ndarray) -> dict[int, StationRows]:
+        with span("load_stations"):
+            monthly = np.array(self._cube.monthly[codes])
+            loaded = StationRows(
+                codes=codes,
+                positions=np.arange(len(codes)),
+                monthly=monthly,
+                range_index=_take_rows(self._range_index, codes),
+                rollups=build_rollups(replace(self._cube, monthly=monthly), self._baseline),
+            )
+            blocks = {code: _take_rows(loaded, slice(i, i + 1)) for i, code in enumerate(codes.tolist())}
+
+        with self._lock:
+            for code, block in blocks.items():
+                size = array_bytes(block)
+                if code in self._entries or size > self._max_bytes:
+                    continue
+                self._entries[code] = (block, size)
+                self._size += size
+            while self._size > self._max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._size -= size
+                self._evictions += 1
+        return blocks
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size,
+                max_bytes=self._max_bytes,
+            )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+"""Seasonal means and climatology normals precomputed from the station cube."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .station_cube import StationCube
+
+SEASONS = ("djf", "mam", "jja", "son")
+
+
+@dataclass(frozen=True)
+class YearBlock:
+    """Per-station values over a year window: ``values[i, j]`` is station ``codes[i]`` in ``years[j]``.
+
+    ``values`` may carry a trailing season or month axis. ``present`` marks
+    the station-years (or station-months, for monthly values) backed by data;
+    those are reported even when their value is NaN.
+    """
+
+    codes: np.ndarray
+    years: np.ndarray
+    values: np.ndarray
+    present: np.ndarray
+
+
+@dataclass(frozen=True)
+class Rollups:
+    """Load-time rollups indexed like the cube, by station code and year offset.
+
+    ``seasonal[s, y, k]`` is the mean of season ``SEASONS[k]`` in year ``y``
+    and is only defined when all three months are present; DJF takes the
+    December of the previous year. ``annual_mean[s, y]`` is the mean of the
+    months of ``y`` with data. ``normals[s, m]`` is the baseline-period mean
+    of calendar month ``m`` and ``annual_anomaly[s, y]`` the mean departure
+    from those normals over the months of ``y`` that have both.
+    ``has_data[s, y]`` marks station-years with any monthly value.
+    """
+
+    baseline: tuple[int, int]
+    seasonal: np.ndarray
+    annual_mean: np.ndarray
+    normals: np.ndarray
+    annual_anomaly: np.ndarray
+    has_data: np.ndarray
+
+
+def _masked_mean(values: np.ndarray, axis: int) -> np.ndarray:
+    present = ~np.isnan(values)
+    count = present.sum(axis=axis)
+    total = np.where(present, values, 0.0).sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def build_rollups(cube: StationCube, baseline: tuple[int, int]) -> Rollups:
+    monthly = cube.monthly
+    n_stations = monthly.shape[0]
+
+    previous_december = np.concatenate((np.full((n_stations, 1), np.nan), monthly[:, :-1, 11]), axis=1)
+    seasonal = np.stack(
+        (
+            (previous_december + monthly[:, :, 0] + monthly[:, :, 1]) / 3,
+            monthly[:, :, 2:5].mean(axis=2),
+            monthly[:, :, 5:8].mean(axis=2),
+            monthly[:, :, 8:11].mean(axis=2),
+        ),
+        axis=2,
+    )
+
+    start, stop = cube.year_bounds(*baseline)
+    normals = _masked_mean(monthly[:, start:stop, :], axis=1)
+    annual_anomaly = _masked_mean(monthly - normals[:, None, :], axis=2)
+
+    return Rollups(
+        baseline=baseline,
+        seasonal=seasonal,
+        annual_mean=_masked_mean(monthly, axis=2),
+        normals=normals,
+        annual_anomaly=annual_anomaly,
+        has_data=~np.isnan(monthly).all(axis=2),
+    )
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+"""Versioned on-disk snapshots of the normalized dataset as raw ``.npy`` columns."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .columns import AnnualColumns, MonthlyColumns, column_arrays
+from .range_index import RangeIndex
+from .rollups import Rollups
+from .station_cube import StationCube
+
+# Bump whenever the normalized columns or derived index layout change.
+SNAPSHOT_VERSION = 4
+
+ROLLUP_ARRAYS = ("seasonal", "annual_mean", "normals", "annual_anomaly", "has_data")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    monthly: MonthlyColumns
+    annual: AnnualColumns
+    cube: StationCube
+    range_index: RangeIndex
+
+
+def _is_glob(data_path: Path) -> bool:
+    return any(char in data_path.name for char in "*?[")
+
+
+def source_files(data_path: Path) -> list[Path]:
+    """Resolve ``data_path`` to the CSV shards it names, in a stable order.
+
+    ``data_path`` is a single CSV, a directory (every ``*.csv`` in it) or a
+    glob pattern in its last component, such as ``regions/*.csv``.
+    """
+
+    if _is_glob(data_path):
+        shards = sorted(path for path in data_path.parent.glob(data_path.name) if path.is_file())
+    elif data_path.is_dir():
+        shards = sorted(path for path in data_path.glob("*.csv") if path.is_file())
+    elif data_path.exists():
+        shards = [data_path]
+    else:
+        shards = []
+    if not shards:
+        raise FileNotFoundError(f"Temperature data CSV not found at {data_path}")
+    return shards
+
+
+def snapshot_key(data_path: Path) -> str:
+    """Derive the cache key from each shard's location, mtime and size, plus the schema version.
+
+    Adding or removing a shard changes the key as well.
+    """
+
+    parts = []
+    for shard in source_files(data_path):
+        resolved = shard.resolve()
+        stat = resolved.stat()
+        parts.append(f"{resolved}|{stat.st_mtime_ns}|{stat.st_size}")
+    raw = "|".join(parts) + f"|v{SNAPSHOT_VERSION}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _source_name(data_path: Path) -> str:
+    """Readable name plus a hash of the resolved source, so same-named sources in other directories never collide."""
+
+    if _is_glob(data_path):
+        pattern = "".join(char if char.isalnum() else "_" for char in data_path.name)
+        name = f"{data_path.parent.name}_{pattern}"
+    else:
+        name = data_path.name if data_path.is_dir() else data_path.stem
+    digest = hashlib.sha256(str(data_path.resolve()).encode()).hexdigest()[:8]
+    return f"{name}_{digest}"
+
+
+def snapshot_path(snapshot_dir: Path, data_path: Path, key: str) -> Path:
+    return snapshot_dir / f"{_source_name(data_path)}-{key}"
+
+
+def _columns(snapshot: DatasetSnapshot) -> dict[str, np.ndarray]:
+    cube = snapshot.cube
+    index = snapshot.range_index
+    columns = {
+        "station_ids": np.array(cube.station_ids, dtype=str),
+        **{f"monthly_{name}": values for name, values in column_arrays(snapshot.monthly).items()},
+        **{f"annual_{name}": values for name, values in column_arrays(snapshot.annual).items()},
+        "cube_monthly": cube.monthly,
+        "cube_monthly_offsets": cube.monthly_offsets,
+        "cube_annual_offsets": cube.annual_offsets,
+        "index_prefix_count": index.prefix_count,
+        "index_prefix_hi": index.prefix_hi,
+        "index_prefix_lo": index.prefix_lo,
+        "index_next_year": index.next_year,
+        "index_prev_year": index.prev_year,
+    }
+    for level, (minima, maxima) in enumerate(zip(index.minima, index.maxima)):
+        columns[f"index_minima_{level}"] = minima
+        columns[f"index_maxima_{level}"] = maxima
+    return columns
+
+
+def write_snapshot(snapshot_dir: Path, data_path: Path, key: str, snapshot: DatasetSnapshot) -> Path | None:
+    """Persist ``snapshot`` under ``key`` next to older ones; returns ``None`` when the directory is unusable.
+
+    ``key`` must be the :func:`snapshot_key` taken before the CSVs were parsed. Re-reading it here
+    would file a parse of the old contents under the new key if a shard changed during ingestion.
+    """
+
+    target = snapshot_path(snapshot_dir, data_path, key)
+    try:
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=snapshot_dir))
+    except OSError as exc:
+        logger.warning("Skipping dataset snapshot, %s is not writable: %s", snapshot_dir, exc)
+        return None
+
+    try:
+        columns = _columns(snapshot)
+        for name, values in columns.items():
+            np.save(staging / f"{name}.npy", values, allow_pickle=False)
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "source": str(data_path.resolve()),
+            "shards": [str(shard.resolve()) for shard in source_files(data_path)],
+            "first_year": snapshot.cube.first_year,
+            "last_year": snapshot.cube.last_year,
+            "index_levels": len(snapshot.range_index.minima),
+        }
+        (staging / "meta.json").write_text(json.dumps(meta))
+        os.replace(staging, target)
+    except OSError:
+        # Another worker published the same snapshot first; theirs is equivalent.
+        shutil.rmtree(staging, ignore_errors=True)
+        return target if target.exists() else None
+
+    name = _source_name(data_path)
+    for stale in snapshot_dir.glob(f"{name}-*"):
+        if stale != target and stale.is_dir() and stale.name.rsplit("-", 1)[0] == name:
+            shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+
+def read_snapshot(snapshot_dir: Path, data_path: Path, key: str, *, mmap: bool = False) -> DatasetSnapshot | None:
+    """Load the snapshot stored for ``data_path`` under ``key``, if one exists.
+
+    With ``mmap`` the numeric arrays are opened read-only from the page cache,
+    so every worker process reading the same snapshot shares one copy.
+    """
+
+    source = snapshot_path(snapshot_dir, data_path, key)
+    if not source.is_dir():
+        return None
+
+    try:
+        meta = json.loads((source / "meta.json").read_text())
+        if meta.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        def column(name: str) -> np.ndarray:
+            return np.load(source / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+
+        levels = range(meta["index_levels"])
+        monthly = MonthlyColumns(**{name: column(f"monthly_{name}") for name in MonthlyColumns.__dataclass_fields__})
+        annual = AnnualColumns(**{name: column(f"annual_{name}") for name in AnnualColumns.__dataclass_fields__})
+        ids = tuple(np.load(source / "station_ids.npy", allow_pickle=False).tolist())
+        cube = StationCube(
+            station_ids=ids,
+            station_codes={sid: code for code, sid in enumerate(ids)},
+            first_year=meta["first_year"],
+            last_year=meta["last_year"],
+            monthly=column("cube_monthly"),
+            monthly_offsets=column("cube_monthly_offsets"),
+            annual_offsets=column("cube_annual_offsets"),
+        )
+        range_index = RangeIndex(
+            first_year=meta["first_year"],
+            last_year=meta["last_year"],
+            prefix_count=column("index_prefix_count"),
+            prefix_hi=column("index_prefix_hi"),
+            prefix_lo=column("index_prefix_lo"),
+            minima=tuple(column(f"index_minima_{level}") for level in levels),
+            maxima=tuple(column(f"index_maxima_{level}") for level in levels),
+            next_year=column("index_next_year"),
+            prev_year=column("index_prev_year"),
+        )
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Ignoring unreadable dataset snapshot at %s: %s", source, exc)
+        return None
+
+    return DatasetSnapshot(monthly=monthly, annual=annual, cube=cube, range_index=range_index)
+
+
+def _rollups_path(snapshot_dir: Path, data_path: Path, key: str, baseline: tuple[int, int]) -> Path:
+    start, end = baseline
+    return snapshot_path(snapshot_dir, data_path, key) / f"rollups-{start}-{end}"
+
+
+def write_rollups(snapshot_dir: Path, data_path: Path, key: str, rollups: Rollups) -> Path | None:
+    """Store ``rollups`` inside the snapshot saved under ``key``, one set per climatology baseline.
+
+    Returns ``None`` when that snapshot does not exist or cannot be written to.
+    """
+
+    target = _rollups_path(snapshot_dir, data_path, key, rollups.baseline)
+    try:
+        staging = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=target.parent))
+    except OSError as exc:
+        logger.warning("Skipping rollup snapshot, %s is not writable: %s", target.parent, exc)
+        return None
+
+    try:
+        for name in ROLLUP_ARRAYS:
+            np.save(staging / f"{name}.npy", getattr(rollups, name), allow_pickle=False)
+        os.replace(staging, target)
+    except OSError:
+        # Another worker published the same rollups first; theirs are equivalent.
+        shutil.rmtree(staging, ignore_errors=True)
+        return target if target.exists() else None
+    return target
+
+
+def read_rollups(
+    snapshot_dir: Path, data_path: Path, key: str, baseline: tuple[int, int], *, mmap: bool = False
+) -> Rollups | None:
+    """Load the rollups stored for ``baseline`` in the snapshot saved under ``key``, if any."""
+
+    source = _rollups_path(snapshot_dir, data_path, key, baseline)
+    if not source.is_dir():
+        return None
+
+    try:
+        arrays = {
+            name: np.load(source / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in ROLLUP_ARRAYS
+        }
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable rollup snapshot at %s: %s", source, exc)
+        return None
+
+    return Rollups(baseline=baseline, **arrays)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+"""Dense station × year × month index over the normalized dataset."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .columns import AnnualColumns, MonthlyColumns
+
+
+@dataclass(frozen=True)
+class StationCube:
+    """Array index that turns (stations, year range) selections into direct lookups.
+
+    ``monthly`` holds one temperature per (station, year, month) cell with NaN
+    for gaps. ``monthly_offsets``/``annual_offsets`` are CSR-style row pointers
+    into the sorted monthly/annual frames: the rows for station ``s`` and year
+    ``y`` live in ``offsets[s, y - first_year]:offsets[s, y - first_year + 1]``.
+    """
+
+    station_ids: tuple[str, ...]
+    station_codes: dict[str, int]
+    first_year: int
+    last_year: int
+    monthly: np.ndarray
+    monthly_offsets: np.ndarray
+    annual_offsets: np.ndarray
+
+    @property
+    def n_years(self) -> int:
+        return self.last_year - self.first_year + 1
+
+    def year_bounds(self, year_from: int, year_to: int) -> tuple[int, int]:
+        """Clip a year range to ``[start, stop)`` year offsets into the cube."""
+
+        start = min(max(year_from, self.first_year), self.last_year + 1) - self.first_year
+        stop = max(min(year_to, self.last_year) + 1, self.first_year) - self.first_year
+        return start, max(start, stop)
+
+    def monthly_rows(self, codes: np.ndarray, year_from: int, year_to: int) -> np.ndarray:
+        return _select_rows(self.monthly_offsets, codes, *self.year_bounds(year_from, year_to))
+
+    def annual_rows(self, codes: np.ndarray, year_from: int, year_to: int) -> np.ndarray:
+        return _select_rows(self.annual_offsets, codes, *self.year_bounds(year_from, year_to))
+
+
+def _select_rows(offsets: np.ndarray, codes: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Expand per-station ``[start, stop)`` year windows into frame row positions."""
+
+    begins = offsets[codes, start]
+    lengths = offsets[codes, stop] - begins
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    shift = np.repeat(begins - (np.cumsum(lengths) - lengths), lengths)
+    return shift + np.arange(total, dtype=np.int64)
+
+
+def _row_offsets(codes: np.ndarray, year_offsets: np.ndarray, n_stations: int, n_years: int) -> np.ndarray:
+    counts = np.bincount(codes * n_years + year_offsets, minlength=n_stations * n_years)
+    cumulative = np.concatenate(([0], np.cumsum(counts)))
+    return cumulative[np.arange(n_stations)[:, None] * n_years + np.arange(n_years + 1)]
+
+
+def build_station_cube(station_ids: tuple[str, ...], monthly: MonthlyColumns, annual: AnnualColumns) -> StationCube:
+    """Index columns sorted by station code and year into a :class:`StationCube`."""
+
+    first_year = int(monthly.year.min())
+    last_year = int(monthly.year.max())
+    n_stations = len(station_ids)
+    n_years = last_year - first_year + 1
+
+    monthly_codes = monthly.station.astype(np.int64)
+    monthly_years = monthly.year.astype(np.int64) - first_year
+    months = monthly.month.astype(np.int64) - 1
+
+    cube = np.full((n_stations, n_years, 12), np.nan)
+    cube[monthly_codes, monthly_years, months] = monthly.temperature
+
+    annual_codes = annual.station.astype(np.int64)
+    annual_years = annual.year.astype(np.int64) - first_year
+
+    return StationCube(
+        station_ids=station_ids,
+        station_codes={sid: code for code, sid in enumerate(station_ids)},
+        first_year=first_year,
+        last_year=last_year,
+        monthly=cube,
+        monthly_offsets=_row_offsets(monthly_codes, monthly_years, n_stations, n_years),
+        annual_offsets=_row_offsets(annual_codes, annual_years, n_stations, n_years),
+    )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+"""Per-station trend statistics over annual values, batched across stations.
+
+Every function takes a ``(stations, years)`` block with NaN for missing
+years and works on all stations at once; only Theil–Sen walks the stations
+in chunks, to bound its pairwise buffer.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Pairwise slopes held at once by theil_sen_slopes (8 MiB of float64).
+PAIR_BUDGET = 1 << 20
+
+
+@dataclass(frozen=True)
+class TrendStats:
+    """Trend statistics for ``codes[i]`` over ``years``.
+
+    Slopes are fitted to the annual means, in degrees per year, and are NaN
+    for stations with fewer than two years of data. The mean anomaly and
+    ``moving_average[i, j]``, the trailing mean anomaly over the ``window``
+    years ending at ``years[j]``, are NaN for stations without baseline data.
+    """
+
+    codes: np.ndarray
+    years: np.ndarray
+    count: np.ndarray
+    ols_slope: np.ndarray
+    theil_sen_slope: np.ndarray
+    mean_anomaly: np.ndarray
+    moving_average: np.ndarray
+
+
+def ols_slopes(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    x = np.where(valid, years, 0.0)
+    y = np.where(valid, values, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = x.sum(axis=1) / count
+        y_mean = y.sum(axis=1) / count
+        dx = np.where(valid, years - x_mean[:, None], 0.0)
+        dy = np.where(valid, values - y_mean[:, None], 0.0)
+        slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+    return np.where(count >= 2, slope, np.nan)
+
+
+def theil_sen_slopes(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Median of the slopes between every pair of years with data.
+
+    Pairs are laid out by lag, so each lag is two contiguous slices, and
+    stations are processed in chunks of at most ``PAIR_BUDGET`` pairs.
+    """
+
+    n_stations, n_years = values.shape
+    n_pairs = n_years * (n_years - 1) // 2
+    slopes = np.full(n_stations, np.nan)
+    if not n_pairs:
+        return slopes
+
+    chunk = max(PAIR_BUDGET // n_pairs, 1)
+    buffer = np.empty((min(chunk, n_stations), n_pairs))
+    for begin in range(0, n_stations, chunk):
+        block = values[begin:begin + chunk]
+        pairwise = buffer[:len(block)]
+        position = 0
+        for lag in range(1, n_years):
+            out = pairwise[:, position:position + n_years - lag]
+            np.subtract(block[:, lag:], block[:, :-lag], out=out)
+            out /= years[lag:] - years[:-lag]
+            position += n_years - lag
+        count = (~np.isnan(pairwise)).sum(axis=1)
+        # NaN sorts last, so each row's median sits among its first ``count`` entries.
+        pairwise.sort(axis=1)
+        lower = np.take_along_axis(pairwise, np.maximum((count - 1) // 2, 0)[:, None], axis=1)[:, 0]
+        upper = np.take_along_axis(pairwise, (count // 2)[:, None], axis=1)[:, 0]
+        slopes[begin:begin + len(block)] = np.where(count > 0, (lower + upper) / 2, np.nan)
+    return slopes
+
+
+def moving_averages(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing ``window``-year means, defined where at least half the window has data."""
+
+    valid = ~np.isnan(values)
+    totals = np.zeros((values.shape[0], values.shape[1] + 1))
+    counts = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.int64)
+    np.cumsum(np.where(valid, values, 0.0), axis=1, out=totals[:, 1:])
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+
+    stop = np.arange(1, values.shape[1] + 1)
+    start = np.maximum(stop - window, 0)
+    count = counts[:, stop] - counts[:, start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (totals[:, stop] - totals[:, start]) / count
+    return np.where(2 * count >= window, mean, np.nan)
+
+
+def compute_trends(
+    codes: np.ndarray, years: np.ndarray, means: np.ndarray, anomalies: np.ndarray, window: int
+) -> TrendStats:
+    """Trends of ``means`` and anomaly statistics of ``anomalies``, both ``(stations, years)`` blocks.
+
+    Slopes do not depend on the baseline offset, so they are fitted to the
+    annual means and stay defined for stations without baseline data.
+    """
+
+    valid = ~np.isnan(anomalies)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_anomaly = np.where(valid, anomalies, 0.0).sum(axis=1) / valid.sum(axis=1)
+    x = years.astype(np.float64)
+    return TrendStats(
+        codes=codes,
+        years=years,
+        count=(~np.isnan(means)).sum(axis=1),
+        ols_slope=ols_slopes(x, means),
+        theil_sen_slope=theil_sen_slopes(x, means),
+        mean_anomaly=mean_anomaly,
+        moving_average=moving_averages(anomalies, window),
+    )
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+"""CPU-bound request work submitted to the compute executor.
+
+Each task takes the repository first, then picklable arguments, and returns
+encoded bytes. Tasks raise the repository's own exceptions; turning them
+into HTTP errors is left to the router.
+"""
+
+import json
+from typing import Iterable
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from .models.schemas import AnalyticsRequest, AnalyticsResponse, AnalyticsSummary, TemperatureDataRequest
+from .serialization import assemble_series, encode_arrow_stream, encode_series_fragments
+from .services.analytics_service import AnalyticsService
+from .services.columns import SeriesSlice
+from .services.data_repository import DataRepository
+from .services.downsampling import downsample_slice
+from .services.exceptions import NoBaselineDataError, NoDataError, RepositoryError
+from .services.rollups import SEASONS
+from .telemetry import span
+
+
+def load_series(repository: DataRepository, payload: TemperatureDataRequest, station_ids: Iterable[str]) -> SeriesSlice:
+    year_from = payload.year_range.from_year
+    year_to = payload.year_range.to_year
+    if payload.mode == "monthly":
+        data = repository.monthly_series(station_ids, year_from, year_to)
+    else:
+        data = repository.annual_series(station_ids, year_from, year_to)
+
+    if payload.max_points is not None:
+        value_field = "temperature" if payload.mode == "monthly" else "mean"
+        with span("downsample"):
+            data = downsample_slice(data, value_field, payload.max_points)
+    return data
+
+
+def encode_fragments(
+    repository: DataRepository, payload: TemperatureDataRequest, station_ids: list[str], columnar: bool
+) -> dict[str, bytes]:
+    """Encoded ``series`` entries for ``station_ids``; stations without rows map to ``b""``."""
+
+    data = load_series(repository, payload, station_ids)
+    with span("encode"):
+        encoded = encode_series_fragments(payload.mode, data, payload.include_std_band, columnar)
+    return {station_id: encoded.get(station_id, b"") for station_id in station_ids}
+
+
+def stations_with_data(
+    repository: DataRepository, payload: TemperatureDataRequest, station_ids: Iterable[str]
+) -> list[str]:
+    """Validate the selection and return, in order, the stations with rows in the window."""
+
+    year_range = payload.year_range
+    aggregates = repository.aggregate_monthly(station_ids, year_range.from_year, year_range.to_year).nonempty()
+    return [repository.cube.station_ids[code] for code in aggregates.codes.tolist()]
+
+
+def encode_arrow(
+    repository: DataRepository, payload: TemperatureDataRequest, station_ids: Iterable[str]
+) -> bytes | None:
+    data = load_series(repository, payload, station_ids)
+    if not len(data):
+        return None
+    with span("encode"):
+        return encode_arrow_stream(payload.mode, data, payload.include_std_band)
+
+
+def render_stations(repository: DataRepository) -> bytes:
+    stations = [
+        {"id": meta.station_id, "name": meta.name, "first_year": meta.first_year, "last_year": meta.last_year}
+        for meta in repository.get_stations()
+    ]
+    with span("encode"):
+        return JSONResponse(content=stations).body
+
+
+def _render_summary(summary: AnalyticsSummary) -> bytes:
+    result = AnalyticsResponse(
+        selected_period=summary.selected_period,
+        stations_analyzed=summary.stations_analyzed,
+        overall_mean_temperature=summary.overall_mean_temperature,
+        overall_min_temperature=summary.overall_min_temperature,
+        overall_max_temperature=summary.overall_max_temperature,
+        per_station=summary.per_station,
+    )
+    # Rendered here (as FastAPI would for the response_model) so the cached
+    # bytes are exactly what a miss returns.
+    with span("encode"):
+        return JSONResponse(content=result.model_dump(mode="json", by_alias=True)).body
+
+
+def render_analytics(repository: DataRepository, station_ids: Iterable[str], year_from: int, year_to: int) -> bytes:
+    return _render_summary(AnalyticsService(repository).summarize(station_ids, year_from, year_to))
+
+
+def _nullable(values: np.ndarray) -> list[float | None]:
+    return [None if value != value else value for value in values.tolist()]
+
+
+def _render_rollup(content: dict) -> bytes:
+    # Built from plain lists rather than response models: the bodies can run
+    # to hundreds of thousands of points and validating each one dominates.
+    with span("encode"):
+        return JSONResponse(content=content).body
+
+
+def render_decadal(repository: DataRepository, station_ids: Iterable[str], year_from: int, year_to: int) -> bytes:
+    selection = repository.select(station_ids)
+    decades = [
+        (
+            decade,
+            aggregates.mean.tolist(),
+            aggregates.minimum.tolist(),
+            aggregates.maximum.tolist(),
+            aggregates.count.tolist(),
+        )
+        for decade, aggregates in repository.decadal(selection, year_from, year_to)
+    ]
+    series = []
+    for i, station_id in enumerate(selection):
+        points = [
+            {"decade": decade, "mean": mean[i], "min": minimum[i], "max": maximum[i], "count": count[i]}
+            for decade, mean, minimum, maximum, count in decades
+            if count[i]
+        ]
+        if points:
+            series.append({"station_id": station_id, "points": points})
+    if not series:
+        raise NoDataError("No rows for selected stations/year range")
+    return _render_rollup({"series": series})
+
+
+def render_seasonal(repository: DataRepository, station_ids: Iterable[str], year_from: int, year_to: int) -> bytes:
+    block = repository.seasonal(station_ids, year_from, year_to)
+    years = block.years.tolist()
+    series = []
+    for i, code in enumerate(block.codes.tolist()):
+        points = [
+            dict(zip(("year", *SEASONS), (years[j], *_nullable(block.values[i, j]))))
+            for j in np.flatnonzero(block.present[i]).tolist()
+        ]
+        if points:
+            series.append({"station_id": repository.cube.station_ids[code], "points": points})
+    if not series:
+        raise NoDataError("No rows for selected stations/year range")
+    return _render_rollup({"series": series})
+
+
+def render_climatology(
+    repository: DataRepository, station_ids: Iterable[str], year_from: int, year_to: int, mode: str
+) -> bytes:
+    selection = repository.select(station_ids)
+    start, end = repository.climatology_baseline
+    normals = repository.normals(selection)
+    has_baseline = ~np.isnan(normals).all(axis=1)
+    if not has_baseline.any():
+        raise NoBaselineDataError(f"No data in the {start}-{end} baseline period for the selected stations.")
+    if mode == "monthly":
+        block = repository.monthly_anomalies(selection, year_from, year_to)
+    else:
+        block = repository.annual_anomalies(selection, year_from, year_to)
+    years = block.years.tolist()
+    series = []
+    for i, code in enumerate(block.codes.tolist()):
+        if mode == "monthly":
+            rows, months = np.nonzero(block.present[i])
+            points = [
+                {"year": years[j], "month": month + 1, "anomaly": anomaly}
+                for j, month, anomaly in zip(rows.tolist(), months.tolist(), _nullable(block.values[i][rows, months]))
+            ]
+        else:
+            rows = np.flatnonzero(block.present[i])
+            points = [
+                {"year": years[j], "anomaly": anomaly}
+                for j, anomaly in zip(rows.tolist(), _nullable(block.values[i][rows]))
+            ]
+        if points:
+            series.append(
+                {
+                    "station_id": repository.cube.station_ids[code],
+                    "has_baseline": bool(has_baseline[i]),
+                    "normals": _nullable(normals[i]),
+                    "points": points,
+                }
+            )
+    if not series:
+        raise NoDataError("No rows for selected stations/year range")
+    return _render_rollup({"mode": mode, "baseline": {"from": start, "to": end}, "series": series})
+
+
+def encode_trend_fragments(
+    repository: DataRepository, station_ids: list[str], year_from: int, year_to: int, window: int
+) -> dict[str, bytes]:
+    """Encoded ``per_station`` entries of the trends body; stations without data map to ``b""``."""
+
+    stats = AnalyticsService(repository).trends(station_ids, year_from, year_to, window)
+    years = stats.years.tolist()
+    fragments = {}
+    for i, (code, count, ols, theil_sen, anomaly) in enumerate(
+        zip(
+            stats.codes.tolist(),
+            stats.count.tolist(),
+            _nullable(stats.ols_slope * 10),
+            _nullable(stats.theil_sen_slope * 10),
+            _nullable(stats.mean_anomaly),
+        )
+    ):
+        station_id = repository.cube.station_ids[code]
+        if not count:
+            fragments[station_id] = b""
+            continue
+        defined = np.flatnonzero(~np.isnan(stats.moving_average[i]))
+        entry = {
+            "station_id": station_id,
+            "years_with_data": count,
+            "ols_slope": ols,
+            "theil_sen_slope": theil_sen,
+            "mean_anomaly": anomaly,
+            "moving_average": [
+                {"year": years[j], "value": value}
+                for j, value in zip(defined.tolist(), stats.moving_average[i, defined].tolist())
+            ],
+        }
+        # Same settings as JSONResponse, so joined fragments match a whole-body render.
+        fragments[station_id] = json.dumps(
+            entry, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+    return {station_id: fragments.get(station_id, b"") for station_id in station_ids}
+
+
+def _assemble_selection(mode: str, fragments: dict[str, bytes], station_ids: set[str], columnar: bool) -> bytes:
+    selected = [fragments[station_id] for station_id in sorted(station_ids) if fragments.get(station_id)]
+    if not selected:
+        raise NoDataError("No rows for selected stations/year range")
+    return assemble_series(mode, selected, columnar)
+
+
+BatchQuery = tuple[TemperatureDataRequest, bool] | AnalyticsRequest
+
+
+def _batch_series(
+    repository: DataRepository, queries: list[BatchQuery], indices: list[int], outcomes: dict[int, bytes | Exception]
+) -> None:
+    groups: dict[tuple, list[int]] = {}
+    for index in indices:
+        payload, _ = queries[index]
+        key = (payload.mode, payload.year_range.from_year, payload.year_range.to_year, payload.max_points)
+        groups.setdefault(key, []).append(index)
+
+    for members in groups.values():
+        template = queries[members[0]][0]
+        union = sorted({station_id for index in members for station_id in queries[index][0].station_ids})
+        try:
+            data = load_series(repository, template, union)
+        except RepositoryError:
+            data = None
+
+        encoded: dict[tuple[bool, bool], dict[str, bytes]] = {}
+        for index in members:
+            payload, columnar = queries[index]
+            try:
+                if data is None:
+                    # Some selection in the group is invalid; slice this one
+                    # alone so the error is reported against the right query.
+                    single = load_series(repository, payload, list(payload.station_ids))
+                    fragments = encode_series_fragments(payload.mode, single, payload.include_std_band, columnar)
+                else:
+                    layout = (payload.include_std_band, columnar)
+                    if layout not in encoded:
+                        encoded[layout] = encode_series_fragments(payload.mode, data, *layout)
+                    fragments = encoded[layout]
+                outcomes[index] = _assemble_selection(payload.mode, fragments, set(payload.station_ids), columnar)
+            except (RepositoryError, NoDataError) as exc:
+                outcomes[index] = exc
+
+
+def _batch_analytics(
+    repository: DataRepository, queries: list[BatchQuery], indices: list[int], outcomes: dict[int, bytes | Exception]
+) -> None:
+    service = AnalyticsService(repository)
+    groups: dict[tuple[int, int], list[int]] = {}
+    for index in indices:
+        payload = queries[index]
+        groups.setdefault((payload.year_range.from_year, payload.year_range.to_year), []).append(index)
+
+    for (year_from, year_to), members in groups.items():
+        union = sorted({station_id for index in members for station_id in queries[index].station_ids})
+        try:
+            aggregates = repository.aggregate_monthly(union, year_from, year_to)
+        except RepositoryError:
+            aggregates = None
+
+        for index in members:
+            station_ids = queries[index].station_ids
+            try:
+                if aggregates is None:
+                    outcomes[index] = render_analytics(repository, station_ids, year_from, year_to)
+                else:
+                    codes = repository.select(station_ids).codes
+                    summary = service.summarize_aggregates(aggregates.restrict(codes), year_from, year_to)
+                    outcomes[index] = _render_summary(summary)
+            except (RepositoryError, NoDataError) as exc:
+                outcomes[index] = exc
+
+
+def run_batch(repository: DataRepository, queries: list[BatchQuery]) -> list[bytes | Exception]:
+    """Answer several sub-queries with one slice or range query per compatible group.
+
+    Temperature-data queries sharing mode, year range and ``max_points`` are
+    sliced once over the union of their stations and encoded once per layout;
+    analytics queries sharing a year range share one range-index query. Each
+    outcome is the encoded body or the repository exception for that query.
+    Temperature-data queries are passed as ``(payload, columnar)`` pairs.
+    """
+
+    series = [index for index, query in enumerate(queries) if isinstance(query, tuple)]
+    analytics = [index for index, query in enumerate(queries) if not isinstance(query, tuple)]
+
+    outcomes: dict[int, bytes | Exception] = {}
+    _batch_series(repository, queries, series, outcomes)
+    _batch_analytics(repository, queries, analytics, outcomes)
+    return [outcomes[index] for index in range(len(queries))]
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+"""Timing spans for the request hot path, exported per request and in aggregate.
+
+Code under measurement wraps each stage in :func:`span`. Durations go to the
+current request's :class:`RequestTimings` (rendered as a ``Server-Timing``
+header) and to the process-wide :data:`METRICS` histograms served at
+``/metrics``. The active request is tracked in a context variable, so spans
+recorded on compute threads are attributed correctly as long as the task was
+submitted with the caller's context (see :class:`~app.compute.ComputeExecutor`);
+spans inside worker processes only reach those processes' own metrics.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .profiling import SamplingProfiler
+
+PROFILE_HEADER = b"x-profile"
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class RequestTimings:
+    """Total duration and call count per span name for one request."""
+
+    def __init__(self):
+        self._spans: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._spans.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def server_timing(self) -> str:
+        with self._lock:
+            return ", ".join(f"{name};dur={total * 1000:.2f}" for name, (total, _) in self._spans.items())
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def bind_timings(timings: RequestTimings) -> Token:
+    return _current.set(timings)
+
+
+def unbind_timings(token: Token) -> None:
+    _current.reset(token)
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Metrics:
+    """Process-wide latency histograms for requests (by route) and spans (by name)."""
+
+    def __init__(self):
+        self._requests: dict[tuple[str, str, int], _Histogram] = {}
+        self._spans: dict[str, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self._requests.setdefault((method, route, status), _Histogram()).observe(seconds)
+
+    def observe_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._spans.setdefault(name, _Histogram()).observe(seconds)
+
+    def render(self) -> list[str]:
+        """Prometheus text-format lines for both histogram families."""
+
+        with self._lock:
+            requests = [(labels, _copy(histogram)) for labels, histogram in sorted(self._requests.items())]
+            spans = [(name, _copy(histogram)) for name, histogram in sorted(self._spans.items())]
+
+        lines = [
+            "# HELP climate_request_duration_seconds Request latency by route and status.",
+            "# TYPE climate_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in requests:
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            lines.extend(_histogram_lines("climate_request_duration_seconds", labels, histogram))
+        lines += [
+            "# HELP climate_span_duration_seconds Time spent in each instrumented stage.",
+            "# TYPE climate_span_duration_seconds histogram",
+        ]
+        for name, histogram in spans:
+            lines.extend(_histogram_lines("climate_span_duration_seconds", f'span="{_escape(name)}"', histogram))
+        return lines
+
+
+def _copy(histogram: _Histogram) -> _Histogram:
+    copy = _Histogram()
+    copy.buckets = list(histogram.buckets)
+    copy.count = histogram.count
+    copy.sum = histogram.sum
+    return copy
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, labels: str, histogram: _Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.buckets):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+METRICS = Metrics()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name`` of the current request."""
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = _current.get()
+        if timings is not None:
+            timings.add(name, elapsed)
+        METRICS.observe_span(name, elapsed)
+
+
+class RequestTelemetryMiddleware:
+    """Collect each request's spans into ``Server-Timing`` and the request histograms.
+
+    ``Server-Timing`` is sent with the response headers, so for streamed
+    bodies ``total`` is the time to first byte; the histogram records the
+    full duration. With ``profile_dir`` set, requests carrying
+    ``X-Profile: 1`` are also sampled and their folded stacks written there,
+    under the name given in ``X-Profile-File``.
+    """
+
+    def __init__(self, app: ASGIApp, *, server_timing: bool = True, profile_dir: Path | None = None):
+        self.app = app
+        self.server_timing = server_timing
+        self.profile_dir = profile_dir
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        start = time.perf_counter()
+        status = 500
+        profile_path = None
+        if self.profile_dir is not None and (PROFILE_HEADER, b"1") in scope["headers"]:
+            path = scope["path"].strip("/").replace("/", "_")
+            profile_path = self.profile_dir / f"{int(time.time() * 1000)}-{scope['method']}-{path}.folded"
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                if self.server_timing:
+                    timings.add("total", time.perf_counter() - start)
+                    headers.append("Server-Timing", timings.server_timing())
+                if profile_path is not None:
+                    headers.append("X-Profile-File", profile_path.name)
+            await send(message)
+
+        token = bind_timings(timings)
+        try:
+            if profile_path is None:
+                await self.app(scope, receive, send_with_timing)
+            else:
+                with SamplingProfiler() as profiler:
+                    await self.app(scope, receive, send_with_timing)
+                profiler.write(profile_path)
+        finally:
+            unbind_timings(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            METRICS.observe_request(scope["method"], route, status, time.perf_counter() - start)
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.dependencies import get_repository
+from app.services import trends
+from app.services.analytics_service import AnalyticsService
+from app.services.data_repository import MONTHS, DataRepository
+from app.services.exceptions import InvalidYearRangeError
+from app.services.trends import theil_sen_slopes
+
+
+@pytest.mark.parametrize(
+    ("station_ids", "year_from", "year_to"),
+    [
+        (["66062"], 1859, 1860),
+        (["101234", "204567", "66062"], 1901, 1987),
+        (get_repository().station_ids, 1859, 2019),
+    ],
+)
+def test_summarize_matches_dataframe_aggregation(station_ids, year_from, year_to):
+    summary = AnalyticsService(get_repository()).summarize(station_ids, year_from, year_to)
+    _assert_summary_matches(summary, get_repository().filter_monthly(station_ids, year_from, year_to))
+
+
+def test_summarize_matches_pandas_on_messy_data(tmp_path):
+    rng = np.random.default_rng(42)
+    frame = pd.DataFrame(
+        {
+            "Station Number": rng.choice(["100", "2345", "A1", "abc", "zz-3", "7"], size=600),
+            "Year": rng.integers(1850, 2020, size=600),
+        }
+    ).drop_duplicates()
+    for month in MONTHS:
+        values = np.round(rng.normal(12, 9, size=len(frame)), rng.integers(1, 3))
+        frame[month] = np.where(rng.random(len(frame)) < 0.15, np.nan, values)
+    csv_path = tmp_path / "messy.csv"
+    frame.to_csv(csv_path, sep=";", index=False)
+
+    raw = pd.read_csv(csv_path, sep=";", dtype={"Station Number": str})
+    tidy = raw.melt(id_vars=["Station Number", "Year"], value_vars=MONTHS, value_name="temperature").dropna()
+    tidy = tidy.rename(columns={"Station Number": "station_id", "Year": "year"})
+    # Row order fixes the order of summation; the pandas loader sorted like this.
+    tidy["month"] = tidy["variable"].map(MONTHS.index)
+    tidy = tidy.sort_values(["station_id", "year", "month"])
+    service = AnalyticsService(DataRepository(csv_path))
+    for _ in range(100):
+        station_ids = rng.choice(tidy["station_id"].unique(), size=rng.integers(1, 6), replace=False).tolist()
+        year_from, year_to = sorted(rng.integers(1850, 2020, size=2).tolist())
+        expected = tidy[tidy["station_id"].isin(station_ids) & tidy["year"].between(year_from, year_to)]
+        if expected.empty:
+            continue
+        _assert_summary_matches(service.summarize(station_ids, year_from, year_to), expected)
+
+
+def _assert_summary_matches(summary, df):
+    """Compare with the pandas aggregation the service replaced; every float must be identical."""
+
+    per_station = df.groupby("station_id")["temperature"].agg(["mean", "min", "max"])
+    assert summary.selected_period.from_year == df["year"].min()
+    assert summary.selected_period.to_year == df["year"].max()
+    assert summary.stations_analyzed == len(per_station)
+    assert summary.overall_mean_temperature == df["temperature"].mean()
+    assert summary.overall_min_temperature == df["temperature"].min()
+    assert summary.overall_max_temperature == df["temperature"].max()
+    assert [(s.station_id, s.mean, s.min, s.max) for s in summary.per_station] == [
+        (row.Index, row.mean, row.min, row.max) for row in per_station.itertuples()
+    ]
+
+
+def test_summarize_rejects_inverted_range():
+    with pytest.raises(InvalidYearRangeError):
+        AnalyticsService(get_repository()).summarize(["66062"], 1900, 1899)
+
+
+def test_trends_match_per_station_reference():
+    repository = get_repository()
+    station_ids = ["66062", "101234", "204567"]
+    stats = AnalyticsService(repository).trends(station_ids, 1901, 1987, window=5)
+    means = repository.annual_means(station_ids, 1901, 1987)
+    block = repository.annual_anomalies(station_ids, 1901, 1987)
+
+    for i in range(len(station_ids)):
+        valid = ~np.isnan(means.values[i])
+        years = means.years[valid].astype(float)
+        values = means.values[i, valid]
+        anomalies = block.values[i, ~np.isnan(block.values[i])]
+        pairs = [
+            (values[b] - values[a]) / (years[b] - years[a])
+            for a in range(len(years))
+            for b in range(a + 1, len(years))
+        ]
+        assert stats.ols_slope[i] == pytest.approx(np.polyfit(years, values, 1)[0], rel=1e-9)
+        assert stats.theil_sen_slope[i] == pytest.approx(np.median(pairs))
+        assert stats.mean_anomaly[i] == pytest.approx(anomalies.mean())
+        assert stats.moving_average[i, -1] == pytest.approx(np.nanmean(block.values[i, -5:]))
+
+
+def test_trends_cover_stations_without_baseline_data(tmp_path):
+    csv_path = tmp_path / "late.csv"
+    rows = [
+        f"late;{year};" + ";".join(str(10 + 0.05 * (year - 1995) + month) for month in range(12))
+        for year in range(1995, 2021)
+    ]
+    header = "Station Number;Year;Jan;Feb;Mar;Apr;May;Jun;Jul;Aug;Sep;Oct;Nov;Dec"
+    csv_path.write_text("\n".join([header, *rows]) + "\n")
+
+    stats = AnalyticsService(DataRepository(csv_path)).trends(["late"], 1995, 2020, window=5)
+    assert stats.count[0] == 26
+    assert stats.ols_slope[0] == pytest.approx(0.05)
+    assert stats.theil_sen_slope[0] == pytest.approx(0.05)
+    assert np.isnan(stats.mean_anomaly[0])
+    assert np.isnan(stats.moving_average[0]).all()
+
+
+def test_theil_sen_chunks_match_whole_block(monkeypatch):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(7, 30))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    whole = theil_sen_slopes(np.arange(30.0), values)
+    monkeypatch.setattr(trends, "PAIR_BUDGET", 2 * 435)
+    assert np.array_equal(theil_sen_slopes(np.arange(30.0), values), whole, equal_nan=True)
+
+
+def test_theil_sen_ignores_missing_years():
+    values = np.array([[0.0, np.nan, 2.0, 3.0, 100.0], [np.nan, np.nan, 1.0, np.nan, np.nan]])
+    slopes = theil_sen_slopes(np.arange(5.0), values)
+    assert slopes[0] == pytest.approx(np.median([1.0, 1.0, 25.0, 1.0, 49.0, 97.0]))
+    assert np.isnan(slopes[1])
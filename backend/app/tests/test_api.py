@@ -1,6 +1,24 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app.compute import ComputeExecutor
+from app.config import Settings
+from app.dependencies import (
+    get_compute_executor,
+    get_repository,
+    get_response_cache,
+    get_series_cache,
+    get_settings,
+)
 from app.main import app
+from app.serialization import ARROW_STREAM_MEDIA_TYPE, COLUMNS_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+from app.services.data_repository import DataRepository
+from app.services.response_cache import ResponseCache
 
 
 client = TestClient(app)
@@ -30,6 +48,18 @@ def test_temperature_data_monthly_request():
     assert len(data["series"][0]["points"]) > 0
 
 
+def test_invalid_payload_is_reported_before_station_validation():
+    payload = {
+        "station_ids": ["missing"],
+        "mode": "monthly",
+        "include_std_band": True,
+        "year_range": {"from": 1859, "to": 1860},
+    }
+    response = client.post("/api/temperature-data", json=payload)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_PAYLOAD"
+
+
 def test_analytics_endpoint_returns_summary():
     payload = {
         "station_ids": ["66062"],
@@ -41,3 +71,398 @@ def test_analytics_endpoint_returns_summary():
     assert data["stations_analyzed"] == 1
     assert data["selected_period"]["from"] == 1859
     assert data["selected_period"]["to"] >= 1860
+
+
+def test_temperature_data_columnar_format():
+    payload = {
+        "station_ids": ["66062", "101234"],
+        "mode": "annual",
+        "include_std_band": True,
+        "year_range": {"from": 1859, "to": 1868},
+        "format": "columns",
+    }
+    rows = client.post("/api/temperature-data", json={**payload, "format": "rows"}).json()
+    response = client.post("/api/temperature-data", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["format"] == "columns"
+    assert response.headers["content-type"] == COLUMNS_MEDIA_TYPE
+    for columnar, series in zip(data["series"], rows["series"]):
+        assert columnar["station_id"] == series["station_id"]
+        assert columnar["year"] == [point["year"] for point in series["points"]]
+        assert columnar["std"] == [point["std"] for point in series["points"]]
+
+
+def test_temperature_data_arrow_stream_via_accept_header():
+    pa = pytest.importorskip("pyarrow")
+    payload = {"station_ids": ["66062", "101234"], "mode": "monthly", "year_range": {"from": 1859, "to": 1860}}
+    response = client.post(
+        "/api/temperature-data",
+        json=payload,
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["station_id", "year", "month", "temperature"]
+    assert table.num_rows == 48
+    assert sorted(set(table.column("station_id").to_pylist())) == ["101234", "66062"]
+
+
+@pytest.mark.parametrize(
+    ("accept", "content_type"),
+    [
+        (COLUMNS_MEDIA_TYPE, COLUMNS_MEDIA_TYPE),
+        (f"{ARROW_STREAM_MEDIA_TYPE};q=0", "application/json"),
+        (f"{ARROW_STREAM_MEDIA_TYPE};q=0, {NDJSON_MEDIA_TYPE};q=0.5", NDJSON_MEDIA_TYPE),
+        (f"application/json, {COLUMNS_MEDIA_TYPE};q=0.5", "application/json"),
+        (f"application/json;q=0.4, {COLUMNS_MEDIA_TYPE};q=0.8", COLUMNS_MEDIA_TYPE),
+        ("*/*", "application/json"),
+    ],
+)
+def test_accept_header_honours_quality_values(accept, content_type):
+    payload = {"station_ids": ["66062"], "mode": "annual", "year_range": {"from": 1859, "to": 1860}}
+    response = client.post("/api/temperature-data", json=payload, headers={"Accept": accept})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == content_type
+
+
+def test_responses_carry_dataset_version():
+    stations = client.get("/api/stations")
+    payload = {"station_ids": ["66062"], "mode": "annual", "year_range": {"from": 1859, "to": 1860}}
+    data = client.post("/api/temperature-data", json=payload)
+    analytics = client.post("/api/analytics", json={"station_ids": ["66062"], "year_range": {"from": 1859, "to": 1860}})
+
+    version = stations.headers["X-Dataset-Version"]
+    assert version
+    assert data.headers["X-Dataset-Version"] == version
+    assert analytics.headers["X-Dataset-Version"] == version
+
+
+def test_admin_reload_is_disabled_without_token():
+    response = client.post("/api/admin/reload")
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "NOT_FOUND"
+
+
+def test_admin_reload_requires_matching_token():
+    app.dependency_overrides[get_settings] = lambda: Settings(admin_token="secret")
+    try:
+        assert client.post("/api/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        response = client.post("/api/admin/reload", headers={"X-Admin-Token": "secret"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["changed"] is False
+    assert response.json()["version"] == client.get("/api/stations").headers["X-Dataset-Version"]
+
+
+def test_repeated_requests_are_served_from_the_response_cache():
+    cache = ResponseCache(max_bytes=1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    try:
+        payload = {"station_ids": ["66062"], "year_range": {"from": 1859, "to": 1860}}
+        first = client.post("/api/analytics", json=payload)
+        second = client.post("/api/analytics", json={**payload, "station_ids": ["66062", "66062"]})
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.content == first.content
+
+        data_payload = {**payload, "mode": "annual", "include_std_band": True}
+        assert client.post("/api/temperature-data", json=data_payload).headers["X-Cache"] == "MISS"
+        assert client.post("/api/temperature-data", json=data_payload).headers["X-Cache"] == "HIT"
+        columns = client.post("/api/temperature-data", json={**data_payload, "format": "columns"})
+        assert columns.headers["X-Cache"] == "MISS"
+        assert cache.stats().entries == 3
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_widened_selection_only_encodes_new_stations():
+    series_cache = ResponseCache(max_bytes=1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    app.dependency_overrides[get_series_cache] = lambda: series_cache
+    try:
+        payload = {"station_ids": ["66062", "101234"], "mode": "monthly", "year_range": {"from": 1990, "to": 2000}}
+        client.post("/api/temperature-data", json=payload)
+        widened = client.post("/api/temperature-data", json={**payload, "station_ids": ["204567", "66062", "101234"]})
+
+        stats = series_cache.stats()
+        assert (stats.hits, stats.misses) == (2, 3)
+        assert [series["station_id"] for series in widened.json()["series"]] == ["101234", "204567", "66062"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_matching_if_none_match_gets_not_modified():
+    payload = {"station_ids": ["66062"], "year_range": {"from": 1859, "to": 1860}}
+    first = client.post("/api/analytics", json=payload)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    revalidated = client.post("/api/analytics", json=payload, headers={"If-None-Match": f'W/"stale", {etag}'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+
+    other = client.post("/api/analytics", json={**payload, "year_range": {"from": 1859, "to": 1861}})
+    assert other.headers["ETag"] != etag
+
+
+def test_get_variant_redirects_to_canonical_query_and_matches_post():
+    response = client.get(
+        "/api/temperature-data",
+        params={"to": 2000, "from": 1990, "mode": "annual", "station_ids": "66062,101234,66062"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 308
+    location = response.headers["location"]
+    assert location == "/api/temperature-data?station_ids=101234,66062&mode=annual&from=1990&to=2000"
+
+    canonical = client.get(location)
+    posted = client.post(
+        "/api/temperature-data",
+        json={"station_ids": ["66062", "101234"], "mode": "annual", "year_range": {"from": 1990, "to": 2000}},
+    )
+    assert canonical.status_code == 200
+    assert canonical.content == posted.content
+    assert canonical.headers["ETag"] == posted.headers["ETag"]
+
+
+def test_saturated_executor_returns_503_with_retry_after():
+    executor = ComputeExecutor(workers=1, max_pending=1, retry_after=7)
+    release = threading.Event()
+    blocker = threading.Thread(
+        target=asyncio.run, args=(executor.run(lambda repository: release.wait(5), get_repository()),)
+    )
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    app.dependency_overrides[get_compute_executor] = lambda: executor
+    blocker.start()
+    try:
+        time.sleep(0.05)
+        payload = {"station_ids": ["66062"], "year_range": {"from": 1859, "to": 1860}}
+        response = client.post("/api/analytics", json=payload)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+        assert response.json()["error"]["code"] == "OVERLOADED"
+    finally:
+        release.set()
+        blocker.join()
+        executor.shutdown()
+        app.dependency_overrides.clear()
+
+
+def test_batch_matches_individual_endpoints():
+    year_range = {"from": 1990, "to": 2000}
+    queries = [
+        {"type": "temperature-data", "station_ids": ["66062", "101234"], "mode": "annual", "year_range": year_range},
+        {"type": "temperature-data", "station_ids": ["101234"], "mode": "annual", "year_range": year_range},
+        {"type": "analytics", "station_ids": ["66062", "101234"], "year_range": year_range},
+        {"type": "analytics", "station_ids": ["66062", "999999"], "year_range": year_range},
+        {
+            "type": "temperature-data",
+            "station_ids": ["66062"],
+            "mode": "monthly",
+            "year_range": year_range,
+            "format": "arrow",
+        },
+    ]
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    try:
+        response = client.post("/api/batch", json={"queries": queries})
+        assert response.status_code == 200
+        results = response.json()["results"]
+
+        for query, result in zip(queries[:4], results):
+            endpoint = "/api/" + query.pop("type")
+            single = client.post(endpoint, json=query)
+            assert result["status"] == single.status_code
+            assert result["body"] == single.json()
+        assert results[3]["body"]["error"]["code"] == "INVALID_STATION"
+        assert results[4]["status"] == 406
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_ndjson_streams_one_series_per_line():
+    payload = {
+        "station_ids": ["66062", "101234", "204567"],
+        "mode": "monthly",
+        "year_range": {"from": 1990, "to": 2000},
+    }
+    rows = client.post("/api/temperature-data", json=payload).json()
+
+    headers = {"Accept": "application/x-ndjson"}
+    with client.stream("POST", "/api/temperature-data", json=payload, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert lines == rows["series"]
+
+
+def test_ndjson_reuses_cached_series_without_filling_the_cache():
+    series_cache = ResponseCache(max_bytes=1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    app.dependency_overrides[get_series_cache] = lambda: series_cache
+    try:
+        payload = {"station_ids": ["66062"], "mode": "monthly", "year_range": {"from": 1990, "to": 2000}}
+        client.post("/api/temperature-data", json=payload)
+        size_bytes = series_cache.stats().size_bytes
+
+        streamed = {**payload, "station_ids": ["66062", "101234", "204567"], "format": "ndjson"}
+        with client.stream("POST", "/api/temperature-data", json=streamed) as response:
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+
+        stats = series_cache.stats()
+        assert [line["station_id"] for line in lines] == ["101234", "204567", "66062"]
+        assert (stats.entries, stats.size_bytes) == (1, size_bytes)
+        assert stats.hits == 1
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_ndjson_reports_errors_before_streaming():
+    payload = {
+        "station_ids": ["999999"],
+        "mode": "monthly",
+        "year_range": {"from": 1990, "to": 2000},
+        "format": "ndjson",
+    }
+    response = client.post("/api/temperature-data", json=payload)
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_STATION"
+    assert response.json()["error"]["message"] == "Unknown station ids: 999999."
+
+
+def test_rollup_endpoints_return_series():
+    body = {"station_ids": ["66062", "101234"], "year_range": {"from": 1950, "to": 2000}}
+
+    decadal = client.post("/api/rollups/decadal", json=body)
+    assert decadal.status_code == 200
+    assert [point["decade"] for point in decadal.json()["series"][0]["points"]] == [1950, 1960, 1970, 1980, 1990, 2000]
+
+    seasonal = client.post("/api/rollups/seasonal", json=body)
+    assert seasonal.status_code == 200
+    assert set(seasonal.json()["series"][0]["points"][0]) == {"year", "djf", "mam", "jja", "son"}
+
+    climatology = client.post("/api/rollups/climatology", json={**body, "mode": "monthly"})
+    assert climatology.status_code == 200
+    data = climatology.json()
+    assert data["baseline"] == {"from": 1961, "to": 1990}
+    assert len(data["series"][0]["normals"]) == 12
+    assert {"year", "month", "anomaly"} == set(data["series"][0]["points"][0])
+
+    unknown = client.post("/api/rollups/seasonal", json={**body, "station_ids": ["missing"]})
+    assert unknown.status_code == 400
+
+
+def test_trends_endpoint_reuses_station_fragments():
+    body = {"station_ids": ["66062", "101234"], "year_range": {"from": 1900, "to": 2000}, "window": 5}
+    both = client.post("/api/analytics/trends", json=body)
+    assert both.status_code == 200
+    data = both.json()
+    assert data["window"] == 5
+    assert [station["station_id"] for station in data["per_station"]] == ["101234", "66062"]
+
+    single = client.post("/api/analytics/trends", json={**body, "station_ids": ["66062"]})
+    assert single.json()["per_station"] == data["per_station"][1:]
+
+    too_many = client.post("/api/analytics/trends", json={**body, "station_ids": [str(n) for n in range(251)]})
+    assert too_many.status_code == 422
+
+
+def _repository_without_baseline(tmp_path, *extra_rows):
+    csv_path = tmp_path / "late.csv"
+    rows = [f"late;{year};" + ";".join(["12.5"] * 11 + [str(year - 1990)]) for year in range(1995, 2021)]
+    header = "Station Number;Year;Jan;Feb;Mar;Apr;May;Jun;Jul;Aug;Sep;Oct;Nov;Dec"
+    csv_path.write_text("\n".join([header, *rows, *extra_rows]))
+    return DataRepository(csv_path)
+
+
+def test_trends_report_slopes_for_stations_outside_the_baseline(tmp_path):
+    repository = _repository_without_baseline(tmp_path)
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        body = {"station_ids": ["late"], "year_range": {"from": 1995, "to": 2020}}
+        response = client.post("/api/analytics/trends", json=body)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    [trend] = response.json()["per_station"]
+    assert trend["years_with_data"] == 26
+    assert trend["ols_slope"] == pytest.approx(10 / 12)
+    assert trend["mean_anomaly"] is None
+    assert trend["moving_average"] == []
+
+
+def test_climatology_flags_stations_without_baseline_data(tmp_path):
+    repository = _repository_without_baseline(tmp_path, "early;1975;" + ";".join(["8.0"] * 12))
+    app.dependency_overrides[get_repository] = lambda: repository
+    try:
+        body = {"station_ids": ["early", "late"], "year_range": {"from": 1975, "to": 2000}}
+        mixed = client.post("/api/rollups/climatology", json=body)
+        late_only = client.post("/api/rollups/climatology", json={**body, "station_ids": ["late"]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert mixed.status_code == 200
+    early, late = mixed.json()["series"]
+    assert early["has_baseline"] and early["normals"] == [8.0] * 12
+    assert not late["has_baseline"] and late["normals"] == [None] * 12
+    assert {point["anomaly"] for point in late["points"]} == {None}
+
+    assert late_only.status_code == 404
+    assert late_only.json()["error"] == {
+        "code": "NO_DATA",
+        "message": "No data in the 1961-1990 baseline period for the selected stations.",
+    }
+
+
+def test_server_timing_and_metrics_cover_request_stages():
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    try:
+        body = {"station_ids": ["66062"], "year_range": {"from": 1900, "to": 1950}}
+        response = client.post("/api/analytics", json=body)
+    finally:
+        app.dependency_overrides.clear()
+
+    stages = {entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")}
+    assert {"validate", "range_query", "model", "encode", "compute", "total"} <= stages
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert 'climate_request_duration_seconds_count{method="POST",route="/api/analytics",status="200"}' in metrics.text
+    assert 'climate_cache_hit_ratio{cache="responses"}' in metrics.text
+    assert "climate_dataset_load_seconds " in metrics.text
+    assert "climate_dataset_bytes " in metrics.text
+
+
+def test_compressed_variants_are_cached_and_revalidate():
+    cache = ResponseCache(64 * 1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    payload = {"station_ids": ["66062", "101234"], "mode": "monthly", "year_range": {"from": 1859, "to": 2019}}
+    try:
+        first = client.post("/api/temperature-data", json=payload, headers={"Accept-Encoding": "gzip"})
+        second = client.post("/api/temperature-data", json=payload, headers={"Accept-Encoding": "gzip"})
+        plain = client.post("/api/temperature-data", json=payload, headers={"Accept-Encoding": "identity"})
+        revalidated = client.post(
+            "/api/temperature-data",
+            json=payload,
+            headers={"Accept-Encoding": "gzip", "If-None-Match": second.headers["ETag"]},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.headers["Content-Encoding"] == second.headers["Content-Encoding"] == "gzip"
+    assert "compress" in first.headers["Server-Timing"]
+    assert "compress" not in second.headers["Server-Timing"]
+    assert int(second.headers["Content-Length"]) < len(plain.content) / 5
+    assert second.content == plain.content
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    assert revalidated.status_code == 304
+    for header in ("ETag", "Vary", "Cache-Control"):
+        assert revalidated.headers[header] == second.headers[header]
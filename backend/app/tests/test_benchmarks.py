@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+import httpx
+import numpy as np
+import pytest
+
+from app.main import app
+from app.services.data_repository import DataRepository
+from benchmarks.loadtest import Workload, regressions, run_stage, zipf_weights
+from benchmarks.suite import CaseResult, compare, run_case
+from benchmarks.synthetic import write_synthetic_csv
+
+
+def test_synthetic_csv_loads_at_requested_scale(tmp_path):
+    csv_path = write_synthetic_csv(tmp_path / "synthetic.csv", stations=7, years=30, first_year=1900, missing=0.1)
+    repository = DataRepository(csv_path)
+
+    assert len(repository.station_ids) == 7
+    assert repository.get_global_year_bounds() == (1900, 1929)
+    monthly = repository.filter_monthly(repository.station_ids, 1900, 1929)
+    assert 0.8 * 7 * 30 * 12 < len(monthly) < 7 * 30 * 12
+    assert np.isfinite(monthly["temperature"]).all()
+
+
+def test_compare_flags_growth_past_threshold():
+    baseline = {"cases": {"summarize": {"p50_ms": 10.0, "p99_ms": 20.0, "peak_rss_mib": 100.0}}}
+
+    def result(p50: float, p99: float) -> CaseResult:
+        return CaseResult(name="summarize", runs=1, p50_ms=p50, p99_ms=p99, throughput=1.0, peak_rss_mib=100.0)
+
+    assert compare([result(11.0, 21.0)], baseline, threshold=0.25) == []
+    assert compare([result(13.0, 21.0)], baseline, threshold=0.25) == ["summarize: p50_ms 10.00 -> 13.00 (+30%)"]
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="needs a resettable RSS high-water mark")
+def test_peak_rss_is_measured_per_case():
+    heavy = run_case("heavy", lambda: np.ones(32 * 2**20 // 8).sum(), runs=1, warmup=0)
+    light = run_case("light", lambda: None, runs=1, warmup=0)
+    assert light.peak_rss_mib < heavy.peak_rss_mib - 16
+
+
+def test_workload_draws_zipf_popular_requests_deterministically():
+    stations = [
+        {"id": str(n), "name": f"Station {n}", "first_year": 1900, "last_year": 1950} for n in range(100)
+    ]
+    weights = zipf_weights(100, 1.1)
+    assert np.isclose(weights.sum(), 1.0)
+    assert (np.diff(weights) < 0).all()
+
+    workload = Workload(stations, {"temperature-data": 1.0}, max_selection=1, seed=3)
+    draws = [workload.draw(np.random.default_rng(7)) for _ in range(2)]
+    assert draws[0] == draws[1]
+
+    rng = np.random.default_rng(0)
+    picked = [workload.draw(rng)[3]["station_ids"][0] for _ in range(2000)]
+    counts = sorted((picked.count(sid) for sid in set(picked)), reverse=True)
+    assert counts[0] > 10 * counts[len(counts) // 2]
+
+
+def test_load_stage_reports_throughput_latency_and_rss():
+    async def stage():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            stations = (await client.get("/api/stations")).json()
+            workload = Workload(stations, {"stations": 1.0, "analytics": 1.0}, seed=0)
+            return await run_stage(client, workload, concurrency=2, duration=0.3, root_pid=os.getpid())
+
+    result = asyncio.run(stage())
+    assert result["requests"] == result["latency"]["all"]["requests"] > 0
+    assert result["error_rate"] == 0.0
+    assert set(result["statuses"]) <= {"200", "404"}
+    assert result["latency"]["analytics"]["p50_ms"] <= result["latency"]["analytics"]["p99_ms"]
+    assert str(os.getpid()) in result["peak_rss_mib"]
+
+    slower = {**result, "throughput": result["throughput"] / 2, "error_rate": 0.05}
+    report = {"stages": [slower], "cases": {}}
+    assert regressions(report, {"stages": [result]}, threshold=0.25) == [
+        f"c2: throughput {result['throughput']:.1f} -> {slower['throughput']:.1f} req/s (-50%)",
+        "c2: error rate 0.00% -> 5.00%",
+    ]
@@ -0,0 +1,36 @@
+import gzip
+
+import pytest
+
+from app.compression import compress, negotiate_encoding
+from app.http_cache import encoded_tag, etag_matches
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "br"),
+        ("GZIP;q=0.8, deflate", "gzip"),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding, available=("zstd", "br", "gzip")) == expected
+
+
+def test_gzip_output_is_deterministic():
+    body = b'{"series":[]}' * 100
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip")) == body
+
+
+def test_encoded_tags_match_their_plain_tag():
+    etag = '"abc123"'
+    assert etag_matches(encoded_tag(etag, "br"), etag)
+    assert etag_matches(f"W/{encoded_tag(etag, 'gzip')}", etag)
+    assert not etag_matches('"abc123-other"', etag)
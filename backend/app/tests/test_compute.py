@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import types
+
+import pytest
+
+from app import compute, dependencies, tasks
+from app.compute import ComputeExecutor, ExecutorSaturated
+from app.dependencies import get_repository
+
+
+def _wait(repository, event: threading.Event) -> str:
+    event.wait(5)
+    return repository.version
+
+
+def test_executor_sheds_work_beyond_max_pending():
+    repository = get_repository()
+    executor = ComputeExecutor(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(executor.run(_wait, repository, release))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(_wait, repository, release)
+        release.set()
+        assert await running == repository.version
+        assert await executor.run(_wait, repository, release) == repository.version
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_process_executor_matches_thread_executor():
+    repository = get_repository()
+    args = (["66062", "101234"], 1990, 2000)
+    threads = ComputeExecutor(workers=1, max_pending=4)
+    processes = ComputeExecutor(workers=1, max_pending=4, processes=True)
+    try:
+        expected = asyncio.run(threads.run(tasks.render_analytics, repository, *args))
+        assert asyncio.run(processes.run(tasks.render_analytics, repository, *args)) == expected
+    finally:
+        threads.shutdown()
+        processes.shutdown()
+
+
+class _StaleRegistry:
+    """Registry whose reloads never reach the version on disk, as while the CSV is still being replaced."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.reloads = 0
+
+    def current(self):
+        return types.SimpleNamespace(version="old")
+
+    def source_version(self) -> str:
+        return self.source
+
+    def reload(self):
+        self.reloads += 1
+        return self.current()
+
+
+def test_worker_reloads_at_most_once_per_version_then_sheds(monkeypatch):
+    registry = _StaleRegistry(source="new")
+    monkeypatch.setattr(dependencies, "get_registry", lambda: registry)
+    monkeypatch.setattr(compute, "_reloaded_for", None)
+
+    for _ in range(3):
+        with pytest.raises(compute.DatasetVersionMismatch):
+            compute._run_in_worker(_wait, "new", (None,))
+    assert registry.reloads == 1
+
+    # The parent expects a version the files no longer hold: no reload can help.
+    with pytest.raises(compute.DatasetVersionMismatch):
+        compute._run_in_worker(_wait, "older", (None,))
+    assert registry.reloads == 1
+
+    def mismatch(repository):
+        raise compute.DatasetVersionMismatch("stale worker")
+
+    executor = ComputeExecutor(workers=1, max_pending=1, retry_after=3)
+    try:
+        with pytest.raises(ExecutorSaturated) as shed:
+            asyncio.run(executor.run(mismatch, get_repository()))
+    finally:
+        executor.shutdown()
+    assert shed.value.retry_after == 3
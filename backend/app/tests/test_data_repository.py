@@ -0,0 +1,325 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import Settings
+from app.dependencies import get_repository
+from app.services import data_repository
+from app.services.columns import column_arrays
+from app.services.data_repository import MONTH_TO_NUMBER, MONTHS, DataRepository
+from app.services.exceptions import InvalidStationError
+from app.services.snapshot import snapshot_key
+
+
+@pytest.fixture(scope="module")
+def repository():
+    return get_repository()
+
+
+@pytest.fixture(scope="module")
+def pandas_frames():
+    """Monthly and annual frames built straight from the raw CSV with pandas, as before the cube existed."""
+
+    raw = pd.read_csv(Settings().data_path, sep=";", dtype={"Station Number": "string", "Year": "Int64"})
+    monthly = (
+        raw.melt(id_vars=["Station Number", "Year"], value_vars=MONTHS, var_name="month_name", value_name="temperature")
+        .dropna(subset=["temperature"])
+        .assign(
+            station_id=lambda df: df["Station Number"].astype(str),
+            year=lambda df: df["Year"].astype(int),
+            month=lambda df: df["month_name"].map(MONTH_TO_NUMBER).astype(int),
+        )
+        .drop(columns=["Station Number", "Year", "month_name"])
+        .sort_values(["station_id", "year", "month"])
+        .reset_index(drop=True)
+    )
+    annual = monthly.groupby(["station_id", "year"])["temperature"].agg(mean="mean", std=lambda s: s.std(ddof=0))
+    annual = annual.reset_index()
+    annual["upper"] = annual["mean"] + annual["std"]
+    annual["lower"] = annual["mean"] - annual["std"]
+    return monthly, annual
+
+
+def test_filter_monthly_matches_boolean_mask(repository, pandas_frames):
+    station_ids = ["66062", "101234"]
+    df = repository.filter_monthly(station_ids, 1900, 1910)
+
+    monthly, _ = pandas_frames
+    mask = monthly["station_id"].isin(station_ids) & monthly["year"].between(1900, 1910)
+    pd.testing.assert_frame_equal(df, monthly.loc[mask])
+
+
+def test_filter_annual_matches_boolean_mask(repository, pandas_frames):
+    station_ids = ["202345"]
+    df = repository.filter_annual(station_ids, 1859, 1860)
+
+    _, annual = pandas_frames
+    mask = annual["station_id"].isin(station_ids) & annual["year"].between(1859, 1860)
+    pd.testing.assert_frame_equal(df, annual.loc[mask])
+    assert df["year"].tolist() == [1859, 1860]
+
+
+def test_cube_values_line_up_with_monthly_rows(repository):
+    cube = repository.cube
+    block = cube.monthly[cube.station_codes["66062"], 1859 - cube.first_year]
+
+    df = repository.filter_monthly(["66062"], 1859, 1859)
+    np.testing.assert_array_equal(block[df["month"].to_numpy() - 1], df["temperature"].to_numpy())
+
+
+def test_select_normalizes_once_and_names_unknown_ids(repository):
+    selection = repository.select(["204567", "66062", "204567"])
+    assert selection.station_ids == ("204567", "66062")
+    codes = repository.cube.station_codes
+    assert selection.codes.tolist() == sorted([codes["66062"], codes["204567"]])
+    assert repository.select(selection) is selection
+    assert list(repository.aggregate_monthly(selection, 1900, 1910).codes) == list(selection.codes)
+
+    with pytest.raises(InvalidStationError, match=r"^Unknown station ids: 1, 2\.$"):
+        repository.select(["66062", "2", "1"])
+    unknown = [str(n) for n in range(900, 915)]
+    with pytest.raises(InvalidStationError, match=r"Unknown station ids: 900, .*, 909 and 5 more\.$"):
+        repository.select(unknown)
+
+
+def test_snapshot_is_written_once_and_reused(tmp_path, monkeypatch):
+    csv_path = tmp_path / "temperatures.csv"
+    csv_path.write_bytes(Settings().data_path.read_bytes())
+    snapshot_dir = tmp_path / "snapshots"
+
+    cold = DataRepository(csv_path, snapshot_dir=snapshot_dir)
+    assert len(list(snapshot_dir.iterdir())) == 1
+
+    def _fail(_):
+        raise AssertionError("CSV should not be parsed when a snapshot exists")
+
+    monkeypatch.setattr(data_repository, "_load_monthly_columns", _fail)
+    warm = DataRepository(csv_path, snapshot_dir=snapshot_dir)
+    pd.testing.assert_frame_equal(
+        warm.filter_monthly(["66062"], 1859, 2019), cold.filter_monthly(["66062"], 1859, 2019)
+    )
+    pd.testing.assert_frame_equal(
+        warm.filter_annual(warm.station_ids, 1859, 2019), cold.filter_annual(cold.station_ids, 1859, 2019)
+    )
+
+
+def test_snapshot_is_invalidated_when_csv_changes(tmp_path):
+    csv_path = tmp_path / "temperatures.csv"
+    lines = Settings().data_path.read_text().splitlines(keepends=True)
+    csv_path.write_text("".join(lines[:-1]))
+    snapshot_dir = tmp_path / "snapshots"
+    DataRepository(csv_path, snapshot_dir=snapshot_dir)
+    (first,) = snapshot_dir.iterdir()
+
+    csv_path.write_text("".join(lines))
+    repository = DataRepository(csv_path, snapshot_dir=snapshot_dir)
+    (second,) = snapshot_dir.iterdir()
+    assert first != second
+    assert len(repository.filter_monthly(["204567"], 2019, 2019)) == 8
+
+
+def test_rollups_are_stored_in_the_snapshot_per_baseline(tmp_path, monkeypatch):
+    csv_path = tmp_path / "temperatures.csv"
+    csv_path.write_bytes(Settings().data_path.read_bytes())
+    snapshot_dir = tmp_path / "snapshots"
+    cold = DataRepository(csv_path, snapshot_dir=snapshot_dir, mmap=True)
+
+    def _fail(*_):
+        raise AssertionError("rollups should be read from the snapshot")
+
+    monkeypatch.setattr(data_repository, "build_rollups", _fail)
+    warm = DataRepository(csv_path, snapshot_dir=snapshot_dir, mmap=True)
+    for name in ("seasonal", "annual_mean", "normals", "annual_anomaly", "has_data"):
+        stored = getattr(warm._all_rows.rollups, name)
+        assert isinstance(stored, np.memmap)
+        np.testing.assert_array_equal(stored, getattr(cold._all_rows.rollups, name))
+
+    monkeypatch.undo()
+    DataRepository(csv_path, snapshot_dir=snapshot_dir, climatology_baseline=(1951, 1980))
+    (snapshot,) = snapshot_dir.iterdir()
+    assert sorted(path.name for path in snapshot.glob("rollups-*")) == ["rollups-1951-1980", "rollups-1961-1990"]
+
+
+def test_csv_changed_during_parse_is_not_snapshotted_as_current(tmp_path, monkeypatch):
+    csv_path = tmp_path / "temperatures.csv"
+    lines = Settings().data_path.read_text().splitlines(keepends=True)
+    csv_path.write_text("".join(lines[:-1]))
+    snapshot_dir = tmp_path / "snapshots"
+    build_snapshot = data_repository._build_snapshot
+
+    def _rewrite_after_parse(*args, **kwargs):
+        snapshot = build_snapshot(*args, **kwargs)
+        csv_path.write_text("".join(lines))
+        return snapshot
+
+    monkeypatch.setattr(data_repository, "_build_snapshot", _rewrite_after_parse)
+    stale = DataRepository(csv_path, snapshot_dir=snapshot_dir)
+    monkeypatch.setattr(data_repository, "_build_snapshot", build_snapshot)
+
+    assert stale.version != snapshot_key(csv_path)
+    (snapshot,) = snapshot_dir.iterdir()
+    assert snapshot.name.endswith(stale.version)
+    repository = DataRepository(csv_path, snapshot_dir=snapshot_dir)
+    assert repository.version == snapshot_key(csv_path)
+    assert len(repository.filter_monthly(["204567"], 2019, 2019)) == 8
+
+
+def test_same_named_sources_keep_their_own_snapshots(tmp_path, monkeypatch):
+    snapshot_dir = tmp_path / "snapshots"
+    for region in ("north", "south"):
+        (tmp_path / region).mkdir()
+        (tmp_path / region / "temperatures.csv").write_bytes(Settings().data_path.read_bytes())
+        DataRepository(tmp_path / region / "temperatures.csv", snapshot_dir=snapshot_dir)
+    assert len(list(snapshot_dir.iterdir())) == 2
+
+    def _fail(_):
+        raise AssertionError("CSV should not be parsed when a snapshot exists")
+
+    monkeypatch.setattr(data_repository, "_load_monthly_columns", _fail)
+    DataRepository(tmp_path / "north" / "temperatures.csv", snapshot_dir=snapshot_dir)
+
+
+def _write_shards(directory, stations_per_shard):
+    lines = Settings().data_path.read_text().splitlines(keepends=True)
+    header, rows = lines[0], lines[1:]
+    directory.mkdir()
+    for index, stations in enumerate(stations_per_shard):
+        shard_rows = [row for row in rows if row.split(";", 1)[0] in stations]
+        (directory / f"region-{index}.csv").write_text(header + "".join(shard_rows))
+
+
+def test_sharded_directory_matches_single_csv(tmp_path, repository):
+    stations = repository.station_ids
+    _write_shards(tmp_path / "regions", [stations[1::2], stations[::2]])
+
+    sharded = DataRepository(tmp_path / "regions", snapshot_dir=tmp_path / "snapshots", workers=2)
+    assert sharded.station_ids == repository.station_ids
+    pd.testing.assert_frame_equal(
+        sharded.filter_monthly(stations, 1859, 2019), repository.filter_monthly(stations, 1859, 2019)
+    )
+    pd.testing.assert_frame_equal(
+        sharded.filter_annual(stations, 1859, 2019), repository.filter_annual(stations, 1859, 2019)
+    )
+
+    globbed = DataRepository(tmp_path / "regions" / "region-*.csv", snapshot_dir=tmp_path / "snapshots", workers=1)
+    assert globbed.version == sharded.version
+    assert len(list((tmp_path / "snapshots").iterdir())) == 2
+
+    part = data_repository._load_shard(tmp_path / "regions" / "region-0.csv")
+    assert part.station_ids == tuple(stations[1::2])
+    assert all(values.dtype != object for values in column_arrays(part.monthly).values())
+
+
+def test_station_in_two_shards_is_rejected(tmp_path, repository):
+    stations = repository.station_ids
+    _write_shards(tmp_path / "regions", [stations[:2], stations[1:]])
+
+    with pytest.raises(ValueError, match=f"Station {stations[1]} appears in both"):
+        DataRepository(tmp_path / "regions", workers=1)
+
+
+def test_mmap_repository_serves_identical_slices(tmp_path, repository):
+    shared = DataRepository(Settings().data_path, snapshot_dir=tmp_path, mmap=True)
+
+    assert isinstance(shared.cube.monthly, np.memmap)
+    assert not shared.cube.monthly.flags.writeable
+    pd.testing.assert_frame_equal(
+        shared.filter_monthly(["66062", "204567"], 1950, 1960),
+        repository.filter_monthly(["66062", "204567"], 1950, 1960),
+    )
+    first_years = [meta.first_year for meta in repository.get_stations()]
+    assert [meta.first_year for meta in shared.get_stations()] == first_years
+
+
+def test_annual_columns_match_groupby_statistics(pandas_frames):
+    station_ids, monthly = data_repository._load_monthly_columns(Settings().data_path)
+    annual = data_repository._build_annual_columns(monthly)
+    names = np.array(station_ids, dtype=object)
+
+    expected_monthly, _ = pandas_frames
+    pd.testing.assert_frame_equal(monthly.to_frame(np.arange(len(monthly.station)), names), expected_monthly)
+    frame = annual.to_frame(np.arange(len(annual.station)), names)
+    grouped = expected_monthly.groupby(["station_id", "year"])["temperature"]
+    expected = grouped.agg(mean="mean", std=lambda values: values.std(ddof=0)).reset_index()
+    pd.testing.assert_frame_equal(frame[["station_id", "year", "mean", "std"]], expected, check_exact=True)
+    pd.testing.assert_series_equal(frame["upper"], expected["mean"] + expected["std"], check_names=False)
+    pd.testing.assert_series_equal(frame["lower"], expected["mean"] - expected["std"], check_names=False)
+
+
+def test_chunked_ingestion_matches_single_pass():
+    progress = []
+    station_ids, chunked = data_repository._load_monthly_columns(
+        Settings().data_path, chunk_size=250, progress=lambda rows, values: progress.append((rows, values))
+    )
+
+    single_ids, single = data_repository._load_monthly_columns(Settings().data_path)
+    assert station_ids == single_ids
+    for name, values in column_arrays(chunked).items():
+        np.testing.assert_array_equal(values, getattr(single, name))
+        assert values.dtype == getattr(single, name).dtype != object
+    assert len(progress) == 7
+    assert progress[-1] == (1610, len(chunked.temperature))
+
+
+def test_chunked_ingestion_validates_every_chunk(tmp_path):
+    csv_path = tmp_path / "broken.csv"
+    csv_path.write_text("Station Number;Year;Jan\n1;1900;1.0\n")
+
+    with pytest.raises(ValueError, match="missing columns"):
+        data_repository._load_monthly_columns(csv_path, chunk_size=1)
+
+
+def test_seasonal_djf_takes_previous_december(repository):
+    monthly = repository.filter_monthly(["66062"], 1900, 1901).set_index(["year", "month"])["temperature"]
+    block = repository.seasonal(["66062"], 1901, 1901)
+
+    expected_djf = (monthly[(1900, 12)] + monthly[(1901, 1)] + monthly[(1901, 2)]) / 3
+    expected_jja = monthly.loc[1901].loc[[6, 7, 8]].mean()
+    assert block.values[0, 0, 0] == pytest.approx(expected_djf)
+    assert block.values[0, 0, 2] == pytest.approx(expected_jja)
+
+
+def test_normals_and_anomalies_match_groupby(repository):
+    df = repository.filter_monthly(["101234"], 1961, 1990)
+    expected = df.groupby("month")["temperature"].mean()
+    np.testing.assert_allclose(repository.normals(["101234"])[0, expected.index - 1], expected.to_numpy())
+
+    year = repository.filter_monthly(["101234"], 2000, 2000)
+    departures = year["temperature"].to_numpy() - expected.loc[year["month"]].to_numpy()
+    block = repository.annual_anomalies(["101234"], 2000, 2000)
+    assert block.values[0, 0] == pytest.approx(departures.mean())
+
+
+def test_decadal_matches_range_aggregates(repository):
+    decades = dict(repository.decadal(["66062", "202345"], 1905, 1923))
+    assert list(decades) == [1900, 1910, 1920]
+
+    expected = repository.aggregate_monthly(["66062", "202345"], 1910, 1919)
+    np.testing.assert_allclose(decades[1910].mean, expected.mean)
+    first = repository.aggregate_monthly(["66062", "202345"], 1905, 1909)
+    np.testing.assert_array_equal(decades[1900].count, first.count)
+
+
+def test_lazy_repository_loads_stations_on_demand_within_budget(tmp_path, repository):
+    DataRepository(Settings().data_path, snapshot_dir=tmp_path)
+    stations = repository.station_ids
+    one_station = len(repository.cube.monthly[0]) * 12 * 8
+    lazy = DataRepository(Settings().data_path, snapshot_dir=tmp_path, resident_bytes=8 * one_station)
+
+    assert lazy.resident_stats().entries == 0
+    assert [meta.last_year for meta in lazy.get_stations()] == [meta.last_year for meta in repository.get_stations()]
+
+    for selection in (stations[:3], stations[2:4], stations):
+        eager_aggregates = repository.aggregate_monthly(selection, 1900, 1950)
+        lazy_aggregates = lazy.aggregate_monthly(selection, 1900, 1950)
+        np.testing.assert_array_equal(lazy_aggregates.codes, eager_aggregates.codes)
+        np.testing.assert_array_equal(lazy_aggregates.mean, eager_aggregates.mean)
+        for kind in ("seasonal", "annual_anomalies", "monthly_anomalies"):
+            np.testing.assert_array_equal(
+                getattr(lazy, kind)(selection, 1859, 2019).values,
+                getattr(repository, kind)(selection, 1859, 2019).values,
+            )
+
+    stats = lazy.resident_stats()
+    assert stats.hits > 0 and stats.evictions > 0
+    assert 0 < stats.size_bytes <= stats.max_bytes
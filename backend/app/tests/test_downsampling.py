@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.dependencies import get_repository
+from app.services.downsampling import downsample_slice, minmax_indices
+
+
+def test_minmax_indices_keeps_endpoints_and_extremes():
+    values = np.sin(np.linspace(0, 20, 1000))
+    values[537] = 5.0
+    values[100] = -5.0
+
+    keep = minmax_indices(values, 50)
+
+    assert len(keep) <= 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    assert {100, 537} <= set(keep.tolist())
+
+
+def test_minmax_indices_is_identity_for_short_series():
+    np.testing.assert_array_equal(minmax_indices(np.arange(10.0), 10), np.arange(10))
+
+
+def test_downsample_slice_bounds_every_series():
+    repository = get_repository()
+    data = repository.monthly_series(["66062", "101234"], 1859, 2019)
+
+    thinned = downsample_slice(data, "temperature", 200)
+
+    assert thinned.station_ids == data.station_ids
+    for (_, original), (_, reduced) in zip(data.series(), thinned.series()):
+        assert len(reduced["temperature"]) <= 200
+        assert reduced["temperature"].max() == original["temperature"].max()
+        assert reduced["temperature"].min() == original["temperature"].min()
+        assert np.all(np.diff(reduced["year"] * 12 + reduced["month"]) > 0)
@@ -0,0 +1,70 @@
+import time
+from functools import partial
+
+import pytest
+
+from app.config import Settings
+from app.services.data_repository import DataRepository
+from app.services.repository_registry import RepositoryRegistry
+from app.services.response_cache import CachedResponse, ResponseCache
+
+
+@pytest.fixture
+def csv_lines():
+    return Settings().data_path.read_text().splitlines(keepends=True)
+
+
+@pytest.fixture
+def registry(tmp_path, csv_lines):
+    csv_path = tmp_path / "temperatures.csv"
+    csv_path.write_text("".join(csv_lines[:-1]))
+    return RepositoryRegistry(csv_path, partial(DataRepository, csv_path, snapshot_dir=tmp_path / "snapshots"))
+
+
+def test_reload_swaps_repository_and_leaves_old_snapshot_usable(registry, csv_lines, tmp_path):
+    old = registry.current()
+    assert registry.current() is old
+    assert not registry.is_stale()
+
+    (tmp_path / "temperatures.csv").write_text("".join(csv_lines))
+    assert registry.is_stale()
+
+    new = registry.reload()
+    assert registry.current() is new
+    assert new.version != old.version
+    assert len(new.filter_monthly(["204567"], 2019, 2019)) == 8
+    assert len(old.filter_monthly(["204567"], 2019, 2019)) == 0
+
+
+def test_reload_clears_caches_only_when_the_version_changes(tmp_path, csv_lines):
+    csv_path = tmp_path / "temperatures.csv"
+    csv_path.write_text("".join(csv_lines[:-1]))
+    caches = (ResponseCache(1 << 20), ResponseCache(1 << 20))
+    loader = partial(DataRepository, csv_path, snapshot_dir=tmp_path / "snapshots")
+    registry = RepositoryRegistry(csv_path, loader, caches=caches)
+    old = registry.current()
+    for cache in caches:
+        cache.put(("analytics", old.version), CachedResponse(body=b"{}", media_type="application/json"))
+
+    registry.reload()
+    assert [cache.stats().entries for cache in caches] == [1, 1]
+
+    csv_path.write_text("".join(csv_lines))
+    registry.reload()
+    assert [cache.stats().entries for cache in caches] == [0, 0]
+    assert [cache.stats().size_bytes for cache in caches] == [0, 0]
+
+
+def test_watcher_reloads_after_change_settles(registry, csv_lines, tmp_path):
+    old = registry.current()
+    watcher = registry.watch(interval=0.02)
+    try:
+        (tmp_path / "temperatures.csv").write_text("".join(csv_lines))
+        deadline = time.monotonic() + 5
+        while registry.current() is old and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        watcher.stop()
+
+    assert registry.current() is not old
+    assert not registry.is_stale()
@@ -0,0 +1,31 @@
+from app.services.response_cache import CachedResponse, ResponseCache
+
+
+def _entry(size: int) -> CachedResponse:
+    return CachedResponse(body=b"x" * size, media_type="application/json")
+
+
+def test_response_cache_evicts_least_recently_used_by_bytes():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", _entry(40))
+    cache.put("b", _entry(40))
+    assert cache.get("a") is not None
+
+    cache.put("c", _entry(40))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (3, 1, 1)
+    assert stats.entries == 2 and stats.size_bytes == 80
+
+
+def test_response_cache_returns_the_stored_body_and_skips_oversized_entries():
+    cache = ResponseCache(max_bytes=100)
+    entry = _entry(10)
+    cache.put("small", entry)
+    cache.put("large", _entry(101))
+
+    assert cache.get("small").body is entry.body
+    assert cache.get("large") is None
+    assert cache.stats().size_bytes == 10
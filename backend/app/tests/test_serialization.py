@@ -0,0 +1,86 @@
+import pytest
+from fastapi.responses import JSONResponse
+
+from app.dependencies import get_repository
+from app.models.schemas import (
+    AnnualPoint,
+    AnnualSeries,
+    AnnualTemperatureResponse,
+    MonthlyPoint,
+    MonthlySeries,
+    MonthlyTemperatureResponse,
+)
+from app.serialization import (
+    assemble_series,
+    encode_annual_response,
+    encode_columnar_response,
+    encode_monthly_response,
+    encode_series_fragments,
+)
+
+
+def _render(model) -> bytes:
+    return JSONResponse(content=model.model_dump(mode="json", by_alias=True)).body
+
+
+def test_monthly_encoding_matches_model_rendering():
+    repository = get_repository()
+    station_ids = ["66062", "101234", "204567"]
+    df = repository.filter_monthly(station_ids, 1990, 2019)
+    expected = MonthlyTemperatureResponse(
+        mode="monthly",
+        series=[
+            MonthlySeries(
+                station_id=station_id,
+                points=[
+                    MonthlyPoint(year=r.year, month=r.month, temperature=r.temperature) for r in group.itertuples()
+                ],
+            )
+            for station_id, group in df.groupby("station_id")
+        ],
+    )
+
+    assert encode_monthly_response(repository.monthly_series(station_ids, 1990, 2019)) == _render(expected)
+
+
+@pytest.mark.parametrize("include_std_band", [True, False])
+def test_annual_encoding_matches_model_rendering(include_std_band):
+    repository = get_repository()
+    df = repository.filter_annual(repository.station_ids, 1859, 2019)
+    expected = AnnualTemperatureResponse(
+        mode="annual",
+        series=[
+            AnnualSeries(
+                station_id=station_id,
+                points=[
+                    AnnualPoint(
+                        year=r.year,
+                        mean=r.mean,
+                        **({"std": r.std, "upper": r.upper, "lower": r.lower} if include_std_band else {}),
+                    )
+                    for r in group.itertuples()
+                ],
+            )
+            for station_id, group in df.groupby("station_id")
+        ],
+    )
+
+    data = repository.annual_series(repository.station_ids, 1859, 2019)
+    assert encode_annual_response(data, include_std_band) == _render(expected)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_per_station_fragments_assemble_to_the_whole_response(columnar):
+    repository = get_repository()
+    data = repository.annual_series(["66062", "101234", "204567"], 1990, 2019)
+    if columnar:
+        expected = encode_columnar_response("annual", data, True)
+    else:
+        expected = encode_annual_response(data, True)
+
+    fragments = []
+    for station_id in data.station_ids:
+        single = repository.annual_series([station_id], 1990, 2019)
+        fragments.append(encode_series_fragments("annual", single, True, columnar)[station_id])
+
+    assert assemble_series("annual", fragments, columnar) == expected
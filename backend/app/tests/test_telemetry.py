@@ -0,0 +1,35 @@
+import time
+
+from app.profiling import SamplingProfiler
+from app.telemetry import METRICS, RequestTimings, bind_timings, span, unbind_timings
+
+
+def test_spans_accumulate_per_request_and_in_metrics():
+    timings = RequestTimings()
+    token = bind_timings(timings)
+    try:
+        for _ in range(3):
+            with span("test_stage"):
+                time.sleep(0.001)
+    finally:
+        unbind_timings(token)
+
+    header = timings.server_timing()
+    assert header.startswith("test_stage;dur=")
+    assert float(header.split("dur=")[1]) >= 3.0
+    assert 'climate_span_duration_seconds_count{span="test_stage"} 3' in METRICS.render()
+
+
+def _busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler_attributes_samples_to_the_busy_function():
+    with SamplingProfiler(interval=0.001) as profiler:
+        _busy(0.1)
+
+    assert profiler.samples > 5
+    hottest = profiler.folded().splitlines()[0]
+    assert hottest.rsplit(" ", 1)[0].endswith("test_telemetry.py:_busy")
@@ -0,0 +1,82 @@
+"""Compare the range-index analytics path against the original pandas path.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_analytics [--csv PATH] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from functools import partial
+from pathlib import Path
+
+from app.config import Settings
+from app.models.schemas import AnalyticsPerStation, AnalyticsSummary, YearRange
+from app.services.analytics_service import AnalyticsService
+from app.services.data_repository import DataRepository
+
+
+def pandas_summarize(
+    repository: DataRepository, station_ids: list[str], year_from: int, year_to: int
+) -> AnalyticsSummary:
+    """The pre-index implementation: filter a DataFrame copy, then agg/groupby."""
+
+    df = repository.filter_monthly(station_ids, year_from, year_to)
+    overall = df["temperature"].agg(["mean", "min", "max"])
+    per_station_df = df.groupby("station_id")["temperature"].agg(mean="mean", min="min", max="max").reset_index()
+    return AnalyticsSummary(
+        selected_period=YearRange(from_year=int(df["year"].min()), to_year=int(df["year"].max())),
+        stations_analyzed=int(per_station_df["station_id"].nunique()),
+        overall_mean_temperature=float(overall["mean"]),
+        overall_min_temperature=float(overall["min"]),
+        overall_max_temperature=float(overall["max"]),
+        per_station=[
+            AnalyticsPerStation(station_id=row.station_id, mean=float(row.mean), min=float(row.min), max=float(row.max))
+            for row in per_station_df.itertuples()
+        ],
+    )
+
+
+def _time(fn, queries, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            fn(*query)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, default=Settings().data_path)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    repository = DataRepository(args.csv)
+    service = AnalyticsService(repository)
+    first_year, last_year = repository.get_global_year_bounds()
+    station_ids = repository.station_ids
+
+    rng = random.Random(0)
+    queries = []
+    for _ in range(args.queries):
+        year_from = rng.randint(first_year, last_year)
+        selection = rng.sample(station_ids, rng.randint(1, len(station_ids)))
+        queries.append((selection, year_from, rng.randint(year_from, last_year)))
+
+    for name, fn in (("pandas", partial(pandas_summarize, repository)), ("range-index", service.summarize)):
+        samples = _time(fn, queries, args.repeat)
+        print(
+            f"{name:>12}: median {statistics.median(samples):.3f} ms, "
+            f"p99 {statistics.quantiles(samples, n=100)[98]:.3f} ms over {len(samples)} calls"
+        )
+
+
+if __name__ == "__main__":
+    main()
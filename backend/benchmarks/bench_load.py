@@ -0,0 +1,96 @@
+"""Load-time benchmark for CSV normalization and annual aggregation.
+
+Replicates the bundled CSV under fresh station ids to build 10x and 100x
+inputs, then times ``_load_monthly_columns``, the previous groupby/lambda
+annual aggregation and the vectorized ``_build_annual_columns``, and checks
+that both agree. Peak traced memory of a single-pass load is compared
+with a chunked (streaming) load.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_load [--scales 1 10 100] [--chunk-size 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.config import Settings
+from app.services.data_repository import _build_annual_columns, _load_monthly_columns
+
+
+def legacy_build_annual_frame(monthly_df: pd.DataFrame) -> pd.DataFrame:
+    def _std(series: pd.Series) -> float:
+        return float(series.std(ddof=0)) if not series.empty else float("nan")
+
+    grouped = monthly_df.groupby(["station_id", "year"])["temperature"].agg(mean="mean", std=_std).reset_index()
+    grouped["std"] = grouped["std"].fillna(0.0)
+    grouped["upper"] = grouped["mean"] + grouped["std"]
+    grouped["lower"] = grouped["mean"] - grouped["std"]
+    return grouped.sort_values(["station_id", "year"]).reset_index(drop=True)
+
+
+def write_scaled_csv(source: Path, target: Path, scale: int) -> Path:
+    header, *rows = source.read_text().splitlines()
+    with target.open("w") as handle:
+        handle.write(header + "\n")
+        for copy in range(scale):
+            for row in rows:
+                station, rest = row.split(";", 1)
+                handle.write(f"{station}{copy:04d};{rest}\n")
+    return target
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _peak_mib(fn, *args, **kwargs) -> float:
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, default=Settings().data_path)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            csv_path = write_scaled_csv(args.csv, Path(workdir) / f"scaled-{scale}.csv", scale)
+            (station_ids, monthly), load_s = _timed(_load_monthly_columns, csv_path)
+            names = np.array(station_ids, dtype=object)
+            legacy, legacy_s = _timed(legacy_build_annual_frame, monthly.to_frame(np.arange(len(monthly.year)), names))
+            columns, annual_s = _timed(_build_annual_columns, monthly)
+            annual = columns.to_frame(np.arange(len(columns.year)), names).reset_index(drop=True)
+
+            assert legacy[["station_id", "year"]].equals(annual[["station_id", "year"]])
+            drift = max(
+                float(np.abs(legacy[column] - annual[column]).max()) for column in ("mean", "std", "upper", "lower")
+            )
+            print(
+                f"{scale:>4}x ({len(monthly.year):>9} monthly rows): load {load_s:7.3f}s | "
+                f"annual legacy {legacy_s:7.3f}s -> vectorized {annual_s:7.3f}s | max drift {drift:.1e}"
+            )
+            whole = _peak_mib(_load_monthly_columns, csv_path)
+            chunked = _peak_mib(_load_monthly_columns, csv_path, chunk_size=args.chunk_size)
+            print(f"      peak ingest memory: single pass {whole:8.1f} MiB | chunked {chunked:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Before/after latency of POST /api/temperature-data serialization.
+
+"legacy" re-mounts the original handler (one Pydantic model per point,
+re-validated against ``response_model``); "columnar" is the shipped route.
+Both run in-process through ``TestClient`` against the same repository with
+the response caches disabled, and their response bodies are checked to be
+byte-identical. A last scenario widens a warm selection by one station to
+show the per-station series cache at work.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_serialization [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_repository, get_response_cache, get_series_cache
+from app.main import app
+from app.models.schemas import (
+    AnnualPoint,
+    AnnualSeries,
+    AnnualTemperatureResponse,
+    MonthlyPoint,
+    MonthlySeries,
+    MonthlyTemperatureResponse,
+    TemperatureDataRequest,
+)
+from app.services.data_repository import DataRepository
+from app.services.response_cache import ResponseCache
+
+legacy_app = FastAPI()
+
+
+@legacy_app.post("/api/temperature-data", response_model=MonthlyTemperatureResponse | AnnualTemperatureResponse)
+def legacy_temperature_data(payload: TemperatureDataRequest, repository: DataRepository = Depends(get_repository)):
+    year_from, year_to = payload.year_range.from_year, payload.year_range.to_year
+    if payload.mode == "monthly":
+        df = repository.filter_monthly(payload.station_ids, year_from, year_to)
+        return MonthlyTemperatureResponse(
+            mode="monthly",
+            series=[
+                MonthlySeries(
+                    station_id=station_id,
+                    points=[
+                        MonthlyPoint(year=int(row.year), month=int(row.month), temperature=float(row.temperature))
+                        for row in group.itertuples()
+                    ],
+                )
+                for station_id, group in df.groupby("station_id")
+            ],
+        )
+
+    df = repository.filter_annual(payload.station_ids, year_from, year_to)
+    band = payload.include_std_band
+    return AnnualTemperatureResponse(
+        mode="annual",
+        series=[
+            AnnualSeries(
+                station_id=station_id,
+                points=[
+                    AnnualPoint(
+                        year=int(row.year),
+                        mean=float(row.mean),
+                        std=float(row.std) if band else None,
+                        upper=float(row.upper) if band else None,
+                        lower=float(row.lower) if band else None,
+                    )
+                    for row in group.itertuples()
+                ],
+            )
+            for station_id, group in df.groupby("station_id")
+        ],
+    )
+
+
+def _time(client: TestClient, payload: dict, repeat: int) -> tuple[list[float], bytes]:
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post("/api/temperature-data", json=payload)
+        samples.append((time.perf_counter() - start) * 1000)
+        body = response.content
+    return samples, body
+
+
+def _time_widened_selection(client: TestClient, payload: dict, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        series_cache = ResponseCache(64 * 1024 * 1024)
+        app.dependency_overrides[get_series_cache] = lambda: series_cache
+        client.post("/api/temperature-data", json={**payload, "station_ids": payload["station_ids"][:-1]})
+        start = time.perf_counter()
+        client.post("/api/temperature-data", json=payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    repository = get_repository()
+    first_year, last_year = repository.get_global_year_bounds()
+    year_range = {"from": first_year, "to": last_year}
+    scenarios = {
+        "monthly, all stations": {"station_ids": repository.station_ids, "mode": "monthly", "year_range": year_range},
+        "annual + std band": {
+            "station_ids": repository.station_ids,
+            "mode": "annual",
+            "include_std_band": True,
+            "year_range": year_range,
+        },
+    }
+
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    app.dependency_overrides[get_series_cache] = lambda: ResponseCache(0)
+    clients = {"legacy": TestClient(legacy_app), "columnar": TestClient(app)}
+    for scenario, payload in scenarios.items():
+        bodies = {}
+        for name, client in clients.items():
+            samples, bodies[name] = _time(client, payload, args.repeat)
+            median = statistics.median(samples)
+            print(f"{scenario:>22} | {name:>8}: median {median:8.2f} ms ({len(bodies[name])} bytes)")
+        assert bodies["legacy"] == bodies["columnar"], f"{scenario}: response bodies differ"
+
+    samples = _time_widened_selection(clients["columnar"], scenarios["monthly, all stations"], args.repeat)
+    print(f"{'monthly, +1 station':>22} | {'cached':>8}: median {statistics.median(samples):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""Closed-loop load test of the API under mixed traffic with Zipf-distributed station popularity.
+
+Each stage runs ``concurrency`` virtual users for ``--duration`` seconds;
+every user sends its next request as soon as the previous one returns.
+Requests are drawn from a ``/api/stations``, ``/api/temperature-data`` and
+``/api/analytics`` mix. Stations are picked with Zipf popularity (a few
+stations get most of the traffic, as in production) and year windows from
+a small Zipf-weighted set, so the caches see a realistic hit rate.
+Everything is drawn from a fixed seed.
+
+Two targets are supported:
+
+* ``inprocess`` drives ``app.main:app`` through ``httpx.ASGITransport``
+  in this process. There is no socket or server overhead, but the load
+  generator shares the event loop with the app, so use it for relative
+  comparisons.
+* ``uvicorn`` starts ``uvicorn app.main:app --workers N`` on a free local
+  port and drives it over HTTP.
+
+``--env KEY=VALUE`` settings (for example ``CLIMATE_COMPUTE_PROCESSES=true``)
+apply to either target. Per-stage throughput, latency percentiles per
+endpoint, status counts and error rate (5xx and transport failures) are
+reported. So is the RSS of every server process (uvicorn workers and
+compute processes), sampled over time from ``/proc`` on Linux. The JSON
+report can be saved and later runs compared against it; the run fails (exit
+status 1) when latency, peak RSS or error rate grows, or throughput drops,
+by more than ``--threshold``.
+
+Run from ``backend/``::
+
+    python -m benchmarks.loadtest [--csv PATH | --stations N --years N]
+        [--target inprocess | uvicorn] [--workers 2] [--concurrency 1 8 32] [--duration 10]
+        [--mix stations=1,temperature-data=6,analytics=3] [--zipf 1.1] [--env KEY=VALUE ...]
+        [--output report.json] [--baseline report.json] [--threshold 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+import numpy as np
+
+from app.config import Settings
+
+from .synthetic import write_synthetic_csv
+
+# benchmarks.suite (CaseResult, compare) imports app.main, which reads the
+# settings at import time; it is imported where used so that --env still
+# reaches the in-process target.
+
+ENDPOINTS = ("stations", "temperature-data", "analytics")
+DEFAULT_MIX = {"stations": 1.0, "temperature-data": 6.0, "analytics": 3.0}
+
+# Year windows requests are drawn from; repeated windows make responses cacheable.
+_YEAR_WINDOWS = 16
+
+# Per-run paths set by main(); left out of the compared report config.
+_RUN_PATHS = ("CLIMATE_DATA_PATH", "CLIMATE_SNAPSHOT_DIR")
+
+# Absolute growth in a stage's error rate that counts as a regression.
+ERROR_RATE_TOLERANCE = 0.01
+
+
+def zipf_weights(count: int, exponent: float) -> np.ndarray:
+    """Probability of each rank ``1..count`` under a Zipf law with ``exponent``."""
+
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+class Workload:
+    """Draws requests: an endpoint by ``mix`` weight, then Zipf-popular stations and year windows."""
+
+    def __init__(
+        self,
+        stations: list[dict],
+        mix: dict[str, float],
+        *,
+        zipf: float = 1.1,
+        max_selection: int = 10,
+        seed: int = 0,
+    ):
+        rng = np.random.default_rng(seed)
+        # Popularity rank is independent of id order.
+        self._station_ids = [stations[i]["id"] for i in rng.permutation(len(stations))]
+        self._station_weights = zipf_weights(len(stations), zipf)
+        first_year = min(station["first_year"] for station in stations)
+        last_year = max(station["last_year"] for station in stations)
+        starts = rng.integers(first_year, last_year + 1, _YEAR_WINDOWS)
+        self._windows = [(int(start), int(rng.integers(start, last_year + 1))) for start in starts]
+        self._window_weights = zipf_weights(_YEAR_WINDOWS, zipf)
+        self._endpoints = list(mix)
+        self._endpoint_weights = np.array([mix[name] for name in self._endpoints]) / sum(mix.values())
+        self._max_selection = min(max_selection, len(stations))
+
+    def draw(self, rng: np.random.Generator) -> tuple[str, str, str, dict | None]:
+        """Return ``(endpoint, method, path, json_body)`` for the next request."""
+
+        endpoint = self._endpoints[rng.choice(len(self._endpoints), p=self._endpoint_weights)]
+        if endpoint == "stations":
+            return endpoint, "GET", "/api/stations", None
+
+        size = int(rng.integers(1, self._max_selection + 1))
+        picks = rng.choice(len(self._station_ids), size=size, replace=False, p=self._station_weights)
+        year_from, year_to = self._windows[rng.choice(_YEAR_WINDOWS, p=self._window_weights)]
+        body = {
+            "station_ids": [self._station_ids[i] for i in picks.tolist()],
+            "year_range": {"from": year_from, "to": year_to},
+        }
+        if endpoint == "temperature-data":
+            body["mode"] = "monthly" if rng.random() < 0.5 else "annual"
+        return endpoint, "POST", f"/api/{endpoint}", body
+
+
+def _process_tree(root: int) -> list[int]:
+    """``root`` and all its descendants, from ``/proc``; empty where ``/proc`` is unavailable."""
+
+    children: dict[int, list[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                # The command name may contain spaces; fields after it are fixed.
+                parent = int(handle.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, ()))
+    return sorted(tree)
+
+
+def _rss_mib(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class RssSampler:
+    """Samples the RSS of every process under ``root`` at a fixed interval while a stage runs."""
+
+    def __init__(self, root: int, interval: float = 0.5):
+        self._root = root
+        self._interval = interval
+        self.timeline: list[dict] = []
+
+    def sample(self, elapsed: float) -> None:
+        rss = {pid: value for pid in _process_tree(self._root) if (value := _rss_mib(pid)) is not None}
+        if rss:
+            self.timeline.append({"t": round(elapsed, 3), "rss_mib": {str(pid): round(v, 1) for pid, v in rss.items()}})
+
+    async def run(self, started: float, stop: asyncio.Event) -> None:
+        while True:
+            self.sample(time.perf_counter() - started)
+            try:
+                await asyncio.wait_for(stop.wait(), self._interval)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    def peak_per_process(self) -> dict[str, float]:
+        peaks: dict[str, float] = {}
+        for point in self.timeline:
+            for pid, rss in point["rss_mib"].items():
+                peaks[pid] = max(peaks.get(pid, 0.0), rss)
+        return peaks
+
+
+def _latency_summary(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"requests": 0}
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99]).tolist()
+    return {"requests": len(samples), "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": max(samples)}
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    concurrency: int,
+    duration: float,
+    root_pid: int,
+    seed: int = 0,
+) -> dict:
+    """Run ``concurrency`` closed-loop users for ``duration`` seconds and summarize the stage."""
+
+    latencies: dict[str, list[float]] = {name: [] for name in ENDPOINTS}
+    statuses: Counter[str] = Counter()
+    errors = 0
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def user(index: int) -> None:
+        nonlocal errors
+        rng = np.random.default_rng([seed, concurrency, index])
+        while time.perf_counter() < deadline:
+            endpoint, method, path, body = workload.draw(rng)
+            sent = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                status = str(response.status_code)
+                failed = response.status_code >= 500
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+                failed = True
+            latencies[endpoint].append((time.perf_counter() - sent) * 1000)
+            statuses[status] += 1
+            errors += failed
+
+    sampler = RssSampler(root_pid)
+    stop = asyncio.Event()
+    sampling = asyncio.create_task(sampler.run(started, stop))
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampling
+
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "requests": total,
+        "throughput": total / elapsed,
+        "error_rate": errors / total if total else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency": {
+            "all": _latency_summary([sample for samples in latencies.values() for sample in samples]),
+            **{name: _latency_summary(samples) for name, samples in latencies.items() if samples},
+        },
+        "peak_rss_mib": sampler.peak_per_process(),
+        "rss_timeline": sampler.timeline,
+    }
+
+
+def _cases(stages: list[dict]) -> dict:
+    """Per stage and endpoint results in :mod:`benchmarks.suite` form, for :func:`~benchmarks.suite.compare`."""
+
+    from .suite import CaseResult
+
+    cases = {}
+    for stage in stages:
+        peak = max(stage["peak_rss_mib"].values(), default=0.0)
+        for endpoint, summary in stage["latency"].items():
+            if not summary["requests"]:
+                continue
+            name = f"c{stage['concurrency']} {endpoint}"
+            cases[name] = CaseResult(
+                name=name,
+                runs=summary["requests"],
+                p50_ms=summary["p50_ms"],
+                p99_ms=summary["p99_ms"],
+                throughput=summary["requests"] / stage["duration_s"],
+                peak_rss_mib=peak,
+            )
+    return cases
+
+
+def regressions(report: dict, baseline: dict, threshold: float, min_delta_ms: float = 0.5) -> list[str]:
+    """Latency and peak-RSS growth per case (as in the suite), plus throughput drops and error-rate growth per stage."""
+
+    from .suite import CaseResult, compare
+
+    found = compare([CaseResult(**case) for case in report["cases"].values()], baseline, threshold, min_delta_ms)
+    previous = {stage["concurrency"]: stage for stage in baseline.get("stages", [])}
+    for stage in report["stages"]:
+        reference = previous.get(stage["concurrency"])
+        if reference is None:
+            continue
+        label = f"c{stage['concurrency']}"
+        if stage["throughput"] < reference["throughput"] * (1 - threshold):
+            found.append(
+                f"{label}: throughput {reference['throughput']:.1f} -> {stage['throughput']:.1f} req/s "
+                f"({stage['throughput'] / reference['throughput'] - 1:.0%})"
+            )
+        # Error rates are compared in absolute terms: 0% -> 0.1% has no meaningful ratio.
+        if stage["error_rate"] > reference["error_rate"] + ERROR_RATE_TOLERANCE:
+            found.append(f"{label}: error rate {reference['error_rate']:.2%} -> {stage['error_rate']:.2%}")
+    return found
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@asynccontextmanager
+async def inprocess_target(env: dict[str, str]) -> AsyncIterator[tuple[httpx.AsyncClient, int]]:
+    os.environ.update(env)
+    from app.main import app  # imported late so --env reaches the cached settings
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            yield client, os.getpid()
+
+
+@asynccontextmanager
+async def uvicorn_target(
+    env: dict[str, str], workers: int, concurrency: int, startup_timeout: float = 120
+) -> AsyncIterator[tuple[httpx.AsyncClient, int]]:
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    command += ["--workers", str(workers), "--log-level", "warning"]
+    server = subprocess.Popen(command, env={**os.environ, **env}, cwd=Path(__file__).resolve().parents[1])
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {server.returncode} during startup")
+                try:
+                    if (await client.get("/api/stations")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"uvicorn did not become ready within {startup_timeout:.0f}s")
+                await asyncio.sleep(0.25)
+            yield client, server.pid
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+async def run_load_test(
+    target: AbstractAsyncContextManager[tuple[httpx.AsyncClient, int]],
+    concurrency_levels: list[int],
+    duration: float,
+    mix: dict[str, float],
+    *,
+    zipf: float = 1.1,
+    max_selection: int = 10,
+    warmup: float = 2.0,
+    seed: int = 0,
+) -> list[dict]:
+    """Run one stage per concurrency level against ``target`` (an async context yielding ``(client, pid)``)."""
+
+    async with target as (client, root_pid):
+        response = await client.get("/api/stations")
+        response.raise_for_status()
+        workload = Workload(response.json(), mix, zipf=zipf, max_selection=max_selection, seed=seed)
+        if warmup > 0:
+            await run_stage(client, workload, max(concurrency_levels), warmup, root_pid, seed=seed + 1)
+        return [
+            await run_stage(client, workload, concurrency, duration, root_pid, seed=seed)
+            for concurrency in concurrency_levels
+        ]
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}; expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def _parse_env(value: str) -> tuple[str, str]:
+    name, separator, setting = value.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {value!r}")
+    return name, setting
+
+
+def _print_report(stages: list[dict]) -> None:
+    print(f"{'stage':<8} {'endpoint':<18} {'req':>7} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for stage in stages:
+        for endpoint, summary in stage["latency"].items():
+            if not summary["requests"]:
+                continue
+            print(
+                f"c{stage['concurrency']:<7} {endpoint:<18} {summary['requests']:7d} "
+                f"{summary['requests'] / stage['duration_s']:9.1f} {summary['p50_ms']:9.2f} "
+                f"{summary['p90_ms']:9.2f} {summary['p99_ms']:9.2f}"
+            )
+        peaks = ", ".join(f"{pid}: {rss:.0f}" for pid, rss in stage["peak_rss_mib"].items())
+        print(f"{'':<8} errors {stage['error_rate']:.2%}, statuses {stage['statuses']}")
+        print(f"{'':<8} peak RSS MiB by pid {{{peaks}}}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, help="Serve this CSV (default: the bundled one).")
+    parser.add_argument("--stations", type=int, help="Generate a synthetic CSV with this many stations instead.")
+    parser.add_argument("--years", type=int, default=200)
+    parser.add_argument("--target", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Virtual users per stage.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per stage.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Untimed seconds before the first stage.")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="Endpoint weights, e.g. analytics=1.")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of station and window popularity.")
+    parser.add_argument("--max-selection", type=int, default=10, help="Most stations per request.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--env", type=_parse_env, action="append", default=[], help="Server setting, KEY=VALUE.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--baseline", type=Path, help="Compare against a report written with --output.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative change before failing.")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore latency growth below this.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(args.env)
+        if args.stations:
+            csv_path = write_synthetic_csv(Path(tmp) / "synthetic.csv", args.stations, args.years)
+            dataset = {"stations": args.stations, "years": args.years}
+        else:
+            csv_path = args.csv or Settings().data_path
+            dataset = {"csv": str(csv_path)}
+        env.setdefault("CLIMATE_DATA_PATH", str(csv_path))
+        env.setdefault("CLIMATE_SNAPSHOT_DIR", str(Path(tmp) / "snapshots"))
+
+        if args.target == "uvicorn":
+            target = uvicorn_target(env, args.workers, max(args.concurrency))
+        else:
+            target = inprocess_target(env)
+        stages = asyncio.run(
+            run_load_test(
+                target,
+                args.concurrency,
+                args.duration,
+                args.mix,
+                zipf=args.zipf,
+                max_selection=args.max_selection,
+                warmup=args.warmup,
+                seed=args.seed,
+            )
+        )
+
+    _print_report(stages)
+    config = {
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else 1,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "zipf": args.zipf,
+        "max_selection": args.max_selection,
+        "seed": args.seed,
+        "env": {name: value for name, value in env.items() if name not in _RUN_PATHS},
+    }
+    report = {
+        "dataset": dataset,
+        "config": config,
+        "stages": stages,
+        "cases": {name: asdict(case) for name, case in _cases(stages).items()},
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"report written to {args.output}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        for key in ("dataset", "config"):
+            if baseline.get(key) != report[key]:
+                print(f"warning: baseline {key} {baseline.get(key)} differs from this run's {report[key]}")
+        found = regressions(report, baseline, args.threshold, args.min_delta_ms)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Regression benchmark suite: latency percentiles, throughput and peak RSS per case.
+
+Covers CSV ingestion (``_load_monthly_columns``), ``_build_annual_columns``,
+``filter_monthly``/``filter_annual``, ``AnalyticsService.summarize`` and the
+``/api/temperature-data`` and ``/api/analytics`` endpoints end to end (with
+the response caches disabled). Selections are drawn from a fixed seed, so
+runs against the same CSV issue the same queries.
+
+Results can be saved as a baseline and later runs compared against it; the
+run fails (exit status 1) when a case's p50 or p99 latency or the peak RSS
+grows by more than ``--threshold`` over the baseline. Peak RSS is the
+process's high-water mark while the case ran: on Linux it is reset through
+``/proc/self/clear_refs`` before each case. Elsewhere it cannot be reset,
+so it is reported as 0 and never compared.
+
+Run from ``backend/``::
+
+    python -m benchmarks.suite [--csv PATH | --stations N --years N]
+        [--save-baseline FILE] [--baseline FILE] [--threshold 0.25] [--min-delta-ms 0.5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import get_repository, get_response_cache, get_series_cache
+from app.main import app
+from app.services.analytics_service import AnalyticsService
+from app.services.data_repository import DataRepository, _build_annual_columns, _load_monthly_columns
+from app.services.response_cache import ResponseCache
+
+from .synthetic import write_synthetic_csv
+
+COMPARED_METRICS = ("p50_ms", "p99_ms", "peak_rss_mib")
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    name: str
+    runs: int
+    p50_ms: float
+    p99_ms: float
+    throughput: float
+    peak_rss_mib: float
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark so the next reading covers only what follows (Linux)."""
+
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_mib() -> float:
+    with open("/proc/self/status") as handle:
+        for line in handle:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 2**10
+    raise OSError("VmHWM missing from /proc/self/status")
+
+
+def run_case(name: str, fn: Callable[[], object], runs: int, warmup: int = 1) -> CaseResult:
+    for _ in range(warmup):
+        fn()
+    # ru_maxrss never decreases, so without a reset every case after the
+    # largest would report the same peak.
+    tracked = _reset_peak_rss()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return CaseResult(
+        name=name,
+        runs=runs,
+        p50_ms=statistics.median(samples),
+        p99_ms=_percentile(samples, 0.99),
+        throughput=1000 * runs / sum(samples),
+        peak_rss_mib=_peak_rss_mib() if tracked else 0.0,
+    )
+
+
+def _selections(repository: DataRepository, count: int, size: int, seed: int) -> list[tuple[list[str], int, int]]:
+    rng = random.Random(seed)
+    first_year, last_year = repository.get_global_year_bounds()
+    station_ids = repository.station_ids
+    selections = []
+    for _ in range(count):
+        year_from = rng.randint(first_year, last_year)
+        year_to = rng.randint(year_from, last_year)
+        selections.append((rng.sample(station_ids, min(size, len(station_ids))), year_from, year_to))
+    return selections
+
+
+def _cycle(selections: list, fn: Callable) -> Callable[[], object]:
+    iterator = iter(())
+
+    def call():
+        nonlocal iterator
+        selection = next(iterator, None)
+        if selection is None:
+            iterator = iter(selections)
+            selection = next(iterator)
+        return fn(*selection)
+
+    return call
+
+
+def run_suite(csv_path: Path, runs: int, load_runs: int, selection_size: int, seed: int = 0) -> list[CaseResult]:
+    results = [run_case("load_monthly_columns", lambda: _load_monthly_columns(csv_path), load_runs, warmup=0)]
+    _, monthly = _load_monthly_columns(csv_path)
+    results.append(run_case("build_annual_columns", lambda: _build_annual_columns(monthly), load_runs, warmup=0))
+    del monthly
+
+    repository = DataRepository(csv_path)
+    service = AnalyticsService(repository)
+    selections = _selections(repository, runs, selection_size, seed)
+    results.append(run_case("filter_monthly", _cycle(selections, repository.filter_monthly), runs))
+    results.append(run_case("filter_annual", _cycle(selections, repository.filter_annual), runs))
+    results.append(run_case("summarize", _cycle(selections, service.summarize), runs))
+
+    app.dependency_overrides[get_repository] = lambda: repository
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(0)
+    app.dependency_overrides[get_series_cache] = lambda: ResponseCache(0)
+    try:
+        with TestClient(app) as client:
+
+            def endpoint(path: str, **extra) -> Callable[[list[str], int, int], object]:
+                def post(station_ids: list[str], year_from: int, year_to: int):
+                    body = {"station_ids": station_ids, "year_range": {"from": year_from, "to": year_to}, **extra}
+                    response = client.post(path, json=body)
+                    assert response.status_code in (200, 404), response.text
+                    return response
+
+                return post
+
+            temperature_data = endpoint("/api/temperature-data", mode="monthly")
+            results.append(run_case("POST /api/temperature-data", _cycle(selections, temperature_data), runs))
+            results.append(run_case("POST /api/analytics", _cycle(selections, endpoint("/api/analytics")), runs))
+    finally:
+        app.dependency_overrides.clear()
+    return results
+
+
+def compare(results: list[CaseResult], baseline: dict, threshold: float, min_delta_ms: float = 0.5) -> list[str]:
+    """Describe every compared metric that grew by more than ``threshold`` over ``baseline``.
+
+    Latency growth below ``min_delta_ms`` is ignored, so timer jitter on
+    sub-millisecond cases does not count as a regression.
+    """
+
+    regressions = []
+    for result in results:
+        reference = baseline.get("cases", {}).get(result.name)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            current, previous = getattr(result, metric), reference[metric]
+            if metric.endswith("_ms") and current - previous < min_delta_ms:
+                continue
+            if previous > 0 and current > previous * (1 + threshold):
+                growth = current / previous - 1
+                regressions.append(f"{result.name}: {metric} {previous:.2f} -> {current:.2f} (+{growth:.0%})")
+    return regressions
+
+
+def _print_table(results: list[CaseResult]) -> None:
+    print(f"{'case':<28} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'peak RSS MiB':>13}")
+    for result in results:
+        print(
+            f"{result.name:<28} {result.p50_ms:10.2f} {result.p99_ms:10.2f} "
+            f"{result.throughput:10.1f} {result.peak_rss_mib:13.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", type=Path, help="Benchmark this CSV (default: the bundled one).")
+    parser.add_argument("--stations", type=int, help="Generate a synthetic CSV with this many stations instead.")
+    parser.add_argument("--years", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=200, help="Timed queries per query case.")
+    parser.add_argument("--load-runs", type=int, default=3, help="Timed runs of the ingestion cases.")
+    parser.add_argument("--selection-size", type=int, default=25, help="Stations per query.")
+    parser.add_argument("--baseline", type=Path, help="Compare against results saved with --save-baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative growth before failing.")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore latency growth below this.")
+    parser.add_argument("--save-baseline", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.stations:
+            csv_path = write_synthetic_csv(Path(tmp) / "synthetic.csv", args.stations, args.years)
+            dataset = {"stations": args.stations, "years": args.years}
+        else:
+            csv_path = args.csv or Settings().data_path
+            dataset = {"csv": str(csv_path)}
+        results = run_suite(csv_path, args.runs, args.load_runs, args.selection_size)
+
+    _print_table(results)
+    if args.save_baseline:
+        document = {"dataset": dataset, "cases": {result.name: asdict(result) for result in results}}
+        args.save_baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"baseline written to {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("dataset") != dataset:
+            print(f"warning: baseline was recorded on {baseline.get('dataset')}, this run used {dataset}")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Synthetic temperature CSVs in the bundled ``Station Number;Year;Jan..Dec`` layout.
+
+Each station gets its own mean level, seasonal amplitude and warming trend
+plus monthly noise; a fraction of monthly values is left blank, as in the
+real archive. Output is deterministic for a given seed.
+
+Run from ``backend/``::
+
+    python -m benchmarks.synthetic OUT.csv [--stations 10000] [--years 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_repository import MONTHS
+
+# Stations are generated and written this many at a time to bound memory.
+_STATIONS_PER_CHUNK = 500
+
+
+def write_synthetic_csv(
+    target: Path,
+    stations: int,
+    years: int,
+    *,
+    first_year: int = 1820,
+    missing: float = 0.02,
+    seed: int = 0,
+) -> Path:
+    rng = np.random.default_rng(seed)
+    year_values = np.arange(first_year, first_year + years)
+    phase = np.cos(2 * np.pi * np.arange(12) / 12)
+
+    with target.open("w", newline="") as handle:
+        handle.write(";".join(["Station Number", "Year", *MONTHS]) + "\n")
+        for start in range(0, stations, _STATIONS_PER_CHUNK):
+            count = min(_STATIONS_PER_CHUNK, stations - start)
+            level = rng.uniform(-5.0, 28.0, count)
+            amplitude = rng.uniform(1.0, 15.0, count) * rng.choice([-1.0, 1.0], count)
+            trend = rng.normal(0.01, 0.01, count)
+
+            values = (
+                level[:, None, None]
+                + amplitude[:, None, None] * phase[None, None, :]
+                + trend[:, None, None] * (year_values - first_year)[None, :, None]
+                + rng.normal(0.0, 1.2, (count, years, 12))
+            ).round(1)
+            values[rng.random(values.shape) < missing] = np.nan
+
+            frame = pd.DataFrame(values.reshape(-1, 12), columns=MONTHS)
+            frame.insert(0, "Year", np.tile(year_values, count))
+            frame.insert(0, "Station Number", np.repeat(np.arange(100000 + start, 100000 + start + count), years))
+            frame.to_csv(handle, sep=";", header=False, index=False, na_rep="", float_format="%.1f")
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target", type=Path)
+    parser.add_argument("--stations", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=200)
+    parser.add_argument("--first-year", type=int, default=1820)
+    parser.add_argument("--missing", type=float, default=0.02, help="Fraction of monthly values left blank.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_synthetic_csv(
+        args.target, args.stations, args.years, first_year=args.first_year, missing=args.missing, seed=args.seed
+    )
+    size = args.target.stat().st_size / 2**20
+    print(f"wrote {args.stations * args.years} rows ({size:.1f} MiB) in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()